@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.bench
+#
+# Benchmark of constructor lifecycle: get_version, get_params, construct, post_construct.
+
+import json
+import os
+import platform
+import re
+import time
+import tracemalloc
+
+from smartz.api.constructor_registry import load_constructor, unload_constructor
+from smartz.api.sample_fields import fields_matrix
+
+
+PHASES = ('get_version', 'get_params', 'construct', 'post_construct')
+
+_PACKAGE_JSON = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'package.json'))
+
+_FUNCTION_RE = re.compile(r'\bfunction\s+(\w+)\s*\(')
+_PUBLIC_VAR_RE = re.compile(r'\bpublic\s+(?:constant\s+)?(\w+)\s*[=;]')
+
+
+def sdk_version():
+    try:
+        with open(_PACKAGE_JSON) as fh:
+            return json.load(fh).get('version')
+    except (OSError, ValueError):
+        return None
+
+
+def approximate_abi(source):
+    """
+    ABI-like list of functions and public variables declared in Solidity source, for runs without compiler.
+    """
+    names = set(_FUNCTION_RE.findall(source)) | set(_PUBLIC_VAR_RE.findall(source))
+    return [{'type': 'function', 'name': name} for name in sorted(names)] + [{'type': 'fallback'}]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    idx = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[idx]
+
+
+def phase_stats(durations, allocations):
+    """
+    :param durations: call durations, seconds
+    :param allocations: peak allocated bytes of calls
+    """
+    durations = sorted(durations)
+    total = sum(durations)
+    return {
+        "calls": len(durations),
+        "mean_ms": total / len(durations) * 1000 if durations else None,
+        "p50_ms": _ms(percentile(durations, 0.5)),
+        "p90_ms": _ms(percentile(durations, 0.9)),
+        "p99_ms": _ms(percentile(durations, 0.99)),
+        "max_ms": _ms(durations[-1] if durations else None),
+        "calls_per_second": len(durations) / total if total else None,
+        "alloc_peak_mean_bytes": sum(allocations) // len(allocations) if allocations else None,
+        "alloc_peak_max_bytes": max(allocations) if allocations else None,
+    }
+
+
+def _ms(value):
+    return None if value is None else value * 1000
+
+
+def bench_constructor(filename, field_sets=None, iterations=100, max_field_sets=16, compiler=None,
+                      trace_allocations=True):
+    """
+    Benchmarks lifecycle of one constructor.
+
+    Constructor methods are called directly, without caches of the SDK engine.
+
+    :param filename: constructor file
+    :param field_sets: list of fields, generated from get_params() schema if not provided
+    :param iterations: number of passes over field sets
+    :param max_field_sets: max number of generated field sets
+    :param compiler: CachingCompiler to get real ABI for post_construct(). ABI is approximated from source otherwise
+    :param trace_allocations: measure peak allocations of calls (separate pass, not timed)
+    :return: json-like report
+    """
+    started = time.perf_counter()
+    loaded = load_constructor(filename, use_manifest=False)
+    load_time = time.perf_counter() - started
+
+    try:
+        instance = loaded.instance
+        blockchain = instance.get_version().get('blockchain', 'ethereum')
+        if field_sets is None:
+            field_sets = fields_matrix(instance.get_params()['schema'], blockchain, max_field_sets, loaded.feature_axes)
+
+        # ABI is prepared outside of measured calls
+        abi_by_set = []
+        for fields in field_sets:
+            result = instance.construct(fields)
+            if result.get('result') != 'success':
+                abi_by_set.append(None)
+            elif compiler is not None:
+                abi_by_set.append(compiler.compile(result['source'], result['contract_name'])['abi'])
+            else:
+                abi_by_set.append(approximate_abi(result['source']))
+
+        calls = {
+            'get_version': [lambda: instance.get_version()],
+            'get_params': [lambda: instance.get_params()],
+            'construct': [(lambda fields=fields: instance.construct(fields)) for fields in field_sets],
+            'post_construct': [(lambda fields=fields, abi=abi: instance.post_construct(fields, abi))
+                               for fields, abi in zip(field_sets, abi_by_set) if abi is not None],
+        }
+
+        phases = {}
+        for phase in PHASES:
+            durations = []
+            for _ in range(iterations):
+                for call in calls[phase]:
+                    call_started = time.perf_counter()
+                    call()
+                    durations.append(time.perf_counter() - call_started)
+
+            allocations = _trace_allocations(calls[phase]) if trace_allocations else []
+            phases[phase] = phase_stats(durations, allocations)
+
+        return {
+            "file": filename,
+            "blockchain": blockchain,
+            "load_ms": load_time * 1000,
+            "field_sets": len(field_sets),
+            "failed_field_sets": sum(1 for abi in abi_by_set if abi is None),
+            "abi": "compiled" if compiler is not None else "approximate",
+            "phases": phases,
+        }
+    finally:
+        unload_constructor(loaded)
+
+
+def _trace_allocations(calls):
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+
+    allocations = []
+    try:
+        for call in calls:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            call()
+            allocations.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    return allocations
+
+
+def bench(filenames, **kwargs):
+    """
+    Benchmarks several constructors, see bench_constructor() for arguments.
+
+    :return: json-like report
+    """
+    return {
+        "sdk_version": sdk_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "constructors": [bench_constructor(filename, **kwargs) for filename in filenames],
+    }
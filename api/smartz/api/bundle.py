@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.bundle
+#
+# Catalog of constructors packed into a single file.
+#
+# Layout:
+#   8 bytes      magic
+#   8 bytes      length of index, little-endian
+#   index        utf-8 json: {"format": .., "python_magic": .., "constructors": {name: entry}}
+#   data         marshalled code objects, sources and resource files of constructors, referenced by entries
+#                as [offset, length]
+#
+# Entry is a manifest of the constructor (see smartz.api.manifest) plus locations of its code, source and
+# resource files (see smartz.api.resources) and metadata of its templates. Paths are relative to the packed
+# directory, so a bundle can be moved to another host.
+#
+# Bundle is opened with mmap, constructor code is unmarshalled when the constructor is requested and executed
+# on its first construct() or post_construct(). Source and resource files of requested constructors are written
+# to a temporary directory which becomes their module directory.
+
+import hashlib
+import importlib.util
+import json
+import marshal
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+
+from smartz.api.constructor_registry import ConstructorLoadError, LoadedConstructor, load_constructor, \
+    unload_constructor
+from smartz.api.manifest import build_manifest, class_templates
+from smartz.api.resources import declared_resources
+
+
+MAGIC = b'SMARTZB\x01'
+
+BUNDLE_FORMAT = 2
+
+_HEADER = struct.Struct('<8sQ')
+
+
+class BundleError(Exception):
+    """
+    Bundle can't be written or read.
+    """
+
+
+def scan_constructors(directory):
+    """
+    Python files in directory and its subdirectories.
+
+    :return: sorted list of paths
+    """
+    result = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [name for name in dirnames if not name.startswith(('.', '__'))]
+        result.extend(os.path.join(dirpath, name) for name in filenames if name.endswith('.py'))
+    return sorted(result)
+
+
+def template_metadata(instance):
+    """
+    Placeholders and sections of Template attributes of constructor class.
+    """
+    return {
+        attr: {
+            "placeholders": sorted(value.placeholders),
+            "sections": sorted(value.sections),
+            "host_slots": sorted(value.host_slots),
+            "snippets": [snippet.key for snippet in value.snippets],
+            "axes": list(value.axes),
+        }
+        for attr, value in class_templates(type(instance)).items()
+    }
+
+
+def pack(filenames, path, base_dir=None, skip_invalid=False):
+    """
+    Writes bundle of constructors.
+
+    Each constructor is loaded and checked: it must define ConstructorInstance and its get_version() and get_params()
+    must succeed.
+
+    :param filenames: constructor files
+    :param path: bundle file to write
+    :param base_dir: constructors are named by their paths relative to it, current directory by default.
+        Constructor files and their resource files must be inside it
+    :param skip_invalid: leave out invalid constructors instead of failing
+    :raises BundleError: if some constructor is invalid and skip_invalid is not set
+    :return: (list of packed names, dict of filename -> error of invalid constructors)
+    """
+    base_dir = os.path.realpath(base_dir or os.getcwd())
+    entries = {}
+    blobs = []
+    offset = 0
+    errors = {}
+
+    def add_blob(data):
+        nonlocal offset
+        blobs.append(data)
+        location = [offset, len(data)]
+        offset += len(data)
+        return location
+
+    for filename in filenames:
+        filename = os.path.realpath(filename)
+        name = _relative_path(filename, base_dir)
+        if name is None:
+            errors[filename] = 'Constructor is outside of {}'.format(base_dir)
+            continue
+
+        try:
+            loaded = load_constructor(filename, use_manifest=False)
+        except ConstructorLoadError as exc:
+            errors[filename] = str(exc)
+            continue
+
+        try:
+            entry = build_manifest(loaded)
+            entry['templates'] = template_metadata(loaded.instance)
+            entry['feature_axes'] = loaded.feature_axes
+            resources = _resource_files(loaded, base_dir)
+        except ValueError as exc:
+            errors[filename] = str(exc)
+            continue
+        finally:
+            unload_constructor(loaded)
+
+        with open(filename, 'rb') as fh:
+            content = fh.read()
+        if entry['content_hash'] != hashlib.sha256(content).hexdigest():
+            errors[filename] = 'File was modified while packing'
+            continue
+
+        try:
+            resource_blobs = {}
+            for resource_path, resource_filename in resources.items():
+                with open(resource_filename, 'rb') as fh:
+                    resource_blobs[resource_path] = fh.read()
+        except OSError as exc:
+            errors[filename] = 'Failed to read resource: {}'.format(exc)
+            continue
+
+        entry['path'] = name
+        entry['source'] = add_blob(content)
+        entry['code'] = add_blob(marshal.dumps(compile(content, name, 'exec', dont_inherit=True)))
+        entry['resources'] = {resource_path: add_blob(data) for resource_path, data in sorted(resource_blobs.items())}
+        entries[name] = entry
+
+    if errors and not skip_invalid:
+        raise BundleError('Invalid constructors: {}'.format(
+            '; '.join('{}: {}'.format(filename, error) for filename, error in sorted(errors.items()))))
+
+    index = json.dumps({
+        "format": BUNDLE_FORMAT,
+        "python_magic": importlib.util.MAGIC_NUMBER.hex(),
+        "constructors": entries,
+    }, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as fh:
+        fh.write(_HEADER.pack(MAGIC, len(index)))
+        fh.write(index)
+        for blob in blobs:
+            fh.write(blob)
+    os.replace(tmp_path, path)
+
+    return sorted(entries), errors
+
+
+def _relative_path(path, base_dir):
+    """
+    :return: path relative to base_dir, None if path is outside of it
+    """
+    path = os.path.relpath(os.path.realpath(path), base_dir)
+    if os.path.isabs(path) or path == os.pardir or path.startswith(os.pardir + os.sep):
+        return None
+    return path
+
+
+def _resource_files(loaded, base_dir):
+    # path relative to base_dir -> absolute path
+    result = {}
+    for resource in declared_resources(type(loaded.instance)).values():
+        path = _relative_path(resource.filename, base_dir)
+        if path is None:
+            raise ValueError('Resource {} is outside of {}'.format(resource.filename, base_dir))
+        result[path] = resource.filename
+    return result
+
+
+class ConstructorBundle(object):
+    """
+    Opened bundle. Provides the same interface as ConstructorRegistry, constructors are addressed by names
+    from the bundle index (paths relative to packed directory).
+
+    get_version() and get_params() of constructors are answered from the index, constructor code is
+    unmarshalled on get() and executed on first call of other methods.
+    """
+
+    def __init__(self, path, result_cache=None, profiler=None, linter=None):
+        """
+        :param path: bundle file
+        :param result_cache: ConstructResultCache shared by loaded constructors, optional
+        :param profiler: CallProfiler shared by loaded constructors, optional
+        :param linter: SourceLinter shared by loaded constructors, optional
+        :raises BundleError: if file is not a valid bundle
+        """
+        self.path = path
+        self.result_cache = result_cache
+        self.profiler = profiler
+        self.linter = linter
+        self._loaded = {}
+        self._lock = threading.RLock()
+        # directory of unpacked sources and resource files, created on first get()
+        self._directory = None
+
+        with open(path, 'rb') as fh:
+            try:
+                self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise BundleError('Failed to map bundle {}: {}'.format(path, exc))
+
+        try:
+            magic, index_length = _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise BundleError('File {} is not a constructor bundle'.format(path))
+
+            self._data_offset = _HEADER.size + index_length
+            index = json.loads(self._mmap[_HEADER.size:self._data_offset].decode('utf-8'))
+            if index.get('format') != BUNDLE_FORMAT:
+                raise BundleError('Unsupported format of bundle {}: {}'.format(path, index.get('format')))
+        except (struct.error, ValueError) as exc:
+            self._mmap.close()
+            raise BundleError('Bundle {} is corrupted: {}'.format(path, exc))
+        except BundleError:
+            self._mmap.close()
+            raise
+
+        self.index = index['constructors']
+        # bytecode is specific to python version, sources are compiled otherwise
+        self._use_code = index.get('python_magic') == importlib.util.MAGIC_NUMBER.hex()
+
+    @property
+    def names(self):
+        return sorted(self.index)
+
+    def _blob(self, location):
+        start = self._data_offset + location[0]
+        return self._mmap[start:start + location[1]]
+
+    def get(self, name):
+        """
+        Gets constructor by its name in the bundle.
+
+        :return: LoadedConstructor
+        """
+        loaded = self._loaded.get(name)
+        if loaded is not None:
+            return loaded
+
+        with self._lock:
+            loaded = self._loaded.get(name)
+            if loaded is not None:
+                return loaded
+
+            entry = self.index.get(name)
+            if entry is None:
+                raise ConstructorLoadError('Constructor {} is not found in bundle {}'.format(name, self.path))
+
+            try:
+                filename = self._unpack(entry)
+            except OSError as exc:
+                raise ConstructorLoadError('Failed to unpack {} from bundle {}: {}'.format(name, self.path, exc))
+
+            if self._use_code:
+                try:
+                    content = marshal.loads(self._blob(entry['code']))
+                except (EOFError, ValueError, TypeError) as exc:
+                    raise ConstructorLoadError('Failed to load code of {} from bundle {}: {}'.format(
+                        name, self.path, exc))
+            else:
+                content = self._blob(entry['source'])
+
+            loaded = LoadedConstructor(filename, entry['content_hash'], None, None, None, content, entry)
+            loaded.result_cache = self.result_cache
+            loaded.profiler = self.profiler
+            loaded.linter = self.linter
+            self._loaded[name] = loaded
+
+            return loaded
+
+    def _unpack(self, entry):
+        """
+        Writes source and resource files of constructor, so they are found relative to its module file.
+
+        :raises ConstructorLoadError: if some path of the entry is outside of the unpack directory
+        :return: path of constructor file
+        """
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix='smartz-bundle-')
+
+        files = [(entry['path'], entry['source'])] + sorted(entry.get('resources', {}).items())
+        targets = []
+        for path, location in files:
+            target = os.path.normpath(os.path.join(self._directory, path)) if isinstance(path, str) else None
+            if target is None or os.path.isabs(path) \
+                    or os.path.commonpath([self._directory, target]) != self._directory or target == self._directory:
+                raise ConstructorLoadError('Path {!r} in bundle {} is outside of the bundle'.format(path, self.path))
+            targets.append((target, location))
+
+        for target, location in targets:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as fh:
+                fh.write(self._blob(location))
+
+        return targets[0][0]
+
+    def unload(self, name):
+        with self._lock:
+            loaded = self._loaded.pop(name, None)
+            if loaded is not None:
+                unload_constructor(loaded)
+
+    def close(self):
+        with self._lock:
+            for name in list(self._loaded):
+                self.unload(name)
+            self._mmap.close()
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(list(self._loaded.values()))
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.compile_cache
+#
+# Content-addressed store of compiled constructed sources.
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+
+from smartz.api.frozen import FrozenDict, freeze
+from smartz.eth.abi_model import abi_to_json, compact_abi, is_compact_abi
+
+
+class CompilationError(Exception):
+    """
+    Source can't be compiled.
+    """
+
+
+class CompilerBackend(metaclass=ABCMeta):
+    """
+    Compiler of constructed sources.
+    """
+
+    @abstractmethod
+    def get_version(self):
+        """
+        Version of the compiler, part of artifact key.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def compile(self, source, contract_name):
+        """
+        Compiles source.
+
+        :param source: source code string returned by construct()
+        :param contract_name: main contract name returned by construct()
+        :return: {
+            "abi": contract ABI,
+            "bytecode": hex string
+        }
+
+        or throws CompilationError.
+        """
+        raise NotImplementedError()
+
+
+class SolcBackend(CompilerBackend):
+    """
+    Compiles Solidity sources with solc binary.
+    """
+
+    def __init__(self, solc_path='solc'):
+        self.solc_path = solc_path
+        self._version = None
+
+    def get_version(self):
+        if self._version is None:
+            try:
+                output = subprocess.run([self.solc_path, '--version'], stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, check=True, universal_newlines=True).stdout
+            except (OSError, subprocess.CalledProcessError) as exc:
+                raise CompilationError('Failed to run {}: {}'.format(self.solc_path, exc))
+
+            self._version = output.strip().splitlines()[-1]
+
+        return self._version
+
+    def compile(self, source, contract_name):
+        try:
+            process = subprocess.run([self.solc_path, '--combined-json', 'abi,bin', '-'], input=source,
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        except OSError as exc:
+            raise CompilationError('Failed to run {}: {}'.format(self.solc_path, exc))
+
+        if process.returncode != 0:
+            raise CompilationError(process.stderr.strip())
+
+        try:
+            contracts = json.loads(process.stdout)['contracts']
+            for name, contract in contracts.items():
+                if name.rsplit(':', 1)[-1] == contract_name:
+                    abi = contract['abi']
+                    return {
+                        "abi": json.loads(abi) if isinstance(abi, str) else abi,
+                        "bytecode": contract['bin']
+                    }
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise CompilationError('Unexpected output of {}: {}: {}'.format(
+                self.solc_path, type(exc).__name__, exc))
+
+        raise CompilationError('Contract {} is not found in compiled source'.format(contract_name))
+
+
+class StubCompilerBackend(CompilerBackend):
+    """
+    Compiler stand-in for tests and local runs: returns predefined ABI and a bytecode derived from the source.
+    """
+
+    def __init__(self, abi=(), version='stub'):
+        self.abi = list(abi)
+        self.version = version
+        self.compilations = 0
+
+    def get_version(self):
+        return self.version
+
+    def compile(self, source, contract_name):
+        self.compilations += 1
+        return {
+            "abi": self.abi,
+            "bytecode": hashlib.sha256(source.encode('utf-8')).hexdigest()
+        }
+
+
+class ArtifactStore(object):
+    """
+    Compiled artifacts keyed by hash of source, contract name and compiler version.
+
+    Recently used artifacts are kept in memory, bounded by total size of their json encoding. If directory
+    is provided, all artifacts are also stored in files there (unbounded).
+
+    ABI of artifacts in memory is kept in compact form (see smartz.eth.abi_model) and converted back to json
+    shape when the artifact is returned.
+    """
+
+    def __init__(self, directory=None, max_size=64 * 1024 * 1024):
+        """
+        :param directory: directory of on-disk store, optional
+        :param max_size: max total size of artifacts in memory, bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.size = 0
+        # key -> (frozen artifact, size)
+        self._artifacts = OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(source, contract_name, compiler_version):
+        digest = hashlib.sha256()
+        for part in (compiler_version, contract_name, source):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        :return: frozen artifact or None
+        """
+        with self._lock:
+            entry = self._artifacts.get(key)
+            if entry is not None:
+                self._artifacts.move_to_end(key)
+                return _expand(entry[0])
+
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as fh:
+                encoded = fh.read()
+            artifact = freeze(json.loads(encoded))
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            self._remember(key, artifact, len(encoded))
+        return artifact
+
+    def put(self, key, artifact):
+        """
+        :return: frozen artifact
+        """
+        encoded = json.dumps(artifact)
+        frozen = freeze(artifact)
+        with self._lock:
+            self._remember(key, frozen, len(encoded))
+
+        if self.directory is not None:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                    fh.write(encoded)
+                os.replace(tmp_path, self._path(key))
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+
+        return frozen
+
+    def __contains__(self, key):
+        return key in self._artifacts or (self.directory is not None and os.path.exists(self._path(key)))
+
+    def __len__(self):
+        return len(self._artifacts)
+
+    def _remember(self, key, frozen, size):
+        if size > self.max_size:
+            return
+
+        old = self._artifacts.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+
+        self._artifacts[key] = (_compact(frozen), size)
+        self.size += size
+
+        while self.size > self.max_size:
+            _, (_, evicted_size) = self._artifacts.popitem(last=False)
+            self.size -= evicted_size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+
+def _compact(artifact):
+    abi = artifact.get('abi')
+    try:
+        return FrozenDict(artifact, abi=compact_abi(abi)) if abi else artifact
+    except (AttributeError, TypeError):
+        # not a list of ABI entries, kept as is
+        return artifact
+
+
+def _expand(artifact):
+    abi = artifact.get('abi')
+    return FrozenDict(artifact, abi=freeze(abi_to_json(abi))) if is_compact_abi(abi) else artifact
+
+
+class CachingCompiler(object):
+    """
+    Compiler which skips compilation of sources already present in artifact store.
+    """
+
+    def __init__(self, backend, store=None):
+        """
+        :param backend: CompilerBackend
+        :param store: ArtifactStore, in-memory one by default
+        """
+        self.backend = backend
+        self.store = store if store is not None else ArtifactStore()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def compile(self, source, contract_name):
+        """
+        Compiles source or takes its artifact from the store.
+
+        :return: frozen artifact (see CompilerBackend.compile()) with additional "key" of the artifact
+        """
+        key = self.store.make_key(source, contract_name, self.backend.get_version())
+        artifact = self.store.get(key)
+        if artifact is not None:
+            with self._lock:
+                self.hits += 1
+            return artifact
+
+        with self._lock:
+            self.misses += 1
+        artifact = dict(self.backend.compile(source, contract_name), key=key)
+        return self.store.put(key, artifact)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "artifacts": len(self.store),
+                "size": self.store.size
+            }
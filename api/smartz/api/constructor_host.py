@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.constructor_host
+#
+# Long-lived host which answers constructor calls over a JSON lines protocol.
+
+import json
+import os
+import socketserver
+import threading
+
+from smartz.api.compile_cache import CompilationError
+from smartz.api.constructor_registry import ConstructorLoadError
+
+
+class ConstructorHost(object):
+    """
+    Serves calls of constructors kept resident in a registry.
+
+    Each request is a json object: {
+        "id": any json value, echoed back,
+        "constructor": path to constructor file (name, if registry is a ConstructorBundle),
+            optional if host has default one,
+        "method": "get_version" | "get_params" | "construct" | "construct_many" | "construct_preview"
+            | "post_construct" | "compile" | "metrics" | "stats",
+        "params": {"fields": ..., "fields_list": ..., "abi_array": ..., "source": ..., "contract_name": ...}
+            # as required by the method
+    }
+
+    construct and construct_many accept optional "host_values" param: values of host-provided template slots,
+    e.g. {"payment_code": ...}, filled while the source is rendered.
+
+    construct_preview takes "fields" and optional "previous_state" ("preview_state" of previous response) and
+    "host_values". Its response carries "patch" of the previous source instead of "source" when only template
+    slots changed (see LoadedConstructor.construct_preview).
+
+    Each response is a json object: {
+        "id": id of the request,
+        "response": result of the constructor method
+    }
+
+    Response to get_params contains "fingerprint" of the params. If request passes the same
+    "fingerprint" in its params, schemas are omitted and response has "not_modified": true.
+
+    Method compile is available if host has a compiler (smartz.api.compile_cache.CachingCompiler),
+    it responds {"result": "success", "artifact": {"abi": .., "bytecode": .., "key": ..}}.
+
+    Method metrics is available if host has a metrics collector (smartz.api.profiling.MetricsCollector),
+    it responds {"result": "success", "metrics": Prometheus text, "slow_calls": [..]}.
+
+    Method stats responds {"result": "success", "lint": .., "compile": .., "result_cache": ..} with stats of
+    source linter, compiler and result cache which are configured.
+
+    If registry has a source linter (smartz.api.source_lint.SourceLinter), compile requests are linted
+    before compilation.
+
+    Exceptions thrown by constructor and malformed requests are reported as
+    {"result": "error", "error_descr": error string} response.
+    """
+
+    METHODS = {
+        'get_version': (),
+        'get_params': (),
+        'construct': ('fields',),
+        'construct_many': ('fields_list',),
+        'construct_preview': ('fields',),
+        'post_construct': ('fields', 'abi_array'),
+        'compile': ('source', 'contract_name'),
+        'metrics': (),
+        'stats': (),
+    }
+
+    # method -> optional params, passed as keyword arguments
+    OPTIONAL_PARAMS = {
+        'construct': ('host_values',),
+        'construct_many': ('host_values',),
+        'construct_preview': ('previous_state', 'host_values'),
+    }
+
+    def __init__(self, registry, default_filename=None, compiler=None, metrics=None):
+        """
+        :param registry: ConstructorRegistry or ConstructorBundle which loads constructors
+        :param default_filename: constructor file used by requests without "constructor" key
+        :param compiler: CachingCompiler for compile requests, optional
+        :param metrics: MetricsCollector for metrics requests, optional
+        """
+        self.registry = registry
+        self.default_filename = default_filename
+        self.compiler = compiler
+        self.metrics = metrics
+        # constructors are not required to be thread-safe
+        self._lock = threading.Lock()
+
+    def call(self, method, params, filename=None):
+        """
+        Calls constructor method.
+
+        :param method: constructor method name
+        :param params: dict of method arguments
+        :param filename: constructor file, default one if not provided
+        :return: constructor result
+        """
+        if not isinstance(method, str) or method not in self.METHODS:
+            return _error('Unknown method: {}'.format(method))
+
+        try:
+            args = [params[name] for name in self.METHODS[method]]
+        except (KeyError, TypeError):
+            return _error('Method {} requires params: {}'.format(method, ', '.join(self.METHODS[method])))
+        kwargs = {name: params[name] for name in self.OPTIONAL_PARAMS.get(method, ()) if name in params}
+
+        try:
+            if method == 'compile':
+                return self._compile(*args)
+            if method == 'metrics':
+                return self._metrics()
+            if method == 'stats':
+                return self._stats()
+
+            filename = filename or self.default_filename
+            if filename is None:
+                return _error('Constructor file is not specified')
+
+            with self._lock:
+                loaded = self.registry.get(filename)
+                if method == 'get_params':
+                    return self._get_params(loaded, params)
+                if method == 'construct_many':
+                    return {
+                        "result": "success",
+                        "results": list(loaded.construct_many(*args, **kwargs))
+                    }
+
+                return getattr(loaded, method)(*args, **kwargs)
+        except ConstructorLoadError as exc:
+            return _error(str(exc))
+        except Exception as exc:
+            return _error('{}: {}'.format(type(exc).__name__, exc))
+
+    @staticmethod
+    def _get_params(loaded, params):
+        result = loaded.get_params()
+        if result.get('result') != 'success':
+            return result
+
+        if params.get('fingerprint') == loaded.params_fingerprint:
+            return {
+                "result": "success",
+                "not_modified": True,
+                "fingerprint": loaded.params_fingerprint
+            }
+
+        return dict(result, fingerprint=loaded.params_fingerprint)
+
+    def _compile(self, source, contract_name):
+        if self.compiler is None:
+            return _error('Compiler is not configured')
+
+        linter = getattr(self.registry, 'linter', None)
+        if linter is not None:
+            result = linter.check_result({"result": "success", "source": source, "contract_name": contract_name})
+            if result.get('result') != 'success':
+                return result
+
+        try:
+            return {
+                "result": "success",
+                "artifact": self.compiler.compile(source, contract_name)
+            }
+        except CompilationError as exc:
+            return _error('Compilation failed: {}'.format(exc))
+
+    def _metrics(self):
+        if self.metrics is None:
+            return _error('Metrics are not configured')
+
+        return {
+            "result": "success",
+            "metrics": self.metrics.to_prometheus(),
+            "slow_calls": [
+                {key: value for key, value in call_profile._asdict().items() if value is not None}
+                for call_profile in list(self.metrics.slow_calls)
+            ]
+        }
+
+    def _stats(self):
+        result = {"result": "success"}
+
+        linter = getattr(self.registry, 'linter', None)
+        if linter is not None:
+            result['lint'] = linter.stats()
+        if self.compiler is not None:
+            result['compile'] = self.compiler.stats()
+        result_cache = getattr(self.registry, 'result_cache', None)
+        if result_cache is not None:
+            result['result_cache'] = result_cache.stats()
+
+        return result
+
+    def handle_line(self, line):
+        """
+        Handles one request line.
+
+        :param line: json-encoded request, str or utf-8 bytes
+        :return: json-encoded response (without line ending)
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('request must be an object')
+        except ValueError as exc:
+            return json.dumps({'id': None, 'response': _error('Malformed request: {}'.format(exc))})
+
+        response = self.call(request.get('method'), request.get('params') or {}, request.get('constructor'))
+        return json.dumps({'id': request.get('id'), 'response': response})
+
+    def serve_stream(self, in_stream, out_stream):
+        """
+        Serves requests from text stream until it's closed. Empty lines are ignored.
+        """
+        for line in in_stream:
+            if not line.strip():
+                continue
+
+            out_stream.write(self.handle_line(line))
+            out_stream.write('\n')
+            out_stream.flush()
+
+    def serve_unix_socket(self, path):
+        """
+        Serves requests on unix socket until interrupted. Each connection is a separate stream of requests.
+        """
+        host = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+
+                    # bytes are decoded by json.loads, so invalid utf-8 is answered as a malformed request
+                    self.wfile.write(host.handle_line(line).encode('utf-8') + b'\n')
+                    self.wfile.flush()
+
+        if os.path.exists(path):
+            os.unlink(path)
+
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            os.unlink(path)
+
+
+def _error(descr):
+    return {
+        "result": "error",
+        "error_descr": descr
+    }
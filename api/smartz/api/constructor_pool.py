@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.constructor_pool
+#
+# Parallel execution of constructor calls in a pool of worker processes.
+
+import multiprocessing
+import os
+import threading
+import time
+
+from smartz.api.constructor_registry import ConstructorRegistry
+
+
+# Registry of the current worker process, set by the pool initializer. Never set in the parent.
+_worker_registry = None
+
+
+class ConstructorPool(object):
+    """
+    Pool of worker processes with constructors preloaded in each of them.
+
+    Usage:
+        with ConstructorPool(['token.py']) as pool:
+            results = pool.construct_many('token.py', fields_list)
+    """
+
+    def __init__(self, filenames, processes=None, validate=True):
+        """
+        :param filenames: constructor files to preload
+        :param processes: number of workers, cpu count by default
+        :param validate: validate fields against get_params() schema before construct()
+        """
+        self.validate = validate
+        self._filenames = list(filenames)
+
+        registry = ConstructorRegistry()
+        for filename in self._filenames:
+            # imported before workers are forked even if it has a manifest
+            loaded = registry.get(filename).load()
+            if validate:
+                loaded.fields_validator
+
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # initargs of forked workers are not pickled: loaded modules, templates and compiled validators
+            # are shared copy-on-write
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+            registry = None
+
+        self._pool = context.Pool(processes, initializer=_init_worker,
+                                  initargs=(self._filenames, validate, registry))
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def construct(self, filename, fields):
+        return self._unpack(self._pool.apply(_call, ((filename, 'construct', (fields, self.validate)),)))
+
+    def post_construct(self, filename, fields, abi_array):
+        return self._unpack(self._pool.apply(_call, ((filename, 'post_construct', (fields, abi_array)),)))
+
+    def construct_many(self, filename, fields_iterable, chunksize=8):
+        """
+        Constructs contracts for many sets of fields in parallel.
+
+        :return: generator of construct() results, in order of fields_iterable
+        """
+        jobs = ((filename, 'construct', (fields, self.validate)) for fields in fields_iterable)
+        for result in self._pool.imap(_call, jobs, chunksize):
+            yield self._unpack(result)
+
+    def post_construct_many(self, filename, fields_abi_iterable, chunksize=8):
+        """
+        Calls post_construct() for many (fields, abi_array) pairs in parallel.
+
+        :return: generator of post_construct() results, in order of fields_abi_iterable
+        """
+        jobs = ((filename, 'post_construct', (fields, abi_array)) for fields, abi_array in fields_abi_iterable)
+        for result in self._pool.imap(_call, jobs, chunksize):
+            yield self._unpack(result)
+
+    def worker_stats(self):
+        """
+        Throughput of each worker.
+
+        :return: {pid: {"calls": int, "busy_time": seconds, "calls_per_second": float}}
+        """
+        with self._stats_lock:
+            return {
+                pid: {
+                    "calls": calls,
+                    "busy_time": busy_time,
+                    "calls_per_second": calls / busy_time if busy_time else 0.0
+                }
+                for pid, (calls, busy_time) in self._stats.items()
+            }
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def _unpack(self, call_result):
+        pid, elapsed, result = call_result
+        with self._stats_lock:
+            calls, busy_time = self._stats.get(pid, (0, 0.0))
+            self._stats[pid] = (calls + 1, busy_time + elapsed)
+
+        return result
+
+
+def _init_worker(filenames, validate, registry=None):
+    global _worker_registry
+
+    if registry is not None:
+        # forked, everything is already loaded
+        _worker_registry = registry
+        return
+
+    _worker_registry = ConstructorRegistry()
+    for filename in filenames:
+        loaded = _worker_registry.get(filename)
+        if validate:
+            loaded.fields_validator
+
+
+def _call(job):
+    filename, method, args = job
+    started = time.perf_counter()
+    try:
+        result = getattr(_worker_registry.get(filename), method)(*args)
+    except Exception as exc:
+        result = {
+            "result": "error",
+            "error_descr": '{}: {}'.format(type(exc).__name__, exc)
+        }
+
+    return os.getpid(), time.perf_counter() - started, result
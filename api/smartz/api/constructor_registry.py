@@ -0,0 +1,555 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.constructor_registry
+#
+# Loading of constructor files side by side in one process.
+
+import hashlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+import types
+
+from smartz.api.constructor_engine import ConstructorInstance
+from smartz.api.fields_validator import compile_fields_validator
+from smartz.api.frozen import fingerprint, freeze
+from smartz.api.function_titles import prune_function_specs
+from smartz.api.manifest import class_templates, constructor_dependencies, read_manifest
+from smartz.api.sample_fields import feature_axes, fields_matrix
+from smartz.api.template import fill_host_slots, render_context
+
+
+# absent field, differs from any json value
+_MISSING = object()
+
+
+class ConstructorLoadError(Exception):
+    """
+    Constructor file can't be loaded.
+    """
+
+
+class LoadedConstructor(object):
+    """
+    Constructor file loaded as a uniquely named module.
+
+    Calls of constructor methods should go through this object, it caches results which can be shared.
+
+    If constructor has an up-to-date manifest (see smartz.api.manifest), get_version() and get_params()
+    are answered from it and the module is imported on first access to module or instance.
+    """
+
+    def __init__(self, filename, content_hash, module, instance, stat_key, content=None, manifest=None):
+        """
+        :param module: imported module, None if import is deferred
+        :param instance: constructor instance, None if import is deferred
+        :param content: content of constructor file or its compiled code object, required if import is deferred
+        :param manifest: manifest of constructor file, optional
+        """
+        self.filename = filename
+        self.content_hash = content_hash
+        self._module = module
+        self._instance = instance
+        self._content = content
+        self._stat_key = stat_key
+        self._import_lock = threading.Lock()
+        self._version = None
+        self._params = None
+        self._params_fingerprint = None
+        self._output_fingerprint = None
+        if manifest is not None:
+            self._output_fingerprint = _output_fingerprint(content_hash, manifest['dependencies'])
+            self._version = freeze(manifest['version'])
+            self._params = freeze(manifest['params'])
+            self._params_fingerprint = manifest.get('params_fingerprint') or fingerprint(self._params)
+        self._fields_validator = None
+        # opt-in ConstructResultCache for deterministic constructors
+        self.result_cache = None
+        # opt-in CallProfiler measuring calls of constructor methods
+        self.profiler = None
+        # opt-in SourceLinter checking constructed sources
+        self.linter = None
+
+    @property
+    def key(self):
+        return self.filename, self.content_hash
+
+    def load(self):
+        """
+        Imports constructor module if its import was deferred.
+
+        :raises ConstructorLoadError: if constructor can't be imported
+        :return: self
+        """
+        if self._instance is None:
+            with self._import_lock:
+                if self._instance is None:
+                    self._module, self._instance = _import(self.filename, self._content, self.content_hash)
+                    self._content = None
+        return self
+
+    @property
+    def loaded(self):
+        """
+        Whether constructor module is imported.
+        """
+        return self._instance is not None
+
+    @property
+    def module(self):
+        return self.load()._module
+
+    @property
+    def instance(self):
+        return self.load()._instance
+
+    def _call(self, method, *args):
+        if self.profiler is None:
+            return getattr(self.instance, method)(*args)
+        return self.profiler.call(self.filename, method, getattr(self.instance, method), *args)
+
+    def get_version(self):
+        if self._version is not None:
+            return self._version
+        return self._call('get_version')
+
+    def get_params(self):
+        """
+        Result of get_params() of the constructor, computed once.
+
+        Returned data is frozen (see smartz.api.frozen) and shared between callers.
+        """
+        if self._params is None:
+            params = freeze(self._call('get_params'))
+            if params.get('result') != 'success':
+                # errors are not cached
+                return params
+
+            self._params_fingerprint = fingerprint(params)
+            self._params = params
+
+        return self._params
+
+    @property
+    def params_fingerprint(self):
+        """
+        Hash of canonical json of get_params() result, e.g. for ETag revalidation.
+        """
+        self.get_params()
+        return self._params_fingerprint
+
+    @property
+    def output_fingerprint(self):
+        """
+        Hash of constructor file and files its results depend on (see smartz.api.manifest.constructor_dependencies),
+        key of cached construct() results.
+        """
+        if self._output_fingerprint is None:
+            self._output_fingerprint = _output_fingerprint(self.content_hash, constructor_dependencies(self))
+        return self._output_fingerprint
+
+    @property
+    def blockchain(self):
+        return self.get_version().get('blockchain', 'ethereum')
+
+    @property
+    def fields_validator(self):
+        """
+        Validator of construct() fields compiled from get_params() schema (see smartz.api.fields_validator).
+        """
+        if self._fields_validator is None:
+            params = self.get_params()
+            if params.get('result') != 'success':
+                raise ValueError('get_params() failed: {}'.format(params.get('error_descr')))
+
+            self._fields_validator = compile_fields_validator(params['schema'], self.blockchain)
+
+        return self._fields_validator
+
+    def validate_fields(self, fields):
+        """
+        Validates fields against get_params() schema.
+
+        :return: None if fields are valid, construct() error result otherwise
+        """
+        errors = self.fields_validator(fields)
+        if errors is None:
+            return None
+
+        if isinstance(errors, dict):
+            return {
+                "result": "error",
+                "errors": errors
+            }
+
+        return {
+            "result": "error",
+            "error_descr": errors
+        }
+
+    def construct(self, fields, validate=True, host_values=None):
+        """
+        Calls construct() of the constructor.
+
+        If result cache is set, cached (frozen) result is returned for the same fields.
+
+        If linter is set, successful result with broken source (see smartz.api.source_lint) is turned into error.
+
+        Successful result lists shared snippets (see smartz.api.snippets) rendered into the source as
+        "snippets": [{"name": .., "version": .., "hash": ..}, ..].
+
+        :param fields: data provided by user
+        :param validate: validate fields against get_params() schema before calling constructor
+        :param host_values: values of host-provided slots of templates, e.g. {"payment_code": ...}. They are filled
+            while constructor renders its templates (see smartz.api.template.render_context)
+        """
+        cache_key = None
+        if self.result_cache is not None and validate:
+            cache_key = self.result_cache.make_key(
+                self.output_fingerprint, fields if not host_values else {"fields": fields, "host_values": host_values})
+            if cache_key is not None:
+                result = self.result_cache.get(cache_key)
+                if result is not None:
+                    return result
+
+        if validate:
+            error = self.validate_fields(fields)
+            if error is not None:
+                return error
+
+        with render_context(host_values) as context:
+            result = self._call('construct', fields)
+
+        if result.get('result') == 'success':
+            if host_values and not context.rendered:
+                # source was built without templates
+                result = dict(result, source=fill_host_slots(result['source'], host_values))
+            if context.snippets:
+                result = dict(result, snippets=[snippet.to_json() for snippet in context.snippets.values()])
+            if self.linter is not None:
+                result = self.linter.check_result(result, self.blockchain, context.host_slots)
+
+        if cache_key is not None:
+            result = self.result_cache.put(cache_key, result)
+
+        return result
+
+    def construct_many(self, fields_iterable, validate=True, host_values=None):
+        """
+        Calls construct() for each set of fields, reusing this constructor and its compiled validator.
+
+        Exception thrown for one set of fields is reported as its global error, the rest of the batch proceeds.
+
+        :param fields_iterable: iterable of fields
+        :param validate: validate fields against get_params() schema before calling constructor
+        :param host_values: values of host-provided slots of templates, see construct()
+        :return: generator of construct() results, in order of fields_iterable
+        """
+        if validate:
+            # compile it once before the batch
+            self.fields_validator
+
+        for fields in fields_iterable:
+            try:
+                yield self.construct(fields, validate, host_values)
+            except Exception as exc:
+                yield {
+                    "result": "error",
+                    "error_descr": '{}: {}'.format(type(exc).__name__, exc)
+                }
+
+    def construct_preview(self, fields, previous_state=None, validate=True, host_values=None):
+        """
+        Calls construct() for live preview of a form, answering with changes of the source since previous preview.
+
+        If the same constructor file rendered the same template skeleton for the previous preview (only slots
+        changed, not sections), result has "patch" instead of "source": list of
+        {"offset": .., "length": .., "replacement": ..}, offsets and lengths are in characters of previous source,
+        in ascending order. Full "source" is returned otherwise. construct() is called on each preview: results
+        are never taken from previous_state, which comes from the client. Result cache and linter are not used,
+        preview sources are not compiled.
+
+        :param fields: data provided by user
+        :param previous_state: "preview_state" of previous result, None for the first preview
+        :param validate: validate fields against get_params() schema before calling constructor
+        :param host_values: values of host-provided slots of templates, see construct()
+        :return: construct() result with "preview_state" and "changed_fields" (None for the first preview)
+        """
+        if not isinstance(previous_state, dict) or previous_state.get('content_hash') != self.content_hash:
+            # first preview or constructor was replaced since previous one
+            previous_state = None
+
+        previous_fields = previous_state.get('fields') if previous_state is not None else None
+        changed = None
+        if isinstance(previous_fields, dict) and isinstance(fields, dict):
+            changed = sorted(name for name in set(fields).union(previous_fields)
+                             if fields.get(name, _MISSING) != previous_fields.get(name, _MISSING))
+
+        if validate:
+            error = self.validate_fields(fields)
+            if error is not None:
+                return error
+
+        with render_context(host_values, capture=True) as context:
+            result = self._call('construct', fields)
+
+        if result.get('result') != 'success':
+            return result
+
+        source = result['source']
+        if host_values and not context.rendered:
+            source = fill_host_slots(source, host_values)
+
+        # the outermost template is rendered last
+        record = next((record for record in reversed(context.renders) if record.text == source), None)
+        patch = record.patch(previous_state.get('render')) \
+            if record is not None and previous_state is not None else None
+
+        result = dict(result, source=source, changed_fields=changed)
+        if context.snippets:
+            result['snippets'] = [snippet.to_json() for snippet in context.snippets.values()]
+
+        result['preview_state'] = {
+            "content_hash": self.content_hash,
+            "fields": fields,
+            "render": record.state() if record is not None else None
+        }
+        if patch is not None:
+            del result['source']
+            result['patch'] = patch
+
+        return result
+
+    @property
+    def feature_axes(self):
+        """
+        Discrete fields which select variant of constructed source: list of (field name, list of values).
+
+        Constructor class may declare them as FEATURE_AXES attribute (None value of a field means it's left out),
+        boolean and enum properties of get_params() schema are used otherwise.
+        """
+        declared = getattr(type(self.instance), 'FEATURE_AXES', None)
+        if declared is not None:
+            return [(name, list(values)) for name, values in declared]
+
+        params = self.get_params()
+        if params.get('result') != 'success':
+            return []
+        return feature_axes(params['schema'])
+
+    def warmup(self, max_variants=64):
+        """
+        Constructs each variant of feature axes, so skeletons of templates are rendered before requests come.
+
+        Only template skeletons are warmed: variants are constructed from sample field values, so their results
+        are not cached and not compiled, real requests would not hit such entries.
+
+        :param max_variants: max number of constructed variants
+        :return: {"variants": .., "failed": .., "skeletons": {template attribute: number of skeletons}, "seconds": ..}
+        """
+        started = time.perf_counter()
+        stats = {"variants": 0, "failed": 0}
+
+        params = self.get_params()
+        if params.get('result') == 'success':
+            for fields in fields_matrix(params['schema'], self.blockchain, max_variants, self.feature_axes):
+                stats['variants'] += 1
+                with render_context():
+                    result = self._call('construct', fields)
+                if result.get('result') != 'success':
+                    stats['failed'] += 1
+
+        stats['skeletons'] = {name: template.cached_skeletons
+                              for name, template in class_templates(type(self.instance)).items()}
+        stats['seconds'] = time.perf_counter() - started
+        return stats
+
+    def post_construct(self, fields, abi_array, prune=True):
+        """
+        Calls post_construct() of the constructor.
+
+        :param fields: fields data provided during construct
+        :param abi_array: Ethereum ABI of compiled contract
+        :param prune: drop function_specs and dashboard_functions of functions which are not present in ABI
+        """
+        result = self._call('post_construct', fields, abi_array)
+        if not prune or result.get('result') != 'success':
+            return result
+
+        function_specs, dashboard_functions, unmatched = prune_function_specs(
+            result.get('function_specs', {}), result.get('dashboard_functions', []), abi_array)
+        if not unmatched:
+            return result
+
+        return dict(result, function_specs=function_specs, dashboard_functions=dashboard_functions)
+
+
+def load_constructor(filename, use_manifest=True):
+    """
+    Loads constructor file under a module name unique to its path and content.
+
+    Nothing is added to sys.path, so any number of constructors can be loaded at once.
+
+    :param filename: path to constructor file
+    :param use_manifest: defer import if constructor has an up-to-date manifest
+    :return: LoadedConstructor
+    """
+    filename = os.path.realpath(filename)
+    try:
+        stat_key = _stat_key(filename)
+        with open(filename, 'rb') as fh:
+            content = fh.read()
+    except OSError as exc:
+        raise ConstructorLoadError('Failed to read file {}: {}'.format(filename, exc))
+
+    return _load(filename, content, stat_key, use_manifest)
+
+
+def unload_constructor(loaded):
+    module = loaded._module
+    if module is not None and sys.modules.get(module.__name__) is module:
+        del sys.modules[module.__name__]
+
+
+class ConstructorRegistry(object):
+    """
+    Keeps many loaded constructors resident, one per file path.
+
+    Files are checked for modifications on each get() and reloaded if their content changed.
+    """
+
+    def __init__(self, result_cache=None, profiler=None, use_manifests=True, linter=None):
+        """
+        :param result_cache: ConstructResultCache shared by loaded constructors, optional
+        :param profiler: CallProfiler shared by loaded constructors, optional
+        :param use_manifests: defer import of constructors which have up-to-date manifests
+        :param linter: SourceLinter shared by loaded constructors, optional
+        """
+        self.result_cache = result_cache
+        self.profiler = profiler
+        self.use_manifests = use_manifests
+        self.linter = linter
+        self._loaded = {}
+        self._lock = threading.RLock()
+
+    def get(self, filename):
+        """
+        Gets loaded constructor, loading or reloading it if needed.
+
+        :param filename: path to constructor file
+        :return: LoadedConstructor
+        """
+        filename = os.path.realpath(filename)
+        loaded = self._loaded.get(filename)
+        try:
+            stat_key = _stat_key(filename)
+        except OSError as exc:
+            raise ConstructorLoadError('Failed to read file {}: {}'.format(filename, exc))
+
+        if loaded is not None and loaded._stat_key == stat_key:
+            return loaded
+
+        with self._lock:
+            loaded = self._loaded.get(filename)
+            if loaded is not None and loaded._stat_key == stat_key:
+                return loaded
+
+            try:
+                with open(filename, 'rb') as fh:
+                    content = fh.read()
+            except OSError as exc:
+                raise ConstructorLoadError('Failed to read file {}: {}'.format(filename, exc))
+
+            if loaded is not None and loaded.content_hash == _content_hash(content):
+                # touched but not modified
+                loaded._stat_key = stat_key
+                return loaded
+
+            new_loaded = _load(filename, content, stat_key, self.use_manifests)
+            new_loaded.result_cache = self.result_cache
+            new_loaded.profiler = self.profiler
+            new_loaded.linter = self.linter
+            if loaded is not None:
+                unload_constructor(loaded)
+            self._loaded[filename] = new_loaded
+
+            return new_loaded
+
+    def unload(self, filename):
+        with self._lock:
+            loaded = self._loaded.pop(os.path.realpath(filename), None)
+            if loaded is not None:
+                unload_constructor(loaded)
+
+    def __contains__(self, filename):
+        return os.path.realpath(filename) in self._loaded
+
+    def __len__(self):
+        return len(self._loaded)
+
+    def __iter__(self):
+        return iter(list(self._loaded.values()))
+
+
+def _load(filename, content, stat_key, use_manifest):
+    content_hash = _content_hash(content)
+    if use_manifest:
+        manifest = read_manifest(filename, content_hash)
+        if manifest is not None:
+            return LoadedConstructor(filename, content_hash, None, None, stat_key, content, manifest)
+
+    module, instance = _import(filename, content, content_hash)
+    return LoadedConstructor(filename, content_hash, module, instance, stat_key)
+
+
+def _import(filename, content, content_hash):
+    """
+    :param content: content of constructor file or its compiled code object
+    :return: (module, constructor instance)
+    """
+    path_hash = hashlib.sha256(filename.encode('utf-8')).hexdigest()
+    module_name = 'smartz_constructor_{}_{}'.format(path_hash[:12], content_hash[:12])
+
+    spec = importlib.util.spec_from_file_location(module_name, filename)
+    if spec is None:
+        raise ConstructorLoadError('Failed to import file {} as a module'.format(filename))
+    module = importlib.util.module_from_spec(spec)
+
+    sys.modules[module_name] = module
+    try:
+        code = content if isinstance(content, types.CodeType) else compile(content, filename, 'exec')
+        exec(code, module.__dict__)
+    except Exception as exc:
+        del sys.modules[module_name]
+        raise ConstructorLoadError('Failed to import file {} as a module: {}'.format(filename, exc))
+
+    if not isinstance(getattr(module, 'Constructor', None), type):
+        del sys.modules[module_name]
+        raise ConstructorLoadError('Constructor class in not found in the file {}'.format(filename))
+
+    try:
+        instance = module.Constructor()
+    except Exception as exc:
+        del sys.modules[module_name]
+        raise ConstructorLoadError('Failed to instantiate constructor from the file {}: {}'.format(filename, exc))
+
+    if not isinstance(instance, ConstructorInstance):
+        del sys.modules[module_name]
+        raise ConstructorLoadError('Constructor is not an instance of the type ConstructorInstance')
+
+    return module, instance
+
+
+def _output_fingerprint(content_hash, dependencies):
+    return fingerprint({"content_hash": content_hash, "dependencies": dependencies})
+
+
+def _content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def _stat_key(filename):
+    st = os.stat(filename)
+    return st.st_mtime_ns, st.st_size
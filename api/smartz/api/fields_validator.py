@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.fields_validator
+#
+# Validation of construct() fields against json schema returned by get_params().
+#
+# Schema is compiled once into a tree of closures with precompiled regexes. Supported subset of draft-04:
+# type, enum, minLength, maxLength, pattern, minimum, maximum, exclusiveMinimum, exclusiveMaximum,
+# required, properties, additionalProperties, items, minItems, maxItems, uniqueItems, allOf, $ref.
+# Validation keywords outside of the subset (anyOf, oneOf, not etc.) raise SchemaCompileError instead of
+# being skipped, annotations (title, description, default, format etc.) are ignored.
+
+import json
+import operator
+import os
+import re
+from functools import lru_cache
+
+
+SCHEMAS_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'json-schema'))
+
+BLOCKCHAIN_DEFINITIONS_FILES = {
+    'ethereum': 'ethereum-sc.json',
+    'eos': 'eos-sc.json',
+}
+
+
+class SchemaCompileError(Exception):
+    """
+    Schema uses unsupported constructions or references missing definitions.
+    """
+
+
+@lru_cache(maxsize=None)
+def blockchain_definitions(blockchain):
+    """
+    Definitions of the platform schema for blockchain (see json-schema/ethereum-sc.json etc.)
+    """
+    with open(os.path.join(SCHEMAS_DIR, BLOCKCHAIN_DEFINITIONS_FILES[blockchain])) as fh:
+        return json.load(fh)['definitions']
+
+
+def compile_fields_validator(schema, blockchain='ethereum'):
+    """
+    Compiles fields schema into validator function.
+
+    Validator returns None for valid fields. Otherwise it returns errors in the shape used by construct():
+    error string for a field, dict of errors for object fields (arrays: dict of item index to error).
+    If the root of the fields is invalid, error string is returned instead of dict.
+
+    :param schema: json schema from get_params()
+    :param blockchain: blockchain of the constructor, selects platform definitions
+    :return: function(fields) -> None | dict | str
+    """
+    definitions = dict(blockchain_definitions(blockchain))
+    definitions.update(schema.get('definitions') or {})
+
+    return compile_validator(schema, definitions)
+
+
+def compile_validator(schema, definitions):
+    """
+    Compiles any json schema of the supported subset into validator function.
+
+    :param schema: json schema
+    :param definitions: dict used to resolve #/definitions/... references
+    :return: function(data) -> None | dict | str, see compile_fields_validator()
+    """
+    return _Compiler(definitions).compile(schema)
+
+
+@lru_cache(maxsize=None)
+def constructor_definitions():
+    """
+    Definitions of json-schema/constructor.json (ETHFunctionAdditionalDescriptions etc.)
+    """
+    with open(os.path.join(SCHEMAS_DIR, 'constructor.json')) as fh:
+        return json.load(fh)['definitions']
+
+
+_TYPE_CHECKS = {
+    'string': lambda value: isinstance(value, str),
+    'integer': lambda value: isinstance(value, int) and not isinstance(value, bool),
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'boolean': lambda value: isinstance(value, bool),
+    'object': lambda value: isinstance(value, dict),
+    'array': lambda value: isinstance(value, (list, tuple)),
+    'null': lambda value: value is None,
+}
+
+_UNSUPPORTED_KEYWORDS = ('anyOf', 'oneOf', 'not', 'dependencies', 'patternProperties', 'additionalItems',
+                         'multipleOf', 'minProperties', 'maxProperties')
+
+
+class _Compiler(object):
+
+    def __init__(self, definitions):
+        self._definitions = definitions
+        self._refs = {}
+
+    def compile(self, schema):
+        for keyword in _UNSUPPORTED_KEYWORDS:
+            if keyword in schema:
+                raise SchemaCompileError('Unsupported keyword: {}'.format(keyword))
+
+        checks = []
+
+        if '$ref' in schema:
+            checks.append(self._compile_ref(schema['$ref']))
+
+        for sub_schema in schema.get('allOf', ()):
+            checks.append(self.compile(sub_schema))
+
+        if 'type' in schema:
+            checks.append(self._compile_type(schema['type']))
+
+        if 'enum' in schema:
+            checks.append(self._compile_enum(schema['enum']))
+
+        checks.extend(self._compile_string(schema))
+        checks.extend(self._compile_number(schema))
+        checks.extend(self._compile_array(schema))
+
+        if 'properties' in schema or 'required' in schema or 'additionalProperties' in schema:
+            checks.append(self._compile_object(schema))
+
+        if not checks:
+            return _valid
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value):
+            for check in checks:
+                error = check(value)
+                if error is not None:
+                    return error
+            return None
+
+        return check_all
+
+    def _compile_ref(self, ref):
+        if ref in self._refs:
+            return self._refs[ref]
+
+        if not ref.startswith('#/definitions/') or ref[len('#/definitions/'):] not in self._definitions:
+            raise SchemaCompileError('Unresolvable reference: {}'.format(ref))
+
+        # placeholder makes recursive references work
+        compiled = []
+        self._refs[ref] = lambda value: compiled[0](value)
+        compiled.append(self.compile(self._definitions[ref[len('#/definitions/'):]]))
+        self._refs[ref] = compiled[0]
+
+        return compiled[0]
+
+    @staticmethod
+    def _compile_type(types):
+        if isinstance(types, str):
+            types = [types]
+        try:
+            type_checks = [_TYPE_CHECKS[type_] for type_ in types]
+        except KeyError as exc:
+            raise SchemaCompileError('Unknown type: {}'.format(exc.args[0]))
+
+        message = 'Must be of type {}'.format(' or '.join(types))
+
+        if len(type_checks) == 1:
+            type_check = type_checks[0]
+            return lambda value: None if type_check(value) else message
+
+        return lambda value: None if any(check(value) for check in type_checks) else message
+
+    @staticmethod
+    def _compile_enum(variants):
+        # 1 == True in python, so types are compared as well
+        allowed = {(type(variant), json.dumps(variant, sort_keys=True)) for variant in variants}
+        message = 'Must be one of: {}'.format(', '.join(json.dumps(variant) for variant in variants))
+
+        def check_enum(value):
+            try:
+                key = (type(value), json.dumps(value, sort_keys=True))
+            except TypeError:
+                return message
+            return None if key in allowed else message
+
+        return check_enum
+
+    @staticmethod
+    def _compile_string(schema):
+        checks = []
+
+        if 'minLength' in schema:
+            checks.append(_bound_check(
+                _TYPE_CHECKS['string'], len, schema['minLength'], operator.lt,
+                'Must be at least {} characters long'))
+
+        if 'maxLength' in schema:
+            checks.append(_bound_check(
+                _TYPE_CHECKS['string'], len, schema['maxLength'], operator.gt,
+                'Must be at most {} characters long'))
+
+        if 'pattern' in schema:
+            checks.append(_pattern_check(schema['pattern']))
+
+        return checks
+
+    @staticmethod
+    def _compile_number(schema):
+        checks = []
+
+        if 'minimum' in schema:
+            if schema.get('exclusiveMinimum'):
+                checks.append(_bound_check(
+                    _TYPE_CHECKS['number'], None, schema['minimum'], operator.le, 'Must be greater than {}'))
+            else:
+                checks.append(_bound_check(
+                    _TYPE_CHECKS['number'], None, schema['minimum'], operator.lt,
+                    'Must be greater than or equal to {}'))
+
+        if 'maximum' in schema:
+            if schema.get('exclusiveMaximum'):
+                checks.append(_bound_check(
+                    _TYPE_CHECKS['number'], None, schema['maximum'], operator.ge, 'Must be less than {}'))
+            else:
+                checks.append(_bound_check(
+                    _TYPE_CHECKS['number'], None, schema['maximum'], operator.gt,
+                    'Must be less than or equal to {}'))
+
+        return checks
+
+    def _compile_array(self, schema):
+        checks = []
+
+        if 'minItems' in schema:
+            checks.append(_bound_check(
+                _TYPE_CHECKS['array'], len, schema['minItems'], operator.lt, 'Must contain at least {} items'))
+
+        if 'maxItems' in schema:
+            checks.append(_bound_check(
+                _TYPE_CHECKS['array'], len, schema['maxItems'], operator.gt, 'Must contain at most {} items'))
+
+        if schema.get('uniqueItems'):
+            def check_unique(value):
+                if not isinstance(value, (list, tuple)):
+                    return None
+                seen = set()
+                for item in value:
+                    key = json.dumps(item, sort_keys=True)
+                    if key in seen:
+                        return 'Items must be unique'
+                    seen.add(key)
+                return None
+
+            checks.append(check_unique)
+
+        if 'items' in schema:
+            checks.append(self._compile_items(schema['items']))
+
+        return checks
+
+    def _compile_items(self, items):
+        if isinstance(items, dict):
+            item_check = self.compile(items)
+            item_checks = None
+        else:
+            item_check = None
+            item_checks = [self.compile(item) for item in items]
+
+        def check_items(value):
+            if not isinstance(value, (list, tuple)):
+                return None
+
+            errors = {}
+            for idx, item in enumerate(value):
+                if item_check is not None:
+                    error = item_check(item)
+                elif idx < len(item_checks):
+                    error = item_checks[idx](item)
+                else:
+                    break
+
+                if error is not None:
+                    errors[idx] = error
+
+            return errors or None
+
+        return check_items
+
+    def _compile_object(self, schema):
+        properties = [(name, self.compile(sub_schema)) for name, sub_schema in schema.get('properties', {}).items()]
+        known = set(schema.get('properties', ()))
+        required = list(schema.get('required', ()))
+
+        additional = schema.get('additionalProperties', True)
+        if additional is True:
+            additional_check = None
+        elif additional is False:
+            additional_check = False
+        else:
+            additional_check = self.compile(additional)
+
+        def check_object(value):
+            if not isinstance(value, dict):
+                return None
+
+            errors = {}
+            for name in required:
+                if name not in value:
+                    errors[name] = 'This field is required'
+
+            for name, check in properties:
+                if name in value:
+                    error = check(value[name])
+                    if error is not None:
+                        errors[name] = error
+
+            if additional_check is not None:
+                for name in value:
+                    if name in known:
+                        continue
+                    if additional_check is False:
+                        errors[name] = 'Unknown field'
+                    else:
+                        error = additional_check(value[name])
+                        if error is not None:
+                            errors[name] = error
+
+            return errors or None
+
+        return check_object
+
+
+def _valid(value):
+    return None
+
+
+def _bound_check(applies_to, measure, bound, violates, message):
+    """
+    Check which fails if violates(measure(value), bound) for values accepted by applies_to.
+    """
+    message = message.format(bound)
+
+    if measure is None:
+        return lambda value: message if applies_to(value) and violates(value, bound) else None
+
+    return lambda value: message if applies_to(value) and violates(measure(value), bound) else None
+
+
+def _pattern_check(pattern):
+    try:
+        search = re.compile(pattern).search
+    except re.error as exc:
+        raise SchemaCompileError('Invalid pattern {}: {}'.format(pattern, exc))
+
+    message = 'Must match pattern {}'.format(pattern)
+
+    return lambda value: message if isinstance(value, str) and search(value) is None else None
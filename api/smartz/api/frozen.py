@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.frozen
+#
+# Immutable views of json-like data which are safe to share between callers.
+
+import hashlib
+import json
+
+
+class FrozenDict(dict):
+    """
+    Dict which can't be modified. Still a dict, so it's json-serializable as is.
+    """
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('FrozenDict can not be modified')
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        return hash(tuple(sorted(self.items(), key=lambda item: item[0])))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(data):
+    """
+    Recursively converts json-like data to immutable one: dicts to FrozenDict, lists to tuples.
+    """
+    if isinstance(data, FrozenDict):
+        return data
+    if isinstance(data, dict):
+        return FrozenDict((key, freeze(value)) for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze(item) for item in data)
+
+    return data
+
+
+def thaw(data):
+    """
+    Recursively converts frozen data back to mutable dicts and lists.
+    """
+    if isinstance(data, dict):
+        return {key: thaw(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [thaw(item) for item in data]
+
+    return data
+
+
+def canonical_json(data):
+    """
+    Json encoding which is the same for equal data regardless of key order.
+    """
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def fingerprint(data):
+    """
+    Stable hash of json-like data.
+    """
+    return hashlib.sha256(canonical_json(data).encode('utf-8')).hexdigest()
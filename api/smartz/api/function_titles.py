@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.function_titles
+#
+# Static post_construct() metadata declared once per constructor class.
+
+import json
+import threading
+
+from smartz.api.fields_validator import compile_validator, constructor_definitions
+from smartz.api.frozen import FrozenDict, freeze
+from smartz.eth.abi import abi_function_names, parse_signature
+
+
+class FunctionTitlesError(ValueError):
+    """
+    Function titles don't match ETHFunctionAdditionalDescriptions schema.
+    """
+
+
+_validator = None
+_validator_lock = threading.Lock()
+
+
+def _validate(titles):
+    global _validator
+
+    with _validator_lock:
+        if _validator is None:
+            _validator = compile_validator({'$ref': '#/definitions/ETHFunctionAdditionalDescriptions'},
+                                           constructor_definitions())
+
+    errors = _validator(titles)
+    if errors is not None:
+        raise FunctionTitlesError('Function titles are invalid: {}'.format(json.dumps(errors)))
+
+
+def prune_function_specs(function_specs, dashboard_functions, abi_array):
+    """
+    Drops titles and dashboard functions of functions which are not present in ABI.
+
+    :param function_specs: ETHFunctionAdditionalDescriptions or list of ETHFunctionSpec, as returned by
+        post_construct(). Keys like "transfer(address,uint256)" are matched by function name
+    :param dashboard_functions: list of function names
+    :param abi_array: Ethereum ABI of compiled contract
+    :return: (function_specs, dashboard_functions, sorted list of unmatched names). Passed objects are returned
+        as is if nothing was dropped
+    """
+    abi_names = abi_function_names(abi_array)
+
+    def in_abi(name):
+        if name in abi_names:
+            return True
+        signature = parse_signature(name)
+        return signature is not None and signature[0] in abi_names
+
+    unmatched = set()
+    if isinstance(function_specs, dict):
+        unmatched.update(name for name in function_specs if not in_abi(name))
+        if unmatched:
+            function_specs = {name: info for name, info in function_specs.items() if name not in unmatched}
+    else:
+        unmatched_specs = [spec for spec in function_specs if spec['name'] not in abi_names]
+        if unmatched_specs:
+            unmatched.update(spec['name'] for spec in unmatched_specs)
+            function_specs = [spec for spec in function_specs if spec['name'] in abi_names]
+
+    unmatched_dashboard = [name for name in dashboard_functions if name not in abi_names]
+    if unmatched_dashboard:
+        unmatched.update(unmatched_dashboard)
+        dashboard_functions = [name for name in dashboard_functions if name in abi_names]
+
+    return function_specs, dashboard_functions, sorted(unmatched)
+
+
+class FunctionTitles(object):
+    """
+    Function titles and dashboard functions of a constructor, declared as class attribute:
+
+        _FUNCTION_TITLES = FunctionTitles({
+            'mint': {'title': 'Mint new tokens', ...},
+            ...
+        }, dashboard_functions=['symbol', 'totalSupply'])
+
+        def post_construct(self, fields, abi_array):
+            return self._FUNCTION_TITLES.post_construct_result(abi_array)
+
+    Titles are validated against ETHFunctionAdditionalDescriptions (see json-schema/constructor.json) and frozen
+    when class is defined, so post_construct() only filters them by functions present in ABI.
+    """
+
+    def __init__(self, titles, dashboard_functions=()):
+        """
+        :param titles: ETHFunctionAdditionalDescriptions
+        :param dashboard_functions: list of function names
+        :raises FunctionTitlesError: if titles are invalid
+        """
+        _validate(titles)
+
+        self.titles = freeze(titles)
+        # title key -> function name, keys may be signatures like "transfer(address,uint256)"
+        self._function_names = {key: (parse_signature(key) or (key,))[0] for key in self.titles}
+        self.dashboard_functions = tuple(dashboard_functions)
+        self._full_result = freeze({
+            "result": "success",
+            "function_specs": self.titles,
+            "dashboard_functions": self.dashboard_functions
+        })
+        # frozenset of matched names -> result
+        self._results = {}
+
+    def post_construct_result(self, abi_array):
+        """
+        post_construct() result with titles of functions present in ABI.
+
+        :param abi_array: Ethereum ABI of compiled contract
+        :return: frozen result, shared between calls
+        """
+        abi_names = abi_function_names(abi_array)
+
+        matched = {key for key, name in self._function_names.items() if name in abi_names}
+        if len(matched) == len(self.titles) and abi_names.issuperset(self.dashboard_functions):
+            return self._full_result
+
+        matched = frozenset(matched.union(abi_names.intersection(self.dashboard_functions)))
+        result = self._results.get(matched)
+        if result is None:
+            result = FrozenDict({
+                "result": "success",
+                "function_specs": FrozenDict((name, info) for name, info in self.titles.items() if name in matched),
+                "dashboard_functions": tuple(name for name in self.dashboard_functions if name in matched)
+            })
+            self._results[matched] = result
+
+        return result
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.json_stream
+#
+# Writing of json documents to a stream in chunks.
+#
+# Constructed sources may be large, so long strings are encoded and written slice by slice
+# instead of building the whole document in memory first. No pretty-printing is done.
+
+import json
+
+
+CHUNK_SIZE = 64 * 1024
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def write_json(data, out, chunk_size=CHUNK_SIZE):
+    """
+    Writes compact json encoding of data to text stream.
+
+    Top level dict or list is written item by item, long strings among its items are written in slices.
+    Other items are encoded at once.
+
+    :param data: json-like data
+    :param out: text stream
+    :param chunk_size: max length of string slice encoded at once
+    """
+    if isinstance(data, dict):
+        out.write('{')
+        first = True
+        for key, value in data.items():
+            if not first:
+                out.write(',')
+            first = False
+            out.write(_encode(key if isinstance(key, str) else _encode(key)))
+            out.write(':')
+            _write_value(value, out, chunk_size)
+        out.write('}')
+
+    elif isinstance(data, (list, tuple)):
+        out.write('[')
+        for idx, item in enumerate(data):
+            if idx:
+                out.write(',')
+            _write_value(item, out, chunk_size)
+        out.write(']')
+
+    else:
+        _write_value(data, out, chunk_size)
+
+
+def _write_value(value, out, chunk_size):
+    if isinstance(value, str) and len(value) > chunk_size:
+        out.write('"')
+        for start in range(0, len(value), chunk_size):
+            out.write(_encode(value[start:start + chunk_size])[1:-1])
+        out.write('"')
+    else:
+        out.write(_encode(value))
+
+
+def write_json_lines(items, out, chunk_size=CHUNK_SIZE):
+    """
+    Writes each item as a json document on its own line.
+    """
+    for item in items:
+        write_json(item, out, chunk_size)
+        out.write('\n')
+
+
+def write_json_array(items, out, chunk_size=CHUNK_SIZE):
+    """
+    Writes items as a json array without collecting them first.
+    """
+    out.write('[')
+    for idx, item in enumerate(items):
+        if idx:
+            out.write(',\n')
+        write_json(item, out, chunk_size)
+    out.write(']\n')
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.manifest
+#
+# Manifest of a constructor file: results of get_version() and get_params() stored next to it,
+# so they can be answered without importing the constructor.
+#
+# Manifest is valid while the constructor file and files it depends on are unchanged: resource files
+# (see smartz.api.resources) and snippets included by its templates (see smartz.api.snippets).
+
+import hashlib
+import json
+import os
+
+from smartz.api.frozen import thaw
+from smartz.api.resources import LazyResource, declared_resources
+from smartz.api.template import Template
+
+
+MANIFEST_SUFFIX = '.manifest.json'
+
+MANIFEST_FORMAT = 2
+
+
+def manifest_path(filename):
+    """
+    Path of manifest of constructor file: token.py -> token.manifest.json
+    """
+    return os.path.splitext(filename)[0] + MANIFEST_SUFFIX
+
+
+def path_hash(path):
+    """
+    sha256 of file content or of sorted listing of directory, None if it can't be read.
+    """
+    try:
+        if os.path.isdir(path):
+            return hashlib.sha256('\n'.join(sorted(os.listdir(path))).encode('utf-8')).hexdigest()
+        with open(path, 'rb') as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def class_templates(cls):
+    """
+    Template attributes of constructor class and its bases, including ones loaded by resource().
+
+    :return: dict attribute name -> Template
+    """
+    attrs = {}
+    for klass in reversed(cls.__mro__):
+        attrs.update(vars(klass))
+
+    result = {}
+    for name, value in sorted(attrs.items()):
+        if isinstance(value, LazyResource):
+            value = getattr(cls, name)
+        if isinstance(value, Template):
+            result[name] = value
+    return result
+
+
+def constructor_dependencies(loaded):
+    """
+    Files which constructor results depend on besides the constructor file: resource files declared by its class
+    and snippets included by its templates. For snippets included without version, directory of their versions
+    is a dependency too.
+
+    :param loaded: LoadedConstructor
+    :return: dict path relative to the directory of constructor file -> hash (see path_hash())
+    """
+    cls = type(loaded.instance)
+    paths = [resource.filename for resource in declared_resources(cls).values()]
+    for template in class_templates(cls).values():
+        paths.extend(template.snippet_files)
+
+    directory = os.path.dirname(loaded.filename)
+    return {os.path.relpath(path, directory): path_hash(path) for path in paths}
+
+
+def dependencies_changed(filename, dependencies):
+    """
+    Checks files recorded by constructor_dependencies().
+
+    :param filename: constructor file
+    """
+    directory = os.path.dirname(filename)
+    return any(path_hash(os.path.join(directory, path)) != digest for path, digest in dependencies.items())
+
+
+def build_manifest(loaded):
+    """
+    Manifest of loaded constructor.
+
+    :param loaded: LoadedConstructor
+    :return: json-like dict
+    :raises ValueError: if get_version() or get_params() failed, such results are not stored
+    """
+    version = thaw(loaded.get_version())
+    if version.get('result') != 'success':
+        raise ValueError('get_version() failed: {}'.format(version.get('error_descr')))
+
+    params = thaw(loaded.get_params())
+    if params.get('result') != 'success':
+        raise ValueError('get_params() failed: {}'.format(params.get('error_descr')))
+
+    return {
+        "format": MANIFEST_FORMAT,
+        "content_hash": loaded.content_hash,
+        "version": version,
+        "params": params,
+        "params_fingerprint": loaded.params_fingerprint,
+        "dependencies": constructor_dependencies(loaded),
+    }
+
+
+def write_manifest(loaded, path=None):
+    """
+    Writes manifest of loaded constructor, next to its file by default.
+
+    :return: path of written manifest
+    """
+    path = path or manifest_path(loaded.filename)
+    manifest = build_manifest(loaded)
+
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'w') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def read_manifest(filename, content_hash):
+    """
+    Reads manifest of constructor file.
+
+    :param filename: constructor file
+    :param content_hash: hash of current content of constructor file
+    :return: manifest dict, None if there is no manifest or it was built for another content of constructor file
+        or of its dependencies
+    """
+    try:
+        with open(manifest_path(filename)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get('format') != MANIFEST_FORMAT \
+            or manifest.get('content_hash') != content_hash:
+        return None
+
+    dependencies = manifest.get('dependencies')
+    if not isinstance(dependencies, dict) or dependencies_changed(filename, dependencies):
+        return None
+
+    return manifest
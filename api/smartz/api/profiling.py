@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.profiling
+#
+# Opt-in instrumentation of constructor method calls.
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque, namedtuple
+
+
+class CallProfile(namedtuple('CallProfile', 'filename method wall_time cpu_time peak_memory output_size '
+                                            'result profile')):
+    """
+    Measurements of one constructor method call.
+
+    wall_time and cpu_time are in seconds. peak_memory (bytes allocated at peak during the call) and
+    profile (pstats text) are None unless enabled in CallProfiler. result is "success", "error"
+    or "exception" if the call raised.
+    """
+    __slots__ = ()
+
+
+class CallProfiler(object):
+    """
+    Measures calls of constructor methods and passes CallProfile to callbacks.
+
+    Set as profiler of LoadedConstructor or ConstructorRegistry, constructors themselves are not modified.
+    """
+
+    def __init__(self, callbacks=(), trace_memory=False, cprofile=False, cprofile_limit=30):
+        """
+        :param callbacks: callables taking CallProfile, e.g. MetricsCollector
+        :param trace_memory: measure peak memory of calls with tracemalloc (slows calls down noticeably)
+        :param cprofile: capture cProfile stats of each call
+        :param cprofile_limit: number of functions in captured stats, by cumulative time
+        """
+        self.callbacks = list(callbacks)
+        self.trace_memory = trace_memory
+        self.cprofile = cprofile
+        self.cprofile_limit = cprofile_limit
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def call(self, filename, method, func, *args):
+        """
+        Calls func(*args) measuring it.
+
+        :param filename: constructor file
+        :param method: constructor method name
+        :return: result of func
+        """
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        profiler = cProfile.Profile() if self.cprofile else None
+
+        result = None
+        status = 'exception'
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            if profiler is not None:
+                result = profiler.runcall(func, *args)
+            else:
+                result = func(*args)
+            status = 'error' if isinstance(result, dict) and result.get('result') == 'error' else 'success'
+            return result
+        finally:
+            cpu_time = time.process_time() - cpu_started
+            wall_time = time.perf_counter() - wall_started
+
+            peak_memory = None
+            if self.trace_memory:
+                peak_memory = max(tracemalloc.get_traced_memory()[1] - memory_before, 0)
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self._report(CallProfile(filename, method, wall_time, cpu_time, peak_memory,
+                                     _output_size(result) if status != 'exception' else None,
+                                     status, self._stats_text(profiler)))
+
+    def _stats_text(self, profiler):
+        if profiler is None:
+            return None
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(self.cprofile_limit)
+        return out.getvalue()
+
+    def _report(self, call_profile):
+        for callback in self.callbacks:
+            callback(call_profile)
+
+
+def _output_size(result):
+    try:
+        return len(json.dumps(result, separators=(',', ':')))
+    except (TypeError, ValueError):
+        return None
+
+
+# upper bounds of wall time histogram, seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class MetricsCollector(object):
+    """
+    CallProfiler callback which aggregates call metrics per constructor and method.
+
+    Calls slower than slow_threshold are kept in slow_calls (most recent ones).
+    Metrics are exported as Prometheus text exposition format, which can be served or written to a file.
+    """
+
+    def __init__(self, slow_threshold=None, slow_calls_limit=100, buckets=DEFAULT_BUCKETS):
+        """
+        :param slow_threshold: wall time in seconds, calls slower than that are recorded in slow_calls
+        :param slow_calls_limit: max number of recorded slow calls
+        :param buckets: upper bounds of wall time histogram, seconds
+        """
+        self.slow_threshold = slow_threshold
+        self.slow_calls = deque(maxlen=slow_calls_limit)
+        self.buckets = tuple(sorted(buckets))
+        # (filename, method) -> dict of aggregates
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, call_profile):
+        with self._lock:
+            metrics = self._metrics.get((call_profile.filename, call_profile.method))
+            if metrics is None:
+                metrics = self._metrics[(call_profile.filename, call_profile.method)] = {
+                    'results': {},
+                    'wall_time': 0.0,
+                    'cpu_time': 0.0,
+                    'output_size': 0,
+                    'peak_memory_max': None,
+                    'buckets': [0] * len(self.buckets),
+                    'count': 0,
+                }
+
+            metrics['results'][call_profile.result] = metrics['results'].get(call_profile.result, 0) + 1
+            metrics['count'] += 1
+            metrics['wall_time'] += call_profile.wall_time
+            metrics['cpu_time'] += call_profile.cpu_time
+            if call_profile.output_size is not None:
+                metrics['output_size'] += call_profile.output_size
+            if call_profile.peak_memory is not None:
+                metrics['peak_memory_max'] = max(metrics['peak_memory_max'] or 0, call_profile.peak_memory)
+            for idx, bound in enumerate(self.buckets):
+                if call_profile.wall_time <= bound:
+                    metrics['buckets'][idx] += 1
+
+            if self.slow_threshold is not None and call_profile.wall_time > self.slow_threshold:
+                self.slow_calls.append(call_profile)
+
+    def snapshot(self):
+        """
+        Json-like copy of aggregated metrics: list of dicts, one per constructor and method.
+        """
+        with self._lock:
+            return [
+                dict(filename=filename, method=method, results=dict(metrics['results']),
+                     **{key: value for key, value in metrics.items() if key not in ('results', 'buckets')})
+                for (filename, method), metrics in sorted(self._metrics.items())
+            ]
+
+    def to_prometheus(self, prefix='smartz_constructor'):
+        """
+        Metrics in Prometheus text exposition format.
+        """
+        lines = []
+
+        def header(name, type_, help_):
+            lines.append('# HELP {}_{} {}'.format(prefix, name, help_))
+            lines.append('# TYPE {}_{} {}'.format(prefix, name, type_))
+
+        def sample(name, labels, value):
+            lines.append('{}_{}{{{}}} {}'.format(prefix, name, _labels(labels), _number(value)))
+
+        with self._lock:
+            items = sorted(self._metrics.items())
+
+            header('calls_total', 'counter', 'Constructor method calls by result.')
+            for (filename, method), metrics in items:
+                for result, count in sorted(metrics['results'].items()):
+                    sample('calls_total', (('constructor', filename), ('method', method), ('result', result)),
+                           count)
+
+            header('call_duration_seconds', 'histogram', 'Wall time of constructor method calls.')
+            for (filename, method), metrics in items:
+                labels = (('constructor', filename), ('method', method))
+                for bound, count in zip(self.buckets, metrics['buckets']):
+                    sample('call_duration_seconds_bucket', labels + (('le', _number(bound)),), count)
+                sample('call_duration_seconds_bucket', labels + (('le', '+Inf'),), metrics['count'])
+                sample('call_duration_seconds_sum', labels, metrics['wall_time'])
+                sample('call_duration_seconds_count', labels, metrics['count'])
+
+            header('cpu_seconds_total', 'counter', 'CPU time of constructor method calls.')
+            for (filename, method), metrics in items:
+                sample('cpu_seconds_total', (('constructor', filename), ('method', method)), metrics['cpu_time'])
+
+            header('output_bytes_total', 'counter', 'Size of json-encoded results of constructor method calls.')
+            for (filename, method), metrics in items:
+                sample('output_bytes_total', (('constructor', filename), ('method', method)),
+                       metrics['output_size'])
+
+            header('peak_memory_bytes', 'gauge', 'Max memory allocated by a constructor method call.')
+            for (filename, method), metrics in items:
+                if metrics['peak_memory_max'] is not None:
+                    sample('peak_memory_bytes', (('constructor', filename), ('method', method)),
+                           metrics['peak_memory_max'])
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, prefix='smartz_constructor'):
+        """
+        Writes metrics to a file, e.g. for node_exporter textfile collector.
+        """
+        with open(path, 'w') as fh:
+            fh.write(self.to_prometheus(prefix))
+
+
+def _labels(labels):
+    return ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+                    for name, value in labels)
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.resources
+#
+# Class attributes of constructors which are loaded on first access.
+
+import json
+import os
+import sys
+import threading
+
+
+class ResourceError(Exception):
+    """
+    Resource can't be loaded.
+    """
+
+
+class LazyResource(object):
+    """
+    Class attribute computed on first access and shared by all instances afterwards:
+
+        class Constructor(ConstructorInstance):
+            _TEMPLATE = resource('token.sol', Template)
+            _SCHEMA = resource('schema.json', json.loads)
+            _TITLES = lazy(lambda: FunctionTitles({...}))
+
+    Importing constructor module doesn't read or parse anything, so hosts which answer get_version()
+    or get_params() only don't pay for templates.
+    """
+
+    def __init__(self, factory, path=None):
+        """
+        :param factory: callable which takes directory of the module defining owner class and returns value
+        :param path: file the value is loaded from, relative to the directory of the module, if any
+        """
+        self._factory = factory
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+        self._directory = None
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        module = sys.modules.get(owner.__module__)
+        module_file = getattr(module, '__file__', None)
+        self._directory = os.path.dirname(os.path.realpath(module_file)) if module_file else os.getcwd()
+
+    def __get__(self, instance, owner=None):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self._factory(self._directory)
+                    self._loaded = True
+        return self._value
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    @property
+    def filename(self):
+        """
+        Absolute path of the file the value is loaded from, None if it's not loaded from a file.
+        """
+        if self.path is None or self._directory is None:
+            return None
+        return os.path.join(self._directory, self.path)
+
+
+def lazy(factory):
+    """
+    Attribute computed by factory() on first access.
+    """
+    return LazyResource(lambda directory: factory())
+
+
+def resource(path, parse=None, encoding='utf-8'):
+    """
+    Attribute loaded from file on first access.
+
+    :param path: file path, relative to the directory of the constructor module
+    :param parse: callable which converts file text to value (e.g. Template, json.loads), text is returned as is
+        if not provided
+    :param encoding: file encoding, None to read bytes
+    """
+    def load(directory):
+        filename = os.path.join(directory, path)
+        try:
+            with open(filename, 'rb') as fh:
+                content = fh.read()
+        except OSError as exc:
+            raise ResourceError('Failed to read resource {}: {}'.format(filename, exc))
+
+        if encoding is not None:
+            content = content.decode(encoding)
+        return content if parse is None else parse(content)
+
+    return LazyResource(load, path)
+
+
+def json_resource(path):
+    """
+    Attribute loaded from json file on first access.
+    """
+    return resource(path, json.loads)
+
+
+def declared_resources(cls):
+    """
+    Resources loaded from files which are declared by class or its bases.
+
+    :return: dict attribute name -> LazyResource
+    """
+    attrs = {}
+    for klass in reversed(cls.__mro__):
+        attrs.update(vars(klass))
+    return {name: value for name, value in sorted(attrs.items())
+            if isinstance(value, LazyResource) and value.filename is not None}
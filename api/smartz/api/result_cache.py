@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.result_cache
+#
+# Cache of construct() results of deterministic constructors.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from smartz.api.frozen import canonical_json, freeze
+
+
+class ConstructResultCache(object):
+    """
+    LRU cache of construct() results keyed by constructor fingerprint and canonical json of fields.
+
+    Memory is bounded by total size of json-encoded results. If directory is provided, results are also
+    stored there (unbounded), so a restarted host starts warm.
+    """
+
+    def __init__(self, max_size=64 * 1024 * 1024, directory=None):
+        """
+        :param max_size: max total size of cached results in memory, bytes
+        :param directory: directory of on-disk backing store, optional
+        """
+        self.max_size = max_size
+        self.directory = directory
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(constructor_fingerprint, fields):
+        """
+        :return: cache key or None if fields are not json-serializable
+        """
+        try:
+            encoded = canonical_json(fields)
+        except (TypeError, ValueError):
+            return None
+
+        return hashlib.sha256('{}\n{}'.format(constructor_fingerprint, encoded).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        :return: frozen cached result or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        result = self._load(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return self._remember(key, result[0], result[1])
+
+    def put(self, key, result):
+        """
+        Caches result. Results which are not json-serializable are not cached.
+
+        :return: frozen result, or result as is if it was not cached
+        """
+        try:
+            encoded = json.dumps(result)
+        except (TypeError, ValueError):
+            return result
+        with self._lock:
+            frozen = self._remember(key, freeze(result), len(encoded))
+
+        self._store(key, encoded)
+        return frozen
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size": self.size,
+                "max_size": self.max_size
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, frozen, size):
+        if size > self.max_size:
+            return frozen
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+
+        self._entries[key] = (frozen, size)
+        self.size += size
+
+        while self.size > self.max_size:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+        return frozen
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as fh:
+                encoded = fh.read()
+            return freeze(json.loads(encoded)), len(encoded)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, encoded):
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                fh.write(encoded)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.sample_fields
+#
+# Generation of construct() fields from get_params() schema, for benchmarks and warmups.
+
+import itertools
+import re
+
+from smartz.api.fields_validator import blockchain_definitions, compile_fields_validator
+
+
+# samples of platform definitions (see json-schema/ethereum-sc.json, json-schema/eos-sc.json)
+DEFINITION_SAMPLES = {
+    'address': '0x' + '1' * 40,
+    'addressArray': ['0x' + '1' * 40],
+    'hash': '0x' + 'ab' * 32,
+    'fileHash': '0x' + 'ab' * 32,
+    'bytes32': '0x' + 'ab' * 32,
+    'bytes': '0xabcd',
+    'unixTime': 1600000000,
+    'uint256': '1000',
+    'uint128': '1000',
+    'uint': '1000',
+    'ethCount': '1.5',
+    'ethCountPositive': '1.5',
+    'account_name': 'alice',
+    'name': 'alice',
+    'asset': '1.0000 EOS',
+}
+
+_STRING_CANDIDATES = ('abc', 'abcdef', 'ABC', 'Abc', 'abc123', 'a1', '0x1', '0xffffffff', 'abc def', '1')
+
+
+def sample_value(schema, definitions):
+    """
+    Some value which is likely valid for schema: default, first enum variant or a generated one.
+
+    :param schema: json schema
+    :param definitions: dict used to resolve #/definitions/... references
+    """
+    if 'default' in schema:
+        return schema['default']
+
+    if '$ref' in schema:
+        name = schema['$ref'][len('#/definitions/'):]
+        if name in DEFINITION_SAMPLES:
+            value = DEFINITION_SAMPLES[name]
+            if isinstance(value, list) and schema.get('minItems', 0) > len(value):
+                value = value * schema['minItems']
+            return value
+        if name in definitions:
+            resolved = dict(definitions[name])
+            resolved.update((key, value) for key, value in schema.items() if key != '$ref')
+            return sample_value(resolved, definitions)
+        return None
+
+    if schema.get('enum'):
+        return schema['enum'][0]
+
+    type_ = schema.get('type')
+    if isinstance(type_, list):
+        type_ = type_[0]
+
+    if type_ == 'string':
+        return _sample_string(schema)
+    if type_ in ('integer', 'number'):
+        return _sample_number(schema)
+    if type_ == 'boolean':
+        return False
+    if type_ == 'array':
+        items = schema.get('items', {})
+        if isinstance(items, list):
+            return [sample_value(item, definitions) for item in items]
+        return [sample_value(items, definitions) for _ in range(max(schema.get('minItems', 0), 1))]
+    if type_ == 'object' or 'properties' in schema:
+        return {
+            name: sample_value(sub_schema, definitions)
+            for name, sub_schema in schema.get('properties', {}).items()
+        }
+
+    return None
+
+
+def _sample_string(schema):
+    min_length = schema.get('minLength', 0)
+    max_length = schema.get('maxLength')
+    search = re.compile(schema['pattern']).search if 'pattern' in schema else None
+
+    for candidate in _STRING_CANDIDATES:
+        if len(candidate) < min_length:
+            candidate = candidate + candidate[-1] * (min_length - len(candidate))
+        if max_length is not None and len(candidate) > max_length:
+            continue
+        if search is None or search(candidate):
+            return candidate
+
+    return 'a' * max(min_length, 1)
+
+
+def _sample_number(schema):
+    value = schema.get('minimum', 1)
+    if schema.get('exclusiveMinimum'):
+        value += 1
+    if 'maximum' in schema and value > schema['maximum']:
+        value = schema['maximum']
+    return value
+
+
+def feature_axes(schema):
+    """
+    Discrete axes of fields: top level boolean and enum properties.
+
+    :return: list of (property name, list of values)
+    """
+    axes = []
+    for name, sub_schema in schema.get('properties', {}).items():
+        if sub_schema.get('enum'):
+            axes.append((name, list(sub_schema['enum'])))
+        elif sub_schema.get('type') == 'boolean':
+            axes.append((name, [False, True]))
+    return axes
+
+
+def fields_matrix(schema, blockchain='ethereum', max_count=64, axes=None):
+    """
+    Sets of fields covering combinations of axes values, other properties are sampled.
+
+    Sets rejected by the schema validator are skipped.
+
+    :param schema: json schema from get_params()
+    :param blockchain: blockchain of the constructor
+    :param max_count: max number of generated sets
+    :param axes: list of (property name, list of values), None value leaves property out.
+        Boolean and enum properties of schema by default (see feature_axes())
+    :return: list of fields
+    """
+    definitions = dict(blockchain_definitions(blockchain))
+    definitions.update(schema.get('definitions') or {})
+    validator = compile_fields_validator(schema, blockchain)
+
+    base = sample_value(schema, definitions)
+    if axes is None:
+        axes = feature_axes(schema)
+    names = [name for name, _ in axes]
+
+    result = []
+    for values in itertools.product(*(values for _, values in axes)):
+        fields = dict(base, **dict(zip(names, values)))
+        for name, value in zip(names, values):
+            if value is None:
+                del fields[name]
+        if validator(fields) is None:
+            result.append(fields)
+            if len(result) >= max_count:
+                break
+
+    return result
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.snippets
+#
+# Shared versioned building blocks of contract sources (SafeMath, Ownable, ERC20 ...).
+#
+# Blocks are stored as SNIPPETS_DIR/<language>/<name>/<version>.sol and referenced from templates
+# by %snippet name% (latest version) or %snippet name@version% tags. Each block is loaded once per
+# process and its text is shared by all templates which reference it.
+
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+
+SNIPPETS_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'snippets'))
+
+LANGUAGE_EXTENSIONS = {
+    'solidity': '.sol',
+}
+
+_VERSION_RE = re.compile(r'^[A-Za-z0-9_.\-]+$')
+
+
+class SnippetError(Exception):
+    """
+    Snippet is not found or can't be loaded.
+    """
+
+
+class Snippet(namedtuple('Snippet', 'name version text hash')):
+    """
+    Loaded block. hash is sha256 of its text.
+    """
+    __slots__ = ()
+
+    @property
+    def key(self):
+        return '{}@{}'.format(self.name, self.version)
+
+    def to_json(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "hash": self.hash
+        }
+
+
+def _version_key(version):
+    # numeric parts are compared as numbers: 1.10 > 1.9
+    return tuple((0, int(part), '') if part.isdigit() else (1, 0, part) for part in re.split(r'[.\-]', version))
+
+
+class SnippetRegistry(object):
+    """
+    Snippets of one language, loaded from directory on first reference.
+    """
+
+    def __init__(self, directory, extension):
+        """
+        :param directory: directory with <name>/<version><extension> files
+        :param extension: file extension of snippets
+        """
+        self.directory = directory
+        self.extension = extension
+        # (name, version) -> Snippet
+        self._snippets = {}
+        self._lock = threading.Lock()
+
+    def filename(self, name, version):
+        """
+        File of snippet version.
+        """
+        return os.path.join(self.directory, name, version + self.extension)
+
+    def versions(self, name):
+        """
+        Available versions of snippet, from oldest to latest.
+        """
+        try:
+            filenames = os.listdir(os.path.join(self.directory, name))
+        except OSError:
+            return []
+
+        return sorted((filename[:-len(self.extension)] for filename in filenames
+                       if filename.endswith(self.extension)), key=_version_key)
+
+    def names(self):
+        try:
+            return sorted(name for name in os.listdir(self.directory)
+                          if os.path.isdir(os.path.join(self.directory, name)))
+        except OSError:
+            return []
+
+    def get(self, reference):
+        """
+        Gets snippet by reference.
+
+        :param reference: "name" for latest version or "name@version"
+        :return: Snippet
+        :raises SnippetError: if snippet is not found
+        """
+        name, _, version = reference.partition('@')
+        if not version:
+            versions = self.versions(name)
+            if not versions:
+                raise SnippetError('Snippet {} is not found in {}'.format(name, self.directory))
+            version = versions[-1]
+
+        snippet = self._snippets.get((name, version))
+        if snippet is not None:
+            return snippet
+
+        if os.sep in name or name.startswith('.') or not _VERSION_RE.match(version):
+            raise SnippetError('Invalid snippet reference: {}'.format(reference))
+
+        with self._lock:
+            snippet = self._snippets.get((name, version))
+            if snippet is None:
+                filename = self.filename(name, version)
+                try:
+                    with open(filename, 'rb') as fh:
+                        content = fh.read()
+                except OSError as exc:
+                    raise SnippetError('Snippet {}@{} is not found: {}'.format(name, version, exc))
+
+                snippet = Snippet(sys.intern(name), sys.intern(version), content.decode('utf-8'),
+                                  hashlib.sha256(content).hexdigest())
+                self._snippets[(name, version)] = snippet
+
+        return snippet
+
+
+@lru_cache(maxsize=None)
+def snippet_registry(language='solidity'):
+    """
+    Shared registry of snippets bundled with SDK.
+    """
+    if language not in LANGUAGE_EXTENSIONS:
+        raise SnippetError('Unsupported snippet language: {}'.format(language))
+
+    return SnippetRegistry(os.path.join(SNIPPETS_DIR, language), LANGUAGE_EXTENSIONS[language])
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.source_lint
+#
+# Static checks of constructed sources before they are sent to compiler.
+#
+# Sources are scanned once, checks look at code only: comments and string literals are skipped. Checks are cheap
+# compared to a compiler job and catch constructor bugs which would fail compilation anyway.
+
+import re
+import threading
+import time
+
+from smartz.api.template import PLACEHOLDER_RE
+
+
+# placeholders which are filled by platform after construct()
+PLATFORM_PLACEHOLDERS = frozenset(('payment_code',))
+
+# runs of uninteresting characters are matched as a whole to keep the scan fast
+_TOKEN_RE = re.compile(
+    r'[^{}/"\']+'
+    r'|//[^\n]*'
+    r'|/\*.*?(?:\*/|\Z)'
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r'|(?P<brace>[{}])'
+    r'|.',
+    re.DOTALL
+)
+
+# word boundary before keywords is checked for matches only, \b makes the scan several times slower
+_DECLARATION_RES = {
+    'ethereum': re.compile(r'(?:contract|library|interface)\s+([A-Za-z_][A-Za-z0-9_]*)'),
+    'eos': re.compile(
+        r'class\s+\[\[\s*eosio::contract(?:\(\s*"([^"]*)"\s*\))?\s*\]\]\s*([A-Za-z_][A-Za-z0-9_]*)'
+        r'|CONTRACT\s+([A-Za-z_][A-Za-z0-9_]*)'
+    ),
+}
+
+
+def _scan(source):
+    """
+    :return: (code, unbalanced brace problem or None). In code comments and string literals are replaced by a space
+        and their line breaks, so line numbers of code are kept
+    """
+    parts = []
+    # positions of open braces in code
+    stack = []
+    problem = None
+    pos = 0
+    for match in _TOKEN_RE.finditer(source):
+        token = match.group(0)
+        first = token[0]
+        if first in '"\'' or (first == '/' and len(token) > 1 and token[1] in '/*'):
+            parts.append(' ' + '\n' * token.count('\n'))
+        else:
+            parts.append(token)
+
+        brace = match.group('brace')
+        if brace == '{':
+            stack.append(pos)
+        elif brace == '}' and problem is None:
+            if not stack:
+                problem = ('Unexpected }', pos)
+            else:
+                stack.pop()
+        pos += len(parts[-1])
+
+    code = ''.join(parts)
+    if problem is None and stack:
+        problem = ('{ is not closed', stack[-1])
+    if problem is not None:
+        problem = {
+            "code": "unbalanced_braces",
+            "message": problem[0],
+            "line": _line(code, problem[1])
+        }
+    return code, problem
+
+
+def _declared_names(code, blockchain):
+    regex = _DECLARATION_RES.get(blockchain)
+    if regex is None:
+        return None
+
+    names = set()
+    for match in regex.finditer(code):
+        start = match.start()
+        if start and (code[start - 1].isalnum() or code[start - 1] == '_'):
+            continue
+        names.update(name for name in match.groups() if name)
+    return names
+
+
+def _line(source, pos):
+    return source.count('\n', 0, pos) + 1
+
+
+def lint_source(source, contract_name, blockchain='ethereum', allowed_placeholders=PLATFORM_PLACEHOLDERS):
+    """
+    Checks constructed source.
+
+    :param source: contract source
+    :param contract_name: main contract name returned by construct()
+    :param blockchain: ethereum (solidity) or eos (c++)
+    :param allowed_placeholders: %placeholder% markers which may be left in source
+    :return: list of problems: {"code": .., "message": .., "line": ..}, empty if source is fine
+    """
+    if not isinstance(source, str):
+        return [{
+            "code": "invalid_source",
+            "message": 'Source must be a string, not {}'.format(type(source).__name__),
+            "line": None
+        }]
+
+    code, brace_problem = _scan(source)
+    problems = []
+
+    for match in PLACEHOLDER_RE.finditer(code):
+        if match.group(1) not in allowed_placeholders:
+            problems.append({
+                "code": "unfilled_placeholder",
+                "message": 'Placeholder {} is not filled'.format(match.group(0)),
+                "line": _line(code, match.start())
+            })
+
+    names = _declared_names(code, blockchain)
+    if names is not None and contract_name not in names:
+        problems.append({
+            "code": "contract_not_declared",
+            "message": 'Contract {} is not declared in the source'.format(contract_name),
+            "line": None
+        })
+
+    if brace_problem is not None:
+        problems.append(brace_problem)
+
+    return problems
+
+
+class SourceLinter(object):
+    """
+    Checks sources of successful construct() results and counts compiler jobs saved by rejected ones.
+    """
+
+    def __init__(self, allowed_placeholders=PLATFORM_PLACEHOLDERS):
+        """
+        :param allowed_placeholders: %placeholder% markers which may be left in source
+        """
+        self.allowed_placeholders = frozenset(allowed_placeholders)
+        self.checked = 0
+        self.rejected = 0
+        self.seconds = 0.0
+        self.problems = {}
+        self._lock = threading.Lock()
+
+    def check_result(self, result, blockchain='ethereum', allowed_placeholders=()):
+        """
+        Checks construct() result.
+
+        :param result: construct() result
+        :param blockchain: blockchain of the constructor
+        :param allowed_placeholders: more markers which may be left in source, e.g. host slots of templates
+        :return: result as is if it's an error or source is fine, construct() error result otherwise: {
+            "result": "error",
+            "error_descr": error string,
+            "lint_errors": list of problems (see lint_source())
+        }
+        """
+        if result.get('result') != 'success':
+            return result
+
+        allowed = self.allowed_placeholders.union(allowed_placeholders) if allowed_placeholders \
+            else self.allowed_placeholders
+
+        started = time.perf_counter()
+        problems = lint_source(result.get('source', ''), result.get('contract_name'), blockchain, allowed)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.checked += 1
+            self.seconds += elapsed
+            if problems:
+                self.rejected += 1
+                for problem in problems:
+                    self.problems[problem['code']] = self.problems.get(problem['code'], 0) + 1
+
+        if not problems:
+            return result
+
+        return {
+            "result": "error",
+            "error_descr": 'Constructed source is invalid: {}'.format(
+                '; '.join(problem['message'] if problem['line'] is None
+                          else '{} at line {}'.format(problem['message'], problem['line'])
+                          for problem in problems)),
+            "lint_errors": problems
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "checked": self.checked,
+                # each rejected source is a compiler job which would fail
+                "compile_jobs_saved": self.rejected,
+                "seconds": self.seconds,
+                "problems": dict(self.problems)
+            }
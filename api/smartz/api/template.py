@@ -0,0 +1,609 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.api.template
+#
+# Precompiled templates of contract sources with %placeholder% markers.
+
+import hashlib
+import itertools
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from smartz.api.snippets import Snippet, SnippetError, snippet_registry
+
+
+PLACEHOLDER_RE = re.compile(r'%([A-Za-z_][A-Za-z0-9_]*)%')
+
+# max number of cached variant skeletons of a template
+MAX_SKELETONS = 256
+
+# Section and snippet tags. A tag which is the only thing on its line is removed together with the line.
+_TAG = r'%(?:(?P<open>if|for) (?P<negate>not )?(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<close>else|endif|endfor)' \
+       r'|snippet (?P<snippet>[A-Za-z_][A-Za-z0-9_]*(?:@[A-Za-z0-9_.\-]+)?))%'
+_TOKEN_RE = re.compile(
+    r'^[ \t]*(?P<standalone>{tag})[ \t]*(?:\r?\n|\Z)|{tag_inline}|%(?P<slot>[A-Za-z_][A-Za-z0-9_]*)%'.format(
+        tag=_TAG,
+        tag_inline=_TAG.replace('?P<', '?P<i_')
+    ),
+    re.MULTILINE
+)
+
+
+class TemplateError(Exception):
+    """
+    Template can't be parsed or rendered with provided values.
+    """
+
+
+class RenderContext(object):
+    """
+    State shared by templates rendered during a constructor call (see render_context()).
+    """
+    __slots__ = ('values', 'rendered', 'snippets', 'host_slots', 'renders')
+
+    def __init__(self, values, capture=False):
+        # values of host-provided slots
+        self.values = values
+        # whether some template was rendered in the context
+        self.rendered = False
+        # snippet key -> Snippet rendered in the context, in order of rendering
+        self.snippets = {}
+        # host-provided slots of rendered templates
+        self.host_slots = set()
+        # RenderRecord of each render without %for% sections, if capturing
+        self.renders = [] if capture else None
+
+
+class RenderRecord(object):
+    """
+    Captured render of a template: which skeleton was rendered and with which slot values.
+
+    Its json state lets the next render of the same skeleton be expressed as a patch of changed slots.
+    """
+    __slots__ = ('template', 'skeleton_key', 'flat', 'slot_values', 'text')
+
+    def __init__(self, template, skeleton_key, flat, slot_values, text):
+        self.template = template
+        self.skeleton_key = skeleton_key
+        self.flat = flat
+        # rendered strings of slots, in order of their positions
+        self.slot_values = slot_values
+        self.text = text
+
+    def state(self):
+        """
+        Json-like state of the render.
+        """
+        return {
+            "template": self.template.fingerprint,
+            "skeleton": list(self.skeleton_key),
+            "slots": self.slot_values
+        }
+
+    def patch(self, previous_state):
+        """
+        Changes of rendered text since previous render of the same skeleton.
+
+        Cost is proportional to the number of slots and literal segments, the text is not scanned.
+
+        :param previous_state: state() of previous render
+        :return: list of {"offset": .., "length": .., "replacement": ..}, offsets and lengths are in characters
+            of previous text, in ascending order (apply them from the last one). None if previous render
+            was of another template or skeleton
+        """
+        if not isinstance(previous_state, dict) or previous_state.get('template') != self.template.fingerprint \
+                or previous_state.get('skeleton') != list(self.skeleton_key):
+            return None
+
+        previous_slots = previous_state.get('slots')
+        if not isinstance(previous_slots, list) or len(previous_slots) != len(self.slot_values):
+            return None
+
+        patches = []
+        offset = 0
+        slot_positions = self.flat.slot_positions
+        slot_idx = 0
+        for idx, part in enumerate(self.flat.parts):
+            if slot_idx < len(slot_positions) and slot_positions[slot_idx] == idx:
+                previous, current = previous_slots[slot_idx], self.slot_values[slot_idx]
+                if not isinstance(previous, str):
+                    return None
+                if previous != current:
+                    patches.append({"offset": offset, "length": len(previous), "replacement": current})
+                offset += len(previous)
+                slot_idx += 1
+            else:
+                offset += len(part)
+
+        return patches
+
+
+_render_context = ContextVar('smartz_template_render_context', default=None)
+
+
+@contextmanager
+def render_context(host_values=None, capture=False):
+    """
+    Context of templates rendered during a constructor call.
+
+    Values of host-provided slots (passthrough placeholders like %payment_code%) are filled in the same
+    render pass, rendered snippets are recorded:
+
+        with render_context({'payment_code': code}) as context:
+            result = constructor.construct(fields)
+        if not context.rendered:
+            # constructor built source without templates
+            source = fill_host_slots(result['source'], context.values)
+        used_snippets = list(context.snippets.values())
+
+    :param host_values: dict of slot name -> value
+    :param capture: record renders of templates (see RenderRecord)
+    :return: context manager yielding RenderContext
+    """
+    context = RenderContext(host_values or {}, capture)
+    token = _render_context.set(context)
+    try:
+        yield context
+    finally:
+        _render_context.reset(token)
+
+
+def fill_host_slots(text, values):
+    """
+    Fills %name% markers of provided values in rendered text, in one pass. Other markers are left as is.
+    """
+    def replace(match):
+        value = values.get(match.group(1), _MISSING)
+        if value is _MISSING:
+            return match.group(0)
+        return value if isinstance(value, str) else str(value)
+
+    return PLACEHOLDER_RE.sub(replace, text)
+
+
+class Template(object):
+    """
+    Contract source template with %placeholder% markers.
+
+    Template is parsed once into literal segments and slots, rendering is a single join.
+    Declare it as a class attribute of constructor so it's parsed at class definition time:
+
+        _TEMPLATE = Template('''
+            contract %name% { ... }
+        ''', passthrough=('payment_code',))
+
+        source = self._TEMPLATE.render(name='Token')
+
+    Sections are driven by values as well:
+
+        %if is_pausable% ... %else% ... %endif%     rendered if value is truthy (or falsy, for %if not name%)
+        %for holders% ... %endfor%                  rendered for each item of the value. Item dicts provide
+                                                    placeholder values inside the section, other items are
+                                                    available as %item%
+
+    Section tags standing alone on a line are removed with the whole line.
+
+    If template has %if% sections only, they are its feature axes: each combination of section values is
+    rendered once into a skeleton of literal text and placeholders, and later renders only fill the placeholders
+    of the skeleton. Skeletons are built on first render of a combination or beforehand by prerender().
+
+    Shared building blocks (see smartz.api.snippets) are included by %snippet SafeMath% (latest version) or
+    %snippet SafeMath@1% tags. Their text is shared with other templates, rendered ones are recorded in
+    render_context(). Pinned versions are preferred: latest version is resolved when the template is parsed,
+    so adding a version changes the output.
+
+    Passthrough placeholders are host-provided slots: constructor doesn't fill them, they are filled with values
+    supplied by host through render_context() while the template is rendered, or kept as is if host supplies none.
+    """
+
+    def __init__(self, text, passthrough=(), snippets=None):
+        """
+        :param text: template text
+        :param passthrough: host-provided placeholders (e.g. filled by platform), see render_context()
+        :param snippets: SnippetRegistry resolving %snippet ..% tags, SDK solidity snippets by default
+        """
+        self.text = text
+        self.passthrough = frozenset(passthrough)
+
+        self._nodes, self.placeholders, self.sections, self.host_slots, self.snippets, self.snippet_files = \
+            _Parser(text, self.passthrough, snippets).parse()
+        self.names = self.placeholders | self.sections
+
+        # fast path for templates without sections
+        self._flat = _Flat(self._nodes) if not self.sections else None
+
+        # section names of skeleton keys, None if template has %for% sections
+        self._axes = tuple(sorted(self.sections)) if self.sections and not _has_for(self._nodes) else None
+        # tuple of bool section values -> _Flat
+        self._skeletons = {}
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        """
+        Hash of template text, host-provided slots and included snippets.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha256('{}\n{}\n{}'.format(
+                ','.join(sorted(self.passthrough)),
+                ','.join('{}:{}'.format(snippet.key, snippet.hash) for snippet in self.snippets),
+                self.text).encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    @property
+    def cached_skeletons(self):
+        """
+        Number of variant skeletons rendered so far.
+        """
+        return len(self._skeletons)
+
+    @property
+    def axes(self):
+        """
+        Names of %if% sections which select variant skeleton, empty if template has no skeletons.
+        """
+        return self._axes or ()
+
+    def skeleton(self, section_values):
+        """
+        Variant of template with sections resolved.
+
+        :param section_values: dict of section name -> value, all sections (see axes) must be provided
+        :return: internal skeleton object, cached
+        """
+        return self._skeleton(self._skeleton_key(section_values))
+
+    def _skeleton_key(self, section_values):
+        if self._axes is None:
+            raise TemplateError('Template has no variant skeletons')
+
+        try:
+            return tuple(bool(section_values[name]) for name in self._axes)
+        except KeyError as exc:
+            raise TemplateError('Section value is not provided: {}'.format(exc.args[0]))
+
+    def _skeleton(self, key):
+        flat = self._skeletons.get(key)
+        if flat is None:
+            flat = _Flat(_merge_literals(_resolve_sections(self._nodes, dict(zip(self._axes, key)), [])))
+            if len(self._skeletons) < MAX_SKELETONS:
+                self._skeletons[key] = flat
+
+        return flat
+
+    def prerender(self, max_variants=MAX_SKELETONS):
+        """
+        Builds skeletons of all combinations of section values, up to max_variants of them.
+
+        :return: number of skeletons
+        """
+        if self._axes is None:
+            return 0
+
+        for key in itertools.islice(itertools.product((False, True), repeat=len(self._axes)),
+                                    min(max_variants, MAX_SKELETONS)):
+            self.skeleton(dict(zip(self._axes, key)))
+
+        return len(self._skeletons)
+
+    def render(self, values=None, strict=True, **kwargs):
+        """
+        Renders template.
+
+        :param values: dict of placeholder name -> value, values which are not strings are converted by str()
+        :param strict: raise TemplateError if some rendered placeholder or section is not provided a value
+            or unknown value is provided. Otherwise unfilled placeholders are left as is, missing sections are
+            treated as falsy and unknown values are ignored
+        :return: rendered text
+        """
+        if values is None:
+            values = kwargs
+        elif kwargs:
+            values = dict(values, **kwargs)
+
+        if strict:
+            unknown = set(values).difference(self.names)
+            if unknown:
+                raise TemplateError('Unknown placeholders: {}'.format(', '.join(sorted(unknown))))
+
+        context = _render_context.get()
+        host = None
+        if context is not None:
+            context.rendered = True
+            context.host_slots.update(self.host_slots)
+            host = context.values
+
+        flat = self._flat
+        key = ()
+        if flat is None and self._axes is not None and all(name in values for name in self._axes):
+            key = self._skeleton_key(values)
+            flat = self._skeleton(key)
+        if flat is not None:
+            parts = flat.fill(values, strict, host, context)
+            text = ''.join(parts)
+            if context is not None and context.renders is not None:
+                context.renders.append(RenderRecord(self, key, flat, [parts[idx] for idx in flat.slot_positions],
+                                                    text))
+            return text
+
+        out = []
+        _render_nodes(self._nodes, (values,), strict, out, host or {}, context)
+        return ''.join(out)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return '<Template placeholders={} sections={}>'.format(sorted(self.placeholders), sorted(self.sections))
+
+
+class _Flat(object):
+    """
+    Sequence of literals and slots without sections, rendered by filling a copy of parts list.
+    """
+    __slots__ = ('parts', 'slots', 'host_slots', 'slot_positions', 'placeholders', 'snippets')
+
+    def __init__(self, nodes):
+        self.parts = [node if isinstance(node, str) else node.text if isinstance(node, Snippet) else node.marker
+                      for node in nodes]
+        self.slots = [(idx, node.name) for idx, node in enumerate(nodes)
+                      if isinstance(node, _Slot) and not isinstance(node, _HostSlot)]
+        self.host_slots = [(idx, node.name) for idx, node in enumerate(nodes) if isinstance(node, _HostSlot)]
+        self.slot_positions = tuple(sorted(idx for idx, _ in self.slots + self.host_slots))
+        self.placeholders = frozenset(name for _, name in self.slots)
+        self.snippets = tuple({node.key: node for node in nodes if isinstance(node, Snippet)}.values())
+
+    def fill(self, values, strict, host, context):
+        """
+        :return: parts list with slots filled
+        """
+        if strict:
+            missing = self.placeholders.difference(values)
+            if missing:
+                raise TemplateError('Placeholders are not filled: {}'.format(', '.join(sorted(missing))))
+
+        parts = self.parts.copy()
+        for idx, name in self.slots:
+            if name in values:
+                value = values[name]
+                parts[idx] = value if isinstance(value, str) else str(value)
+        if host:
+            for idx, name in self.host_slots:
+                if name in host:
+                    value = host[name]
+                    parts[idx] = value if isinstance(value, str) else str(value)
+        if context is not None:
+            for snippet in self.snippets:
+                context.snippets.setdefault(snippet.key, snippet)
+
+        return parts
+
+
+class _Slot(object):
+    __slots__ = ('name', 'marker')
+
+    def __init__(self, name, marker):
+        self.name = name
+        self.marker = marker
+
+
+class _HostSlot(_Slot):
+    __slots__ = ()
+
+
+class _If(object):
+    __slots__ = ('name', 'negate', 'body', 'else_body')
+
+    def __init__(self, name, negate):
+        self.name = name
+        self.negate = negate
+        self.body = []
+        self.else_body = None
+
+
+class _For(object):
+    __slots__ = ('name', 'body')
+
+    def __init__(self, name):
+        self.name = name
+        self.body = []
+
+
+class _Parser(object):
+
+    def __init__(self, text, passthrough, snippets):
+        self._text = text
+        self._passthrough = passthrough
+        self._snippets = snippets
+
+    def parse(self):
+        root = []
+        # stack of (section node, list where nodes are currently appended)
+        stack = []
+        current = root
+        placeholders = set()
+        sections = set()
+        host_slots = set()
+        # key -> Snippet, in order of appearance
+        snippets = {}
+        # files of included snippets and, for references without version, directories of their versions
+        snippet_files = set()
+        pos = 0
+
+        for match in _TOKEN_RE.finditer(self._text):
+            groups = match.groupdict()
+
+            if match.start() > pos:
+                current.append(self._text[pos:match.start()])
+            pos = match.end()
+
+            prefix = '' if groups['standalone'] is not None else 'i_'
+            opening, closing, name = groups[prefix + 'open'], groups[prefix + 'close'], groups[prefix + 'name']
+            snippet_ref = groups[prefix + 'snippet']
+
+            if snippet_ref is not None:
+                snippet = self._snippet(snippet_ref, match)
+                snippets.setdefault(snippet.key, snippet)
+                snippet_files.add(self._snippets.filename(snippet.name, snippet.version))
+                if '@' not in snippet_ref:
+                    snippet_files.add(os.path.dirname(self._snippets.filename(snippet.name, snippet.version)))
+                current.append(snippet)
+
+            elif groups['slot'] is not None and groups['slot'] in self._passthrough:
+                host_slots.add(groups['slot'])
+                current.append(_HostSlot(groups['slot'], match.group(0)))
+
+            elif groups['slot'] is not None:
+                placeholders.add(groups['slot'])
+                current.append(_Slot(groups['slot'], match.group(0)))
+
+            elif opening is not None:
+                sections.add(name)
+                node = _If(name, groups[prefix + 'negate'] is not None) if opening == 'if' else _For(name)
+                if opening == 'for' and groups[prefix + 'negate'] is not None:
+                    raise self._error('%for not% is not supported', match)
+                current.append(node)
+                stack.append(node)
+                current = node.body
+
+            elif closing == 'else':
+                if not stack or not isinstance(stack[-1], _If) or stack[-1].else_body is not None:
+                    raise self._error('Unexpected %else%', match)
+                stack[-1].else_body = current = []
+
+            else:
+                expected = _If if closing == 'endif' else _For
+                if not stack or not isinstance(stack[-1], expected):
+                    raise self._error('Unexpected %{}%'.format(closing), match)
+                stack.pop()
+                if not stack:
+                    current = root
+                else:
+                    current = stack[-1].else_body if isinstance(stack[-1], _If) and stack[-1].else_body is not None \
+                        else stack[-1].body
+
+        if stack:
+            raise TemplateError('Section %{}% is not closed'.format(stack[-1].name))
+
+        if pos < len(self._text):
+            current.append(self._text[pos:])
+
+        return _merge_literals(root), frozenset(placeholders), frozenset(sections), frozenset(host_slots), \
+            tuple(snippets.values()), frozenset(snippet_files)
+
+    def _snippet(self, reference, match):
+        if self._snippets is None:
+            self._snippets = snippet_registry('solidity')
+        try:
+            return self._snippets.get(reference)
+        except SnippetError as exc:
+            raise self._error(str(exc), match)
+
+    def _error(self, message, match):
+        line = self._text.count('\n', 0, match.start()) + 1
+        return TemplateError('{} at line {}'.format(message, line))
+
+
+def _merge_literals(nodes):
+    merged = []
+    for node in nodes:
+        if isinstance(node, _If):
+            node.body = _merge_literals(node.body)
+            if node.else_body is not None:
+                node.else_body = _merge_literals(node.else_body)
+        elif isinstance(node, _For):
+            node.body = _merge_literals(node.body)
+
+        if isinstance(node, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += node
+        else:
+            merged.append(node)
+
+    return merged
+
+
+_MISSING = object()
+
+
+def _has_for(nodes):
+    for node in nodes:
+        if isinstance(node, _For):
+            return True
+        if isinstance(node, _If) and (_has_for(node.body) or (node.else_body is not None and _has_for(node.else_body))):
+            return True
+    return False
+
+
+def _resolve_sections(nodes, section_values, out):
+    """
+    Appends nodes of rendered branches of %if% sections to out.
+    """
+    for node in nodes:
+        if isinstance(node, _If):
+            if section_values[node.name] != node.negate:
+                _resolve_sections(node.body, section_values, out)
+            elif node.else_body is not None:
+                _resolve_sections(node.else_body, section_values, out)
+        else:
+            out.append(node)
+    return out
+
+
+def _lookup(scopes, name):
+    for scope in reversed(scopes):
+        if name in scope:
+            return scope[name]
+    return _MISSING
+
+
+def _render_nodes(nodes, scopes, strict, out, host, context):
+    append = out.append
+    for node in nodes:
+        if isinstance(node, str):
+            append(node)
+
+        elif isinstance(node, Snippet):
+            append(node.text)
+            if context is not None:
+                context.snippets.setdefault(node.key, node)
+
+        elif isinstance(node, _HostSlot):
+            value = host.get(node.name, _MISSING)
+            if value is _MISSING:
+                append(node.marker)
+            else:
+                append(value if isinstance(value, str) else str(value))
+
+        elif isinstance(node, _Slot):
+            value = _lookup(scopes, node.name)
+            if value is _MISSING:
+                if strict:
+                    raise TemplateError('Placeholders are not filled: {}'.format(node.name))
+                append(node.marker)
+            else:
+                append(value if isinstance(value, str) else str(value))
+
+        elif isinstance(node, _If):
+            value = _lookup(scopes, node.name)
+            if value is _MISSING:
+                if strict:
+                    raise TemplateError('Section value is not provided: {}'.format(node.name))
+                value = False
+
+            if bool(value) != node.negate:
+                _render_nodes(node.body, scopes, strict, out, host, context)
+            elif node.else_body is not None:
+                _render_nodes(node.else_body, scopes, strict, out, host, context)
+
+        else:
+            items = _lookup(scopes, node.name)
+            if items is _MISSING:
+                if strict:
+                    raise TemplateError('Section value is not provided: {}'.format(node.name))
+                items = ()
+
+            for item in items or ():
+                _render_nodes(node.body, scopes + (item if isinstance(item, dict) else {'item': item},), strict, out,
+                              host, context)
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.eth.abi
+#
+# Index of Ethereum contract ABI.
+
+import re
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from smartz.api.frozen import fingerprint, freeze
+from smartz.eth.abi_model import Event, Function, FunctionSpec
+
+
+# json schemas of arguments, definitions are from json-schema/ethereum-sc.json
+_ELEMENTARY_SCHEMAS = {
+    'address': {'$ref': '#/definitions/address'},
+    'bool': {'type': 'boolean'},
+    'string': {'type': 'string'},
+    'bytes': {'$ref': '#/definitions/bytes'},
+    'bytes32': {'$ref': '#/definitions/bytes32'},
+    'uint8': {'$ref': '#/definitions/uint8'},
+    'uint16': {'$ref': '#/definitions/uint16'},
+    'uint32': {'$ref': '#/definitions/uint32'},
+    'uint64': {'$ref': '#/definitions/uint64'},
+    'uint128': {'$ref': '#/definitions/uint128'},
+    'uint256': {'$ref': '#/definitions/uint256'},
+    'uint': {'$ref': '#/definitions/uint256'},
+}
+
+_ARRAY_RE = re.compile(r'^(.*)\[(\d*)\]$')
+_BYTES_RE = re.compile(r'^bytes(\d+)$')
+_INT_RE = re.compile(r'^(u?)int(\d*)$')
+
+
+def argument_schema(argument):
+    """
+    Json schema of ABI function argument or output.
+
+    :param argument: ABI argument, e.g. {"name": "_to", "type": "address"}
+    :return: json schema
+    """
+    schema = dict(_type_schema(argument['type'], argument.get('components')))
+    schema['title'] = argument.get('name') or argument['type']
+    return schema
+
+
+def argument_list_schema(arguments):
+    """
+    ETHFunctionArgumentList (see json-schema/constructor.json) of ABI function inputs or outputs.
+    """
+    return {
+        'type': 'array',
+        'minItems': len(arguments),
+        'maxItems': len(arguments),
+        'items': [argument_schema(argument) for argument in arguments]
+    }
+
+
+def canonical_type(argument):
+    """
+    Type of argument as used in function signatures (tuples are expanded).
+    """
+    type_ = argument['type']
+    if type_.startswith('tuple'):
+        return '({}){}'.format(','.join(canonical_type(component) for component in argument['components']),
+                               type_[len('tuple'):])
+    return type_
+
+
+def abi_function_names(abi_array):
+    """
+    Set of names of functions in ABI, fallback function has empty name.
+    """
+    return {entry.get('name', '') for entry in abi_array if entry.get('type', 'function') in ('function', 'fallback')}
+
+
+def parse_signature(signature):
+    """
+    Splits function signature like "transfer(address,uint256)" into name and list of argument types.
+
+    :return: (name, list of types) or None if it's not a signature
+    """
+    if not signature.endswith(')') or '(' not in signature:
+        return None
+
+    name, args = signature[:-1].split('(', 1)
+    return name, _split_types(args)
+
+
+def signature_matches(spec, types):
+    """
+    Checks if ETHFunctionSpec inputs have specified types.
+
+    :param spec: ETHFunctionSpec
+    :param types: list of argument types, see parse_signature()
+    """
+    items = spec['inputs'].get('items', ())
+    if len(items) != len(types):
+        return False
+
+    return all(_strip_titles(item) == _strip_titles(_type_schema(type_)) for item, type_ in zip(items, types))
+
+
+def _split_types(types):
+    result = []
+    depth = 0
+    start = 0
+    for pos, char in enumerate(types):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            result.append(types[start:pos].strip())
+            start = pos + 1
+
+    if types[start:].strip():
+        result.append(types[start:].strip())
+    return result
+
+
+def _strip_titles(schema):
+    if isinstance(schema, dict):
+        return {key: _strip_titles(value) for key, value in schema.items() if key != 'title'}
+    if isinstance(schema, (list, tuple)):
+        return [_strip_titles(item) for item in schema]
+    return schema
+
+
+def _type_schema(type_, components=None):
+    match = _ARRAY_RE.match(type_)
+    if match is not None:
+        schema = {'type': 'array', 'items': _type_schema(match.group(1), components)}
+        if match.group(2):
+            schema['minItems'] = schema['maxItems'] = int(match.group(2))
+        return schema
+
+    if type_ == 'tuple':
+        return argument_list_schema(components or [])
+
+    if type_.startswith('('):
+        # tuple in canonical form, e.g. (uint256,address)
+        return argument_list_schema([{'type': component} for component in _split_types(type_[1:-1])])
+
+    if type_ in _ELEMENTARY_SCHEMAS:
+        return _ELEMENTARY_SCHEMAS[type_]
+
+    match = _BYTES_RE.match(type_)
+    if match is not None:
+        return {'type': 'string', 'pattern': '^(?:0[Xx])?[0-9a-fA-F]{{{}}}$'.format(int(match.group(1)) * 2)}
+
+    match = _INT_RE.match(type_)
+    if match is not None:
+        return {'type': 'string', 'pattern': '^[0-9]+$' if match.group(1) else '^-?[0-9]+$'}
+
+    return {'type': 'string'}
+
+
+@lru_cache(maxsize=4096)
+def _frozen_argument_list_schema(arguments):
+    # arguments is a tuple of compact Argument, functions with the same arguments share the schema
+    return freeze(argument_list_schema([argument.to_json() for argument in arguments]))
+
+
+class ABIFunction(object):
+    """
+    Function of ABI index.
+
+    ABI entry is kept in compact form (see smartz.eth.abi_model), frozen spec is built once, on first access.
+    """
+
+    __slots__ = ('name', 'signature', 'constant', 'payable', 'entry', '_spec')
+
+    def __init__(self, abi):
+        self.entry = Function.from_json(abi)
+        self.name = self.entry.name or ''
+        self.signature = sys.intern(
+            '{}({})'.format(self.name, ','.join(canonical_type(arg) for arg in abi.get('inputs', ()))))
+
+        mutability = abi.get('stateMutability')
+        self.constant = bool(abi.get('constant')) or mutability in ('view', 'pure')
+        self.payable = bool(abi.get('payable')) or mutability == 'payable'
+        self._spec = None
+
+    @property
+    def abi(self):
+        """
+        ABI entry as json, built on each access.
+        """
+        return self.entry.to_json()
+
+    @property
+    def spec(self):
+        """
+        ETHFunctionSpec (see json-schema/constructor.json), frozen. Argument list schemas are shared.
+        """
+        if self._spec is None:
+            self._spec = FunctionSpec(
+                name=self.name,
+                title=self.name or 'Fallback function',
+                constant=self.constant,
+                payable=self.payable,
+                inputs=_frozen_argument_list_schema(self.entry.inputs or ()),
+                outputs=_frozen_argument_list_schema(self.entry.outputs or ()),
+                description=None, sorting_order=None, ui_widget=None, ui_widget_options=None, payable_details=None
+            ).to_frozen()
+
+        return self._spec
+
+
+class ABIIndex(object):
+    """
+    Functions and events of ABI, built in one pass.
+
+    Fallback function is indexed under empty name.
+    """
+
+    def __init__(self, abi_array):
+        self.functions = []
+        # name -> list of overloads
+        self.by_name = {}
+        self.by_signature = {}
+        self.events = {}
+
+        for entry in abi_array:
+            entry_type = entry.get('type', 'function')
+            if entry_type in ('function', 'fallback'):
+                function = ABIFunction(entry)
+                self.functions.append(function)
+                self.by_name.setdefault(function.name, []).append(function)
+                self.by_signature[function.signature] = function
+            elif entry_type == 'event':
+                self.events.setdefault(entry['name'], []).append(Event.from_json(entry))
+
+        self.names = frozenset(self.by_name)
+
+    @property
+    def specs(self):
+        """
+        ETHFunctionSpec of each function, frozen.
+        """
+        return [function.spec for function in self.functions]
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+
+_INDEX_CACHE_SIZE = 256
+_index_cache = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def get_abi_index(abi_array):
+    """
+    ABI index, cached by hash of the ABI.
+    """
+    key = fingerprint(abi_array)
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    index = ABIIndex(abi_array)
+    with _index_cache_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+
+    return index
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+#   smartz.eth.abi_model
+#
+# Compact representation of ABI entries and function specs for resident caches.
+#
+# Entries are tuples without instance dicts, names and types are interned, so many ABIs sharing
+# the same functions share their strings. Conversion to and from json shapes is lossless:
+# keys absent in json are stored as None, unknown keys are kept in `extra`.
+
+import sys
+from collections import namedtuple
+
+from smartz.api.frozen import FrozenDict, freeze, thaw
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _extra(data, known):
+    return tuple(sorted((_intern(key), freeze(value)) for key, value in data.items() if key not in known))
+
+
+def _to_json(pairs, extra):
+    result = {key: value for key, value in pairs if value is not None}
+    for key, value in extra:
+        result[key] = thaw(value)
+    return result
+
+
+class Argument(namedtuple('Argument', 'name type indexed components extra')):
+    """
+    Function input/output or event parameter.
+    """
+    __slots__ = ()
+
+    _KEYS = frozenset(('name', 'type', 'indexed', 'components'))
+
+    @classmethod
+    def from_json(cls, data):
+        components = data.get('components')
+        return cls(
+            _intern(data.get('name')),
+            _intern(data.get('type')),
+            data.get('indexed'),
+            None if components is None else tuple(cls.from_json(component) for component in components),
+            _extra(data, cls._KEYS)
+        )
+
+    def to_json(self):
+        return _to_json((
+            ('name', self.name),
+            ('type', self.type),
+            ('indexed', self.indexed),
+            ('components', None if self.components is None else [c.to_json() for c in self.components]),
+        ), self.extra)
+
+
+def _arguments(data, key):
+    arguments = data.get(key)
+    return None if arguments is None else tuple(Argument.from_json(argument) for argument in arguments)
+
+
+def _arguments_json(arguments):
+    return None if arguments is None else [argument.to_json() for argument in arguments]
+
+
+class Function(namedtuple('Function', 'type name inputs outputs constant payable state_mutability extra')):
+    """
+    ABI entry of type function, fallback, receive or constructor.
+    """
+    __slots__ = ()
+
+    _KEYS = frozenset(('type', 'name', 'inputs', 'outputs', 'constant', 'payable', 'stateMutability'))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            _intern(data.get('type')),
+            _intern(data.get('name')),
+            _arguments(data, 'inputs'),
+            _arguments(data, 'outputs'),
+            data.get('constant'),
+            data.get('payable'),
+            _intern(data.get('stateMutability')),
+            _extra(data, cls._KEYS)
+        )
+
+    def to_json(self):
+        return _to_json((
+            ('type', self.type),
+            ('name', self.name),
+            ('inputs', _arguments_json(self.inputs)),
+            ('outputs', _arguments_json(self.outputs)),
+            ('constant', self.constant),
+            ('payable', self.payable),
+            ('stateMutability', self.state_mutability),
+        ), self.extra)
+
+
+class Event(namedtuple('Event', 'name inputs anonymous extra')):
+    """
+    ABI entry of type event.
+    """
+    __slots__ = ()
+
+    _KEYS = frozenset(('type', 'name', 'inputs', 'anonymous'))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            _intern(data.get('name')),
+            _arguments(data, 'inputs'),
+            data.get('anonymous'),
+            _extra(data, cls._KEYS)
+        )
+
+    def to_json(self):
+        return _to_json((
+            ('type', 'event'),
+            ('name', self.name),
+            ('inputs', _arguments_json(self.inputs)),
+            ('anonymous', self.anonymous),
+        ), self.extra)
+
+
+def compact_abi(abi_array):
+    """
+    Converts ABI array to tuple of Function and Event entries.
+    """
+    return tuple(Event.from_json(entry) if entry.get('type') == 'event' else Function.from_json(entry)
+                 for entry in abi_array)
+
+
+def abi_to_json(entries):
+    """
+    Converts compact ABI back to ABI array.
+    """
+    return [entry.to_json() for entry in entries]
+
+
+def is_compact_abi(entries):
+    return isinstance(entries, tuple) and bool(entries) and isinstance(entries[0], (Function, Event))
+
+
+class FunctionSpec(namedtuple('FunctionSpec', 'name title constant payable inputs outputs description '
+                                              'sorting_order ui_widget ui_widget_options payable_details')):
+    """
+    ETHFunctionSpec (see json-schema/constructor.json). Argument list schemas are kept frozen.
+    """
+    __slots__ = ()
+
+    # field -> json key
+    _JSON_KEYS = (
+        ('name', 'name'),
+        ('title', 'title'),
+        ('constant', 'constant'),
+        ('payable', 'payable'),
+        ('inputs', 'inputs'),
+        ('outputs', 'outputs'),
+        ('description', 'description'),
+        ('sorting_order', 'sorting_order'),
+        ('ui_widget', 'ui:widget'),
+        ('ui_widget_options', 'ui:widget_options'),
+        ('payable_details', 'payable_details'),
+    )
+
+    @classmethod
+    def from_json(cls, data):
+        unknown = set(data).difference(json_key for _, json_key in cls._JSON_KEYS)
+        if unknown:
+            # ETHFunctionSpec has additionalProperties: false
+            raise ValueError('Unknown ETHFunctionSpec keys: {}'.format(', '.join(sorted(unknown))))
+
+        return cls(**{field: _intern(freeze(data.get(json_key))) for field, json_key in cls._JSON_KEYS})
+
+    def to_json(self):
+        return {json_key: thaw(getattr(self, field)) for field, json_key in self._JSON_KEYS
+                if getattr(self, field) is not None}
+
+    def to_frozen(self):
+        """
+        ETHFunctionSpec as FrozenDict sharing argument list schemas with this spec.
+        """
+        return FrozenDict((json_key, getattr(self, field)) for field, json_key in self._JSON_KEYS
+                          if getattr(self, field) is not None)
@@ -4,14 +4,20 @@
 #
 # Functions used for contracts api v1. Will be removed after 01.05.2018
 
+from smartz.eth.abi import get_abi_index, parse_signature, signature_matches
+
+
+# Keys of function titles info which are copied to ETHFunctionSpec as is
+_FUNCTION_KEYS = ('title', 'description', 'sorting_order', 'ui:widget', 'ui:widget_options', 'payable_details')
+
 
 def make_generic_function_spec(abi_array):
     """
     Generates ETHFunctionSpec for each function found in ABI.
     :param abi_array: contract Ethereum ABI
-    :return: list of ETHFunctionSpec
+    :return: list of ETHFunctionSpec. Specs are frozen and shared, ABI index is cached by hash of the ABI
     """
-    raise NotImplementedError()
+    return get_abi_index(abi_array).specs
 
 
 def merge_function_titles2specs(spec_array, titles_info):
@@ -21,8 +27,58 @@ def merge_function_titles2specs(spec_array, titles_info):
     Processed elements: function titles and descriptions, function input arguments titles and descriptions,
     titles and descriptions of function outputs.
 
+    Titles are keyed by function name (all overloads) or by signature like "transfer(address,uint256)"
+    (this overload only, takes precedence). Specs are joined with titles by name in linear time,
+    specs without titles are passed through without copying.
+
     :param spec_array: list of ETHFunctionSpec
     :param titles_info: data according to function_titles_info.json schema
     :return: modified ETHFunctionSpec
     """
-    raise NotImplementedError()
+    # name -> (info for all overloads, [(argument types, info for the overload)])
+    by_name = {}
+    for key, info in titles_info.items():
+        signature = parse_signature(key)
+        if signature is None:
+            by_name.setdefault(key, [None, []])[0] = info
+        else:
+            by_name.setdefault(signature[0], [None, []])[1].append((signature[1], info))
+
+    result = []
+    for spec in spec_array:
+        entry = by_name.get(spec['name'])
+        if entry is None:
+            result.append(spec)
+            continue
+
+        info, overloads = entry
+        for types, overload_info in overloads:
+            if signature_matches(spec, types):
+                info = overload_info
+                break
+
+        result.append(spec if info is None else _merge_function_titles(spec, info))
+
+    return result
+
+
+def _merge_function_titles(spec, info):
+    merged = dict(spec)
+    for key in _FUNCTION_KEYS:
+        if key in info:
+            merged[key] = info[key]
+
+    for key in ('inputs', 'outputs'):
+        if info.get(key):
+            merged[key] = _merge_argument_titles(spec[key], info[key])
+
+    return merged
+
+
+def _merge_argument_titles(arguments_schema, titles):
+    items = list(arguments_schema.get('items', ()))
+    for idx, item_titles in enumerate(titles[:len(items)]):
+        if item_titles:
+            items[idx] = dict(items[idx], **item_titles)
+
+    return dict(arguments_schema, items=items)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+_CONSTRUCTOR = '''
+from smartz.api.constructor_engine import ConstructorInstance
+<IMPORTS>
+
+
+class Constructor(ConstructorInstance):
+<ATTRIBUTES>
+
+    def get_version(self):
+        return {"result": "success", "version": 1}
+
+    def get_params(self):
+        return {"result": "success", "schema": <SCHEMA>, "ui_schema": {}}
+
+    def construct(self, fields):
+        return {"result": "success", "source": <SOURCE>, "contract_name": <CONTRACT_NAME>}
+
+    def post_construct(self, fields, abi_array):
+        return {"result": "success", "function_specs": {}, "dashboard_functions": []}
+'''
+
+
+def constructor_source(imports='', attributes='', schema='{}', source='"contract A {}"', contract_name='"A"'):
+    """
+    Source of a test constructor module. Arguments are python code.
+
+    :param imports: import lines
+    :param attributes: class attributes, indented automatically
+    :param schema: expression of get_params() schema
+    :param source: expression of construct() source, fields are available
+    :param contract_name: expression of construct() contract name
+    """
+    pieces = (
+        ('<IMPORTS>', textwrap.dedent(imports).strip()),
+        ('<ATTRIBUTES>', textwrap.indent(textwrap.dedent(attributes).strip(), '    ')),
+        ('<SCHEMA>', schema),
+        ('<SOURCE>', source),
+        ('<CONTRACT_NAME>', contract_name),
+    )
+    text = _CONSTRUCTOR
+    for marker, value in pieces:
+        text = text.replace(marker, value)
+    return text
+
+
+@pytest.fixture
+def write_constructor(tmp_path):
+    """
+    Factory writing test constructor file: write_constructor(path relative to tmp_path, **constructor_source kwargs).
+
+    :return: absolute path of written file
+    """
+    def write(name='ctor.py', **kwargs):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(constructor_source(**kwargs))
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def examples_dir():
+    """
+    Directory of constructor examples shipped with the SDK.
+    """
+    return os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'constructor_examples'))
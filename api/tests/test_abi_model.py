@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from smartz.api.compile_cache import ArtifactStore
+from smartz.api.frozen import thaw
+from smartz.eth.abi import get_abi_index
+from smartz.eth.abi_model import Function, abi_to_json, compact_abi
+
+
+ABI = [
+    {"type": "function", "name": "transfer", "constant": False, "payable": False,
+     "stateMutability": "nonpayable",
+     "inputs": [{"name": "_to", "type": "address"}, {"name": "_value", "type": "uint256"}],
+     "outputs": [{"name": "", "type": "bool"}]},
+    {"type": "function", "name": "balanceOf", "constant": True, "stateMutability": "view",
+     "inputs": [{"name": "_to", "type": "address"}, {"name": "_value", "type": "uint256"}],
+     "outputs": [{"name": "", "type": "bool"}], "custom": {"key": [1, 2]}},
+    {"type": "event", "name": "Transfer", "anonymous": False,
+     "inputs": [{"name": "from", "type": "address", "indexed": True},
+                {"name": "pair", "type": "tuple", "components": [{"name": "a", "type": "uint8"}]}]},
+    {"type": "fallback", "payable": True},
+]
+
+
+def test_compact_abi_round_trip():
+    compact = compact_abi(ABI)
+
+    assert isinstance(compact[0], Function)
+    assert abi_to_json(compact) == ABI
+
+
+def test_artifact_store_keeps_compact_abi():
+    store = ArtifactStore()
+    store.put('key', {"abi": ABI, "bytecode": '00'})
+
+    assert isinstance(store._artifacts['key'][0]['abi'][0], Function)
+    assert thaw(store.get('key')) == {"abi": ABI, "bytecode": '00'}
+
+
+def test_specs_share_argument_schemas():
+    specs = get_abi_index(ABI).specs
+
+    assert [spec['name'] for spec in specs] == ['transfer', 'balanceOf', '']
+    assert specs[0]['inputs'] is specs[1]['inputs']
+    assert specs[2]['title'] == 'Fallback function'
+    assert specs[2]['inputs'] == {'type': 'array', 'minItems': 0, 'maxItems': 0, 'items': ()}
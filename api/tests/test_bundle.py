@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+
+import pytest
+
+from smartz.api.bundle import _HEADER, BundleError, ConstructorBundle, pack
+from smartz.api.constructor_host import ConstructorHost
+from smartz.api.constructor_registry import ConstructorLoadError
+
+
+def write_token(write_constructor, name):
+    return write_constructor(
+        name,
+        imports="""
+            from smartz.api.resources import json_resource, resource
+            from smartz.api.template import Template
+        """,
+        attributes="""
+            _SCHEMA = json_resource('schema.json')
+            _TEMPLATE = resource('templates/token.sol', Template)
+        """,
+        schema='self._SCHEMA',
+        source='self._TEMPLATE.render({"name": fields["name"]})',
+        contract_name='fields["name"]'
+    )
+
+
+def test_moved_bundle_serves_resources(tmp_path, write_constructor):
+    source_dir = tmp_path / 'src' / 'token'
+    write_token(write_constructor, 'src/token/ctor.py')
+    (source_dir / 'templates').mkdir()
+    (source_dir / 'schema.json').write_text(json.dumps({"type": "object"}))
+    (source_dir / 'templates' / 'token.sol').write_text('contract %name% {}\n')
+
+    names, errors = pack([str(source_dir / 'ctor.py')], str(tmp_path / 'catalog.bundle'),
+                         base_dir=str(tmp_path / 'src'))
+    assert names == [os.path.join('token', 'ctor.py')] and not errors
+
+    (tmp_path / 'deploy').mkdir()
+    bundle_path = str(tmp_path / 'deploy' / 'catalog.bundle')
+    shutil.move(str(tmp_path / 'catalog.bundle'), bundle_path)
+    shutil.rmtree(str(tmp_path / 'src'))
+
+    with ConstructorBundle(bundle_path) as bundle:
+        assert str(tmp_path) not in json.dumps(bundle.index)
+
+        host = ConstructorHost(bundle)
+        response = host.call('construct', {"fields": {"name": "Token"}}, names[0])
+        assert response == {"result": "success", "source": "contract Token {}\n", "contract_name": "Token"}
+        assert host.call('get_params', {}, names[0])['schema'] == {"type": "object"}
+
+        directory = bundle._directory
+    assert not os.path.exists(directory)
+
+
+def test_pack_rejects_constructor_outside_base_dir(tmp_path, write_constructor):
+    filename = write_constructor('a/minimal.py')
+    (tmp_path / 'cwd').mkdir()
+
+    with pytest.raises(BundleError):
+        pack([filename], str(tmp_path / 'catalog.bundle'), base_dir=str(tmp_path / 'cwd'))
+
+    names, errors = pack([filename], str(tmp_path / 'catalog.bundle'), base_dir=str(tmp_path / 'cwd'),
+                         skip_invalid=True)
+    assert names == [] and list(errors) == [filename]
+
+
+def rewrite_index(path, change):
+    with open(path, 'rb') as fh:
+        content = fh.read()
+    magic, index_length = _HEADER.unpack_from(content, 0)
+    index = json.loads(content[_HEADER.size:_HEADER.size + index_length].decode('utf-8'))
+    change(index['constructors']['ctor.py'])
+
+    encoded = json.dumps(index).encode('utf-8')
+    with open(path, 'wb') as fh:
+        fh.write(_HEADER.pack(magic, len(encoded)) + encoded + content[_HEADER.size + index_length:])
+
+
+@pytest.mark.parametrize('change', [
+    lambda entry: entry.update(path='../escaped.py'),
+    lambda entry: entry.update(path='/tmp/escaped.py'),
+    lambda entry: entry.update(resources={'../../escaped.json': entry['source']}),
+    lambda entry: entry.update(resources={'/tmp/escaped.json': entry['source']}),
+])
+def test_unpack_rejects_paths_outside_of_bundle(tmp_path, write_constructor, change):
+    filename = write_constructor('src/ctor.py')
+    bundle_path = str(tmp_path / 'catalog.bundle')
+    pack([filename], bundle_path, base_dir=str(tmp_path / 'src'))
+    rewrite_index(bundle_path, change)
+
+    with ConstructorBundle(bundle_path) as bundle:
+        with pytest.raises(ConstructorLoadError):
+            bundle.get('ctor.py')
+        directory = bundle._directory
+
+    assert not os.path.exists(directory)
+    assert not (tmp_path / 'escaped.py').exists()
+    assert not os.path.exists('/tmp/escaped.py') and not os.path.exists('/tmp/escaped.json')
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+import pytest
+
+from smartz.api.compile_cache import ArtifactStore, CachingCompiler, CompilationError, CompilerBackend, \
+    SolcBackend, StubCompilerBackend
+from smartz.api.constructor_host import ConstructorHost
+from smartz.api.constructor_registry import ConstructorRegistry
+from smartz.api.frozen import FrozenDict
+
+
+ABI = [{"type": "function", "name": "foo", "inputs": [], "outputs": []}]
+
+
+class FailingBackend(CompilerBackend):
+
+    def get_version(self):
+        return 'failing'
+
+    def compile(self, source, contract_name):
+        raise CompilationError('syntax error')
+
+
+def test_miss_then_hit():
+    backend = StubCompilerBackend(ABI)
+    compiler = CachingCompiler(backend)
+
+    first = compiler.compile('contract A {}', 'A')
+    second = compiler.compile('contract A {}', 'A')
+
+    assert isinstance(first, FrozenDict)
+    assert second == first
+    assert backend.compilations == 1
+    assert compiler.stats()['hits'] == 1
+    assert compiler.stats()['misses'] == 1
+
+
+def test_key_depends_on_source_contract_and_version():
+    key = ArtifactStore.make_key('contract A {}', 'A', 'v1')
+
+    assert key != ArtifactStore.make_key('contract A { }', 'A', 'v1')
+    assert key != ArtifactStore.make_key('contract A {}', 'B', 'v1')
+    assert key != ArtifactStore.make_key('contract A {}', 'A', 'v2')
+
+
+def test_on_disk_round_trip(tmp_path):
+    compiler = CachingCompiler(StubCompilerBackend(ABI), ArtifactStore(str(tmp_path)))
+    artifact = compiler.compile('contract A {}', 'A')
+
+    with open(os.path.join(str(tmp_path), artifact['key'] + '.json')) as fh:
+        assert json.load(fh)['bytecode'] == artifact['bytecode']
+
+    # new process: empty memory, same directory
+    backend = StubCompilerBackend(ABI)
+    restarted = CachingCompiler(backend, ArtifactStore(str(tmp_path)))
+    assert restarted.compile('contract A {}', 'A') == artifact
+    assert backend.compilations == 0
+    assert restarted.stats()['hits'] == 1
+
+
+def test_memory_is_bounded(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_size=200)
+    keys = []
+    for idx in range(10):
+        key = 'k{}'.format(idx)
+        store.put(key, {"abi": [], "bytecode": '{:040}'.format(idx)})
+        keys.append(key)
+
+    assert 0 < len(store) < 10
+    assert store.size <= 200
+    # evicted artifacts are still found on disk
+    assert store.get(keys[0])['bytecode'] == '{:040}'.format(0)
+
+
+def test_compilation_error_is_not_cached():
+    compiler = CachingCompiler(FailingBackend())
+
+    for _ in range(2):
+        with pytest.raises(CompilationError):
+            compiler.compile('contract A {', 'A')
+    assert compiler.stats()['misses'] == 2
+    assert len(compiler.store) == 0
+
+
+def test_unexpected_solc_output_is_compilation_error():
+    # prints its arguments instead of json
+    with pytest.raises(CompilationError):
+        SolcBackend('/bin/echo').compile('contract A {}', 'A')
+
+
+def test_host_answers_after_failed_compile():
+    host = ConstructorHost(ConstructorRegistry(), compiler=CachingCompiler(SolcBackend('/bin/echo')))
+
+    responses = [json.loads(host.handle_line(json.dumps(request))) for request in (
+        {"id": 1, "method": "compile", "params": {"source": "contract A {}", "contract_name": "A"}},
+        {"id": 2, "method": "compile", "params": {"source": None, "contract_name": "A"}},
+        {"id": 3, "method": ["compile"]},
+        {"id": 4, "method": "stats"},
+    )]
+
+    assert [response['id'] for response in responses] == [1, 2, 3, 4]
+    assert [response['response']['result'] for response in responses] == ['error', 'error', 'error', 'success']
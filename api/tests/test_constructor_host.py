@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import json
+import socket
+import threading
+import time
+
+from smartz.api.compile_cache import CachingCompiler, StubCompilerBackend
+from smartz.api.constructor_host import ConstructorHost
+from smartz.api.constructor_registry import ConstructorRegistry
+from smartz.api.profiling import CallProfiler, MetricsCollector
+from smartz.api.result_cache import ConstructResultCache
+
+
+ABI = [{"type": "function", "name": "foo", "inputs": [], "outputs": []}]
+
+
+def write_template_constructor(write_constructor):
+    return write_constructor(
+        imports='from smartz.api.template import Template',
+        attributes="""
+            _TEMPLATE = Template('contract %name% {\\n    %payment_code%\\n}\\n', passthrough=('payment_code',))
+        """,
+        schema='{"type": "object", "properties": {"name": {"type": "string"}}}',
+        source='self._TEMPLATE.render(fields)',
+        contract_name='fields["name"]'
+    )
+
+
+def call(host, method, **params):
+    return json.loads(host.handle_line(json.dumps({"id": 1, "method": method, "params": params})))['response']
+
+
+def test_get_params_not_modified(write_constructor):
+    host = ConstructorHost(ConstructorRegistry(use_manifests=False), write_template_constructor(write_constructor))
+
+    params = call(host, 'get_params')
+    assert params['schema']['properties'] == {"name": {"type": "string"}}
+
+    assert call(host, 'get_params', fingerprint=params['fingerprint']) == {
+        "result": "success", "not_modified": True, "fingerprint": params['fingerprint']}
+    assert 'schema' in call(host, 'get_params', fingerprint='stale')
+
+
+def test_host_values_and_previous_state(write_constructor):
+    host = ConstructorHost(ConstructorRegistry(use_manifests=False), write_template_constructor(write_constructor))
+    host_values = {"payment_code": "pay();"}
+
+    assert call(host, 'construct', fields={"name": "A"})['source'] == 'contract A {\n    %payment_code%\n}\n'
+    assert call(host, 'construct', fields={"name": "A"}, host_values=host_values)['source'] == \
+        'contract A {\n    pay();\n}\n'
+
+    many = call(host, 'construct_many', fields_list=[{"name": "A"}, {"name": 1}], host_values=host_values)
+    assert many['results'][0]['source'] == 'contract A {\n    pay();\n}\n'
+    assert many['results'][1]['errors'] == {"name": "Must be of type string"}
+
+    first = call(host, 'construct_preview', fields={"name": "A"}, host_values=host_values)
+    assert first['source'] == 'contract A {\n    pay();\n}\n'
+    second = call(host, 'construct_preview', fields={"name": "B"}, host_values=host_values,
+                  previous_state=first['preview_state'])
+    assert 'source' not in second
+    assert second['patch'] == [{"offset": 9, "length": 1, "replacement": "B"}]
+
+
+def test_compile_and_stats(write_constructor):
+    result_cache = ConstructResultCache()
+    backend = StubCompilerBackend(ABI)
+    compiler = CachingCompiler(backend)
+    host = ConstructorHost(ConstructorRegistry(result_cache, use_manifests=False),
+                           write_template_constructor(write_constructor), compiler)
+
+    assert call(host, 'stats') == {
+        "result": "success", "compile": compiler.stats(), "result_cache": result_cache.stats()}
+
+    first = call(host, 'compile', source='contract A {}', contract_name='A')
+    second = call(host, 'compile', source='contract A {}', contract_name='A')
+    assert first['artifact']['abi'] == ABI
+    assert second == first
+    assert backend.compilations == 1
+
+    call(host, 'construct', fields={"name": "A"})
+    call(host, 'construct', fields={"name": "A"})
+    stats = call(host, 'stats')
+    assert (stats['compile']['hits'], stats['compile']['misses']) == (1, 1)
+    assert (stats['result_cache']['hits'], stats['result_cache']['misses']) == (1, 1)
+
+    assert call(ConstructorHost(ConstructorRegistry()), 'compile', source='contract A {}', contract_name='A') == {
+        "result": "error", "error_descr": "Compiler is not configured"}
+
+
+def test_metrics(write_constructor):
+    metrics = MetricsCollector(slow_threshold=0)
+    filename = write_template_constructor(write_constructor)
+    host = ConstructorHost(ConstructorRegistry(profiler=CallProfiler([metrics]), use_manifests=False), filename,
+                           metrics=metrics)
+
+    call(host, 'construct', fields={"name": "A"})
+    response = call(host, 'metrics')
+
+    assert response['result'] == 'success'
+    assert 'smartz_constructor_calls_total{{constructor="{}",method="construct",result="success"}} 1'.format(
+        filename) in response['metrics'].splitlines()
+    # get_params and get_version are called to validate fields and load the constructor
+    assert (filename, 'construct') in [(slow_call['filename'], slow_call['method'])
+                                       for slow_call in response['slow_calls']]
+
+    assert call(ConstructorHost(ConstructorRegistry()), 'metrics')['error_descr'] == 'Metrics are not configured'
+
+
+def test_invalid_utf8_keeps_unix_socket_connection(tmp_path, write_constructor):
+    host = ConstructorHost(ConstructorRegistry(use_manifests=False), write_template_constructor(write_constructor))
+    path = str(tmp_path / 'host.sock')
+    threading.Thread(target=host.serve_unix_socket, args=(path,), daemon=True).start()
+
+    client = socket.socket(socket.AF_UNIX)
+    for _ in range(100):
+        try:
+            client.connect(path)
+            break
+        except OSError:
+            time.sleep(0.01)
+
+    with client, client.makefile('rwb') as stream:
+        stream.write(b'{"id": 1, "method": "get_version", "params": {"x": "\xff"}}\n')
+        stream.write(b'{"id": 2, "method": "get_version"}\n')
+        stream.flush()
+
+        malformed = json.loads(stream.readline())
+        assert malformed['id'] is None
+        assert malformed['response']['error_descr'].startswith('Malformed request: ')
+        assert json.loads(stream.readline()) == {"id": 2, "response": {"result": "success", "version": 1}}
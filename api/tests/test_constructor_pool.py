@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from smartz.api.constructor_pool import ConstructorPool
+
+
+def test_results_are_in_order_of_fields(write_constructor):
+    filename = write_constructor(
+        schema='{"type": "object", "required": ["n"], "properties": {"n": {"type": "integer"}}}',
+        source='"contract A{} {{}}".format(fields["n"])'
+    )
+    fields_list = [{"n": n} for n in range(40)] + [{"n": "x"}]
+
+    with ConstructorPool([filename], processes=3) as pool:
+        results = list(pool.construct_many(filename, fields_list, chunksize=4))
+        assert pool.construct(filename, {"n": 7})['source'] == 'contract A7 {}'
+        stats = pool.worker_stats()
+
+    assert [result['source'] for result in results[:-1]] == ['contract A{} {{}}'.format(n) for n in range(40)]
+    assert results[-1] == {"result": "error", "errors": {"n": "Must be of type integer"}}
+
+    assert os.getpid() not in stats
+    assert sum(worker['calls'] for worker in stats.values()) == 42
+    for worker in stats.values():
+        assert worker['busy_time'] > 0
+        assert worker['calls_per_second'] == worker['calls'] / worker['busy_time']
+
+
+def test_exceptions_are_reported_per_call(write_constructor):
+    filename = write_constructor(source='1 / fields["n"] and "contract A {}"')
+
+    with ConstructorPool([filename], processes=2, validate=False) as pool:
+        results = list(pool.construct_many(filename, [{"n": 1}, {"n": 0}, {"n": 2}]))
+
+    assert [result['result'] for result in results] == ['success', 'error', 'success']
+    assert results[1]['error_descr'] == 'ZeroDivisionError: division by zero'
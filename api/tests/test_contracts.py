@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from smartz.api.frozen import thaw
+from smartz.eth.abi import get_abi_index
+from smartz.eth.contracts import make_generic_function_spec, merge_function_titles2specs
+
+
+ABI = [
+    {"type": "function", "name": "transfer", "stateMutability": "nonpayable",
+     "inputs": [{"name": "_to", "type": "address"}, {"name": "_value", "type": "uint256"}],
+     "outputs": [{"name": "", "type": "bool"}]},
+    {"type": "function", "name": "transfer", "stateMutability": "nonpayable",
+     "inputs": [{"name": "_to", "type": "address"}], "outputs": []},
+    {"type": "function", "name": "owner", "constant": True, "inputs": [],
+     "outputs": [{"name": "", "type": "address"}]},
+    {"type": "function", "name": "buy", "payable": True, "inputs": [], "outputs": []},
+    {"type": "fallback", "stateMutability": "payable"},
+]
+
+
+def test_generic_function_specs():
+    specs = make_generic_function_spec(ABI)
+
+    assert [(spec['name'], spec['title']) for spec in specs] == [
+        ('transfer', 'transfer'), ('transfer', 'transfer'), ('owner', 'owner'), ('buy', 'buy'),
+        ('', 'Fallback function')]
+    assert [(spec['constant'], spec['payable']) for spec in specs] == [
+        (False, False), (False, False), (True, False), (False, True), (False, True)]
+
+    assert thaw(specs[1]['inputs']) == {
+        'type': 'array', 'minItems': 1, 'maxItems': 1,
+        'items': [{'$ref': '#/definitions/address', 'title': '_to'}]
+    }
+    # anonymous arguments are titled by their type
+    assert thaw(specs[2]['outputs']['items']) == [{'$ref': '#/definitions/address', 'title': 'address'}]
+
+
+def test_overloads_are_indexed_by_signature():
+    index = get_abi_index(ABI)
+
+    assert [function.signature for function in index.by_name['transfer']] == [
+        'transfer(address,uint256)', 'transfer(address)']
+    assert index.by_signature['transfer(address)'] is index.by_name['transfer'][1]
+    assert '' in index
+    assert 'approve' not in index
+
+
+def test_abi_index_and_specs_are_cached():
+    specs = make_generic_function_spec(ABI)
+
+    assert get_abi_index(ABI) is get_abi_index([dict(entry) for entry in ABI])
+    assert all(first is second for first, second in zip(specs, make_generic_function_spec(ABI)))
+    # argument list schemas are shared between functions
+    assert specs[3]['inputs'] is specs[4]['inputs']
+
+    changed = [dict(ABI[0], name='send')] + ABI[1:]
+    assert get_abi_index(changed) is not get_abi_index(ABI)
+    assert make_generic_function_spec(changed)[0]['name'] == 'send'
+
+
+def test_titles_are_merged_by_name_and_signature():
+    specs = make_generic_function_spec(ABI)
+    merged = merge_function_titles2specs(specs, {
+        'transfer': {'title': 'Transfer'},
+        'transfer(address,uint256)': {'title': 'Transfer tokens', 'inputs': [{'title': 'Recipient'}, {}]},
+    })
+
+    assert [spec['title'] for spec in merged] == ['Transfer tokens', 'Transfer', 'owner', 'buy', 'Fallback function']
+    assert [item['title'] for item in merged[0]['inputs']['items']] == ['Recipient', '_value']
+    assert merged[1]['inputs'] is specs[1]['inputs']
+    # specs without titles are passed as is
+    assert all(merged[idx] is specs[idx] for idx in (2, 3, 4))
+
+
+def test_signature_titles_need_matching_types():
+    merged = merge_function_titles2specs(make_generic_function_spec(ABI), {
+        'transfer(address,uint8)': {'title': 'Other overload'},
+    })
+
+    assert [spec['title'] for spec in merged[:2]] == ['transfer', 'transfer']
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from smartz.api.fields_validator import SchemaCompileError, compile_fields_validator
+
+
+def test_ref_to_platform_definitions():
+    validate = compile_fields_validator({
+        "type": "object",
+        "properties": {
+            "owner": {"$ref": "#/definitions/address"},
+            "price": {"$ref": "#/definitions/ethCount"},
+        },
+    })
+
+    assert validate({"owner": "0x" + "ab" * 20, "price": "1.5"}) is None
+    assert validate({"owner": "0x12", "price": "01"}) == {
+        "owner": "Must match pattern ^(?:0[Xx])?[0-9a-fA-F]{40}$",
+        "price": "Must match pattern ^(0|[1-9][0-9]{0,54}|[0-9]{1,55}\\.[0-9]{0,17}[1-9])$",
+    }
+
+
+def test_schema_definitions_extend_platform_ones():
+    validate = compile_fields_validator({
+        "definitions": {"name": {"type": "string", "minLength": 2}},
+        "type": "object",
+        "properties": {"name": {"$ref": "#/definitions/name"}, "owner": {"$ref": "#/definitions/address"}},
+    })
+
+    assert validate({"name": "a", "owner": 1}) == {
+        "name": "Must be at least 2 characters long",
+        "owner": "Must be of type string",
+    }
+
+
+def test_unresolvable_ref():
+    with pytest.raises(SchemaCompileError):
+        compile_fields_validator({"properties": {"a": {"$ref": "#/definitions/missing"}}})
+
+
+def test_nested_property_errors():
+    validate = compile_fields_validator({
+        "type": "object",
+        "required": ["token"],
+        "properties": {
+            "token": {
+                "type": "object",
+                "required": ["name", "symbol"],
+                "properties": {"name": {"type": "string"}, "decimals": {"type": "integer", "maximum": 18}},
+            },
+        },
+    })
+
+    assert validate({}) == {"token": "This field is required"}
+    assert validate({"token": {"name": 1, "decimals": 19}}) == {
+        "token": {
+            "name": "Must be of type string",
+            "symbol": "This field is required",
+            "decimals": "Must be less than or equal to 18",
+        },
+    }
+
+
+def test_additional_properties():
+    closed = compile_fields_validator({"properties": {"a": {}}, "additionalProperties": False})
+    assert closed({"a": 1}) is None
+    assert closed({"a": 1, "b": 2}) == {"b": "Unknown field"}
+
+    typed = compile_fields_validator({"properties": {"a": {}}, "additionalProperties": {"type": "integer"}})
+    assert typed({"a": "x", "b": 2}) is None
+    assert typed({"b": "2"}) == {"b": "Must be of type integer"}
+
+
+def test_min_items_and_unique_items():
+    validate = compile_fields_validator({
+        "properties": {
+            "owners": {"type": "array", "minItems": 2, "uniqueItems": True, "items": {"type": "string"}},
+        },
+    })
+
+    assert validate({"owners": ["a", "b"]}) is None
+    assert validate({"owners": ["a"]}) == {"owners": "Must contain at least 2 items"}
+    assert validate({"owners": ["a", "a"]}) == {"owners": "Items must be unique"}
+    assert validate({"owners": ["a", 2]}) == {"owners": {1: "Must be of type string"}}
+
+
+def test_draft04_exclusive_minimum():
+    validate = compile_fields_validator({
+        "properties": {
+            "exclusive": {"type": "integer", "minimum": 0, "exclusiveMinimum": True},
+            "inclusive": {"type": "integer", "minimum": 0},
+        },
+    })
+
+    assert validate({"exclusive": 1, "inclusive": 0}) is None
+    assert validate({"exclusive": 0, "inclusive": -1}) == {
+        "exclusive": "Must be greater than 0",
+        "inclusive": "Must be greater than or equal to 0",
+    }
+
+
+def test_non_object_fields():
+    validate = compile_fields_validator({"type": "object", "properties": {"a": {"type": "string"}}})
+
+    assert validate([]) == "Must be of type object"
+    assert validate(None) == "Must be of type object"
+
+
+@pytest.mark.parametrize('keyword, value', [
+    ('anyOf', [{"type": "string"}, {"type": "integer"}]),
+    ('oneOf', [{"type": "string"}, {"type": "integer"}]),
+    ('not', {"type": "string"}),
+    ('dependencies', {"a": ["b"]}),
+    ('patternProperties', {"^x": {"type": "string"}}),
+    ('additionalItems', False),
+    ('multipleOf', 2),
+    ('minProperties', 1),
+    ('maxProperties', 1),
+])
+def test_unsupported_keyword(keyword, value):
+    with pytest.raises(SchemaCompileError, match=keyword):
+        compile_fields_validator({"type": "object", "properties": {"a": {keyword: value}}})
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from smartz.api.frozen import FrozenDict, freeze, thaw
+
+
+def test_freeze_nested():
+    frozen = freeze({'a': [{'b': 1}]})
+
+    assert isinstance(frozen, FrozenDict)
+    assert frozen['a'] == (FrozenDict(b=1),)
+    assert thaw(frozen) == {'a': [{'b': 1}]}
+
+
+@pytest.mark.parametrize('modify', [
+    lambda d: d.__setitem__('b', 2),
+    lambda d: d.__delitem__('a'),
+    lambda d: d.update(b=2),
+    lambda d: d.setdefault('b', 2),
+    lambda d: d.pop('a'),
+    lambda d: d.popitem(),
+    lambda d: d.clear(),
+])
+def test_frozen_dict_can_not_be_modified(modify):
+    frozen = freeze({'a': 1})
+
+    with pytest.raises(TypeError):
+        modify(frozen)
+    assert frozen == {'a': 1}
+
+
+def test_frozen_dict_inplace_or():
+    frozen = freeze({'a': 1})
+    alias = frozen
+
+    with pytest.raises(TypeError):
+        alias |= {'b': 2}
+    assert frozen == {'a': 1}
+    # | builds a new mutable dict
+    assert frozen | {'b': 2} == {'a': 1, 'b': 2}
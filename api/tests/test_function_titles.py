@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from smartz.api.constructor_registry import load_constructor
+from smartz.api.frozen import FrozenDict
+from smartz.api.function_titles import FunctionTitles, FunctionTitlesError, prune_function_specs
+
+
+def abi(*names):
+    return [{"type": "function", "name": name, "inputs": [], "outputs": []} for name in names]
+
+
+def test_invalid_titles_are_rejected_when_class_is_defined():
+    with pytest.raises(FunctionTitlesError, match='ui:widget'):
+        class Constructor(object):
+            _FUNCTION_TITLES = FunctionTitles({'mint': {'title': 'Mint', 'ui:widget': 'slider'}})
+
+    with pytest.raises(FunctionTitlesError, match='Unknown field'):
+        FunctionTitles({'mint': {'titel': 'Mint'}})
+
+
+def test_signature_keys_are_matched_by_function_name():
+    titles = FunctionTitles({
+        'transfer(address,uint256)': {'title': 'Transfer tokens'},
+        'mint': {'title': 'Mint'},
+    }, dashboard_functions=['totalSupply'])
+
+    result = titles.post_construct_result(abi('transfer', 'mint', 'totalSupply'))
+    assert result is titles.post_construct_result(abi('totalSupply', 'mint', 'transfer', 'burn'))
+    assert dict(result['function_specs']) == titles.titles
+
+    result = titles.post_construct_result(abi('transfer'))
+    assert list(result['function_specs']) == ['transfer(address,uint256)']
+    assert result['dashboard_functions'] == ()
+
+
+def test_results_are_cached_by_matched_names():
+    titles = FunctionTitles({'mint': {'title': 'Mint'}, 'burn': {'title': 'Burn'}},
+                            dashboard_functions=['totalSupply', 'mint'])
+
+    mint_only = titles.post_construct_result(abi('mint'))
+    assert list(mint_only['function_specs']) == ['mint']
+    assert mint_only['dashboard_functions'] == ('mint',)
+    assert titles.post_construct_result(abi('mint', 'transfer')) is mint_only
+
+    # other ABI doesn't get titles of the previous one
+    burn_only = titles.post_construct_result(abi('burn', 'totalSupply'))
+    assert list(burn_only['function_specs']) == ['burn']
+    assert burn_only['dashboard_functions'] == ('totalSupply',)
+
+    assert titles.post_construct_result(abi('mint')) is mint_only
+
+
+def test_prune_function_specs():
+    titles = {'mint': {'title': 'Mint'}, 'transfer(address,uint256)': {'title': 'Transfer'}}
+
+    dashboard_functions = ['mint']
+    pruned_titles, pruned_dashboard, unmatched = prune_function_specs(titles, dashboard_functions,
+                                                                      abi('mint', 'transfer'))
+    assert pruned_titles is titles and pruned_dashboard is dashboard_functions and unmatched == []
+    assert prune_function_specs(titles, ['mint', 'symbol'], abi('transfer')) == (
+        {'transfer(address,uint256)': {'title': 'Transfer'}}, [], ['mint', 'symbol'])
+
+    specs = [{'name': 'mint'}, {'name': 'burn'}]
+    assert prune_function_specs(specs, [], abi('mint')) == ([{'name': 'mint'}], [], ['burn'])
+
+
+def test_post_construct_of_example_is_shared_and_pruned(examples_dir):
+    loaded = load_constructor(os.path.join(examples_dir, 'dividend_token_constructor.py'))
+    titles = loaded.load()._module.Constructor._FUNCTION_TITLES
+    full_abi = abi(*[name for name in titles.titles] + list(titles.dashboard_functions))
+
+    result = loaded.post_construct({}, full_abi)
+    assert isinstance(result, FrozenDict)
+    assert loaded.post_construct({}, full_abi) is result
+    assert set(result['function_specs']) == set(titles.titles)
+
+    pruned = loaded.post_construct({}, abi('mint', 'pause'))
+    assert set(pruned['function_specs']) == {'mint', 'pause'}
+    assert loaded.post_construct({}, abi('pause', 'mint')) is pruned
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+
+import pytest
+
+from smartz.api.json_stream import write_json, write_json_array, write_json_lines
+
+
+class RecordingStream(io.StringIO):
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+        return super().write(text)
+
+
+@pytest.mark.parametrize('length', [7, 8, 9, 16, 17])
+def test_long_strings_are_written_in_slices(length):
+    # escapes and non-ascii characters fall on slice boundaries
+    source = ('a"\\\nф' * 4)[:length]
+    out = RecordingStream()
+    write_json({"source": source}, out, chunk_size=8)
+
+    assert out.getvalue() == json.dumps({"source": source}, separators=(',', ':'), ensure_ascii=True)
+    if length <= 8:
+        assert out.writes == ['{', '"source"', ':', json.dumps(source), '}']
+    else:
+        slices = out.writes[4:-2]
+        assert out.writes[:4] == ['{', '"source"', ':', '"'] and out.writes[-2:] == ['"', '}']
+        assert [json.loads('"{}"'.format(text)) for text in slices] == \
+            [source[start:start + 8] for start in range(0, length, 8)]
+
+
+def test_nested_strings_are_encoded_at_once():
+    source = 'x' * 20
+    out = RecordingStream()
+    write_json([{"source": source}, source], out, chunk_size=8)
+
+    assert out.writes == ['[', '{"source":"' + source + '"}', ',', '"', 'x' * 8, 'x' * 8, 'x' * 4, '"', ']']
+
+
+def test_scalars_and_lists():
+    for data in (None, 1.5, "x" * 20, [1, "y" * 20, {"a": None}], ()):
+        out = io.StringIO()
+        write_json(data, out, chunk_size=8)
+        assert json.loads(out.getvalue()) == (list(data) if isinstance(data, tuple) else data)
+
+
+def test_lines_and_array():
+    items = [{"n": 1}, {"n": "z" * 10}]
+
+    out = io.StringIO()
+    write_json_lines(iter(items), out, chunk_size=4)
+    assert out.getvalue() == '{"n":1}\n{"n":"zzzzzzzzzz"}\n'
+
+    out = io.StringIO()
+    write_json_array(iter(items), out, chunk_size=4)
+    assert out.getvalue() == '[{"n":1},\n{"n":"zzzzzzzzzz"}]\n'
+    assert json.loads(out.getvalue()) == items
+
+    out = io.StringIO()
+    write_json_array(iter(()), out)
+    assert out.getvalue() == '[]\n'
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from smartz.api.constructor_registry import load_constructor
+from smartz.api.manifest import read_manifest, write_manifest
+
+
+def write_schema_constructor(write_constructor, directory, schema):
+    (directory / 'schema.json').write_text(json.dumps(schema))
+    return write_constructor(
+        imports='from smartz.api.resources import json_resource',
+        attributes="_SCHEMA = json_resource('schema.json')",
+        schema='self._SCHEMA'
+    )
+
+
+def test_manifest_answers_get_params_without_import(tmp_path, write_constructor):
+    filename = write_schema_constructor(write_constructor, tmp_path, {"title": "first"})
+    write_manifest(load_constructor(filename, use_manifest=False))
+
+    loaded = load_constructor(filename)
+    assert loaded.get_params()['schema'] == {"title": "first"}
+    assert not loaded.loaded
+
+
+def test_manifest_is_stale_after_resource_change(tmp_path, write_constructor):
+    filename = write_schema_constructor(write_constructor, tmp_path, {"title": "first"})
+    loaded = load_constructor(filename, use_manifest=False)
+    write_manifest(loaded)
+    assert set(read_manifest(filename, loaded.content_hash)['dependencies']) == {'schema.json'}
+
+    (tmp_path / 'schema.json').write_text(json.dumps({"title": "second"}))
+
+    assert read_manifest(filename, loaded.content_hash) is None
+    assert load_constructor(filename).get_params()['schema'] == {"title": "second"}
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from smartz.api.constructor_registry import ConstructorRegistry
+
+
+def write_versioned(write_constructor, version):
+    filename = write_constructor(
+        imports='from smartz.api.template import Template',
+        attributes="""
+            _TEMPLATE = Template(
+                'contract %name% {\\n'
+                '%if is_mintable%\\n'
+                '    function mint() {}\\n'
+                '%endif%\\n'
+                '    string constant VERSION = "__VERSION__";\\n'
+                '}\\n'
+            )
+        """.replace('__VERSION__', str(version)),
+        source='self._TEMPLATE.render(fields)',
+        contract_name='fields["name"]'
+    )
+    # registry detects changes by mtime and size too
+    os.utime(filename, (1000000 + version, 1000000 + version))
+    return filename
+
+
+def apply_patch(source, patch):
+    for item in reversed(patch):
+        source = source[:item['offset']] + item['replacement'] + source[item['offset'] + item['length']:]
+    return source
+
+
+def test_patch_of_changed_slot(write_constructor):
+    loaded = ConstructorRegistry(use_manifests=False).get(write_versioned(write_constructor, 1))
+
+    first = loaded.construct_preview({"name": "Abc", "is_mintable": True}, validate=False)
+    second = loaded.construct_preview({"name": "Abcd", "is_mintable": True}, first['preview_state'],
+                                      validate=False)
+
+    assert second['changed_fields'] == ['name']
+    assert second['patch'] == [{"offset": len('contract '), "length": 3, "replacement": 'Abcd'}]
+    assert apply_patch(first['source'], second['patch']) == \
+        loaded.construct({"name": "Abcd", "is_mintable": True}, validate=False)['source']
+
+    # section changed: another skeleton
+    third = loaded.construct_preview({"name": "Abcd", "is_mintable": False}, second['preview_state'],
+                                     validate=False)
+    assert 'patch' not in third and 'mint' not in third['source']
+
+
+def test_reloaded_constructor_gets_full_source(write_constructor):
+    registry = ConstructorRegistry(use_manifests=False)
+    fields = {"name": "Abc", "is_mintable": True}
+
+    filename = write_versioned(write_constructor, 1)
+    first = registry.get(filename).construct_preview(fields, validate=False)
+
+    write_versioned(write_constructor, 2)
+    loaded = registry.get(filename)
+    assert loaded.content_hash != first['preview_state']['content_hash']
+
+    second = loaded.construct_preview(fields, first['preview_state'], validate=False)
+    assert 'patch' not in second
+    assert 'VERSION = "2"' in second['source']
+    assert second['preview_state']['content_hash'] == loaded.content_hash
+
+
+def test_previous_result_is_not_trusted(write_constructor):
+    loaded = ConstructorRegistry(use_manifests=False).get(write_versioned(write_constructor, 1))
+    fields = {"name": "Abc", "is_mintable": True}
+
+    state = dict(loaded.construct_preview(fields, validate=False)['preview_state'],
+                 result={"result": "success", "contract_name": "Forged"})
+    response = loaded.construct_preview(fields, state, validate=False)
+
+    assert response['contract_name'] == 'Abc'
+    assert response['patch'] == []
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from smartz.api.profiling import CallProfile, CallProfiler, MetricsCollector
+
+
+def profile(method, wall_time, result='success', output_size=10, peak_memory=None, filename='a.py'):
+    return CallProfile(filename, method, wall_time, wall_time / 2, peak_memory, output_size, result, None)
+
+
+def test_profiler_reports_results_of_calls():
+    profiles = []
+    profiler = CallProfiler([profiles.append], cprofile=True, cprofile_limit=5)
+
+    assert profiler.call('a.py', 'construct', lambda fields: {"result": "success", "n": fields}, 1) == \
+        {"result": "success", "n": 1}
+    profiler.call('a.py', 'construct', lambda: {"result": "error", "error_descr": "x"})
+    with pytest.raises(ZeroDivisionError):
+        profiler.call('a.py', 'construct', lambda: 1 / 0)
+
+    assert [(call.result, call.output_size) for call in profiles] == [
+        ('success', len('{"result":"success","n":1}')), ('error', len('{"result":"error","error_descr":"x"}')),
+        ('exception', None)]
+    assert all(call.wall_time >= 0 and call.peak_memory is None for call in profiles)
+    assert 'cumulative' in profiles[0].profile
+
+
+def test_metrics_aggregation_and_slow_calls():
+    metrics = MetricsCollector(slow_threshold=0.5, slow_calls_limit=2, buckets=(0.1, 1.0))
+    for call_profile in (profile('construct', 0.05), profile('construct', 0.75, 'error', peak_memory=300),
+                         profile('construct', 2.0, 'exception', None, peak_memory=100),
+                         profile('get_params', 0.6), profile('construct', 0.01, filename='b.py')):
+        metrics(call_profile)
+
+    assert metrics.snapshot() == [
+        {"filename": 'a.py', "method": 'construct', "results": {"success": 1, "error": 1, "exception": 1},
+         "wall_time": 2.8, "cpu_time": 1.4, "output_size": 20, "peak_memory_max": 300, "count": 3},
+        {"filename": 'a.py', "method": 'get_params', "results": {"success": 1},
+         "wall_time": 0.6, "cpu_time": 0.3, "output_size": 10, "peak_memory_max": None, "count": 1},
+        {"filename": 'b.py', "method": 'construct', "results": {"success": 1},
+         "wall_time": 0.01, "cpu_time": 0.005, "output_size": 10, "peak_memory_max": None, "count": 1},
+    ]
+    # the most recent slow calls are kept
+    assert [(call.method, call.wall_time) for call in metrics.slow_calls] == [('construct', 2.0), ('get_params', 0.6)]
+
+
+def test_prometheus_text():
+    metrics = MetricsCollector(buckets=(1.0, 0.1))
+    metrics(profile('construct', 0.5, peak_memory=64, filename='dir/"token".py'))
+    metrics(profile('construct', 0.25, 'error'))
+
+    assert metrics.to_prometheus(prefix='ctor') == '\n'.join([
+        '# HELP ctor_calls_total Constructor method calls by result.',
+        '# TYPE ctor_calls_total counter',
+        'ctor_calls_total{constructor="a.py",method="construct",result="error"} 1',
+        'ctor_calls_total{constructor="dir/\\"token\\".py",method="construct",result="success"} 1',
+        '# HELP ctor_call_duration_seconds Wall time of constructor method calls.',
+        '# TYPE ctor_call_duration_seconds histogram',
+        'ctor_call_duration_seconds_bucket{constructor="a.py",method="construct",le="0.1"} 0',
+        'ctor_call_duration_seconds_bucket{constructor="a.py",method="construct",le="1.0"} 1',
+        'ctor_call_duration_seconds_bucket{constructor="a.py",method="construct",le="+Inf"} 1',
+        'ctor_call_duration_seconds_sum{constructor="a.py",method="construct"} 0.25',
+        'ctor_call_duration_seconds_count{constructor="a.py",method="construct"} 1',
+        'ctor_call_duration_seconds_bucket{constructor="dir/\\"token\\".py",method="construct",le="0.1"} 0',
+        'ctor_call_duration_seconds_bucket{constructor="dir/\\"token\\".py",method="construct",le="1.0"} 1',
+        'ctor_call_duration_seconds_bucket{constructor="dir/\\"token\\".py",method="construct",le="+Inf"} 1',
+        'ctor_call_duration_seconds_sum{constructor="dir/\\"token\\".py",method="construct"} 0.5',
+        'ctor_call_duration_seconds_count{constructor="dir/\\"token\\".py",method="construct"} 1',
+        '# HELP ctor_cpu_seconds_total CPU time of constructor method calls.',
+        '# TYPE ctor_cpu_seconds_total counter',
+        'ctor_cpu_seconds_total{constructor="a.py",method="construct"} 0.125',
+        'ctor_cpu_seconds_total{constructor="dir/\\"token\\".py",method="construct"} 0.25',
+        '# HELP ctor_output_bytes_total Size of json-encoded results of constructor method calls.',
+        '# TYPE ctor_output_bytes_total counter',
+        'ctor_output_bytes_total{constructor="a.py",method="construct"} 10',
+        'ctor_output_bytes_total{constructor="dir/\\"token\\".py",method="construct"} 10',
+        '# HELP ctor_peak_memory_bytes Max memory allocated by a constructor method call.',
+        '# TYPE ctor_peak_memory_bytes gauge',
+        'ctor_peak_memory_bytes{constructor="dir/\\"token\\".py",method="construct"} 64',
+    ]) + '\n'
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+from smartz.api.constructor_registry import ConstructorRegistry
+from smartz.api.frozen import FrozenDict
+from smartz.api.result_cache import ConstructResultCache
+
+
+def test_lru_eviction_by_size():
+    # each result is 8 bytes of json
+    cache = ConstructResultCache(max_size=20)
+    cache.put('a', {"v": 1})
+    cache.put('b', {"v": 2})
+    assert cache.get('a') == {"v": 1}
+
+    cache.put('c', {"v": 3})
+    assert cache.get('b') is None
+    assert cache.get('a') == {"v": 1} and cache.get('c') == {"v": 3}
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2, "size": 16, "max_size": 20}
+
+    # results larger than the cache are not kept
+    cache.put('d', {"v": 'x' * 20})
+    assert cache.get('d') is None
+    assert len(cache) == 2
+
+
+def test_disk_round_trip(tmp_path):
+    result = {"result": "success", "source": "contract A {}", "snippets": [{"name": "SafeMath"}]}
+    key = ConstructResultCache.make_key('fingerprint', {"name": "A"})
+
+    stored = ConstructResultCache(directory=str(tmp_path)).put(key, result)
+    assert isinstance(stored, FrozenDict)
+
+    restarted = ConstructResultCache(directory=str(tmp_path))
+    loaded = restarted.get(key)
+    assert loaded == stored
+    assert isinstance(loaded, FrozenDict)
+    # loaded results are kept in memory
+    assert len(restarted) == 1
+
+
+def test_results_which_are_not_json_are_not_cached(tmp_path):
+    cache = ConstructResultCache(directory=str(tmp_path))
+    result = {"result": "success", "source": object()}
+
+    assert cache.put('key', result) is result
+    assert cache.get('key') is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_host_values_are_part_of_the_key(write_constructor):
+    filename = write_constructor(
+        imports='from smartz.api.template import Template',
+        attributes="_TEMPLATE = Template('contract A { %payment_code% }', passthrough=('payment_code',))",
+        source='self._TEMPLATE.render()'
+    )
+    cache = ConstructResultCache()
+    loaded = ConstructorRegistry(cache, use_manifests=False).get(filename)
+
+    plain = loaded.construct({})
+    paid = loaded.construct({}, host_values={"payment_code": "pay();"})
+    free = loaded.construct({}, host_values={"payment_code": ""})
+
+    assert [result['source'] for result in (plain, paid, free)] == [
+        'contract A { %payment_code% }', 'contract A { pay(); }', 'contract A {  }']
+    assert loaded.construct({}, host_values={"payment_code": "pay();"}) is paid
+    assert cache.stats()['entries'] == 3
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from smartz.api.constructor_registry import load_constructor
+from smartz.api.manifest import read_manifest, write_manifest
+from smartz.api.snippets import SnippetRegistry
+from smartz.api.template import Template
+
+
+def write_snippet(directory, version, text):
+    (directory / 'snippets' / 'Lib').mkdir(parents=True, exist_ok=True)
+    (directory / 'snippets' / 'Lib' / (version + '.sol')).write_text(text)
+
+
+def test_pinned_snippet_does_not_follow_new_versions(tmp_path):
+    write_snippet(tmp_path, '1', 'library Lib {}\n')
+    registry = SnippetRegistry(str(tmp_path / 'snippets'), '.sol')
+    pinned = Template('%snippet Lib@1%\n', snippets=registry)
+    latest = Template('%snippet Lib%\n', snippets=registry)
+
+    write_snippet(tmp_path, '2', 'library Lib { uint x; }\n')
+    registry = SnippetRegistry(str(tmp_path / 'snippets'), '.sol')
+
+    assert Template('%snippet Lib@1%\n', snippets=registry).render({}) == pinned.render({})
+    assert Template('%snippet Lib%\n', snippets=registry).render({}) != latest.render({})
+    assert Template('%snippet Lib%\n', snippets=registry).fingerprint != latest.fingerprint
+
+
+def test_new_snippet_version_invalidates_manifest_and_cache_key(tmp_path, write_constructor):
+    write_snippet(tmp_path, '1', 'library Lib {}\n')
+    filename = write_constructor(
+        imports="""
+            import os
+
+            from smartz.api.snippets import SnippetRegistry
+            from smartz.api.template import Template
+        """,
+        attributes="""
+            _TEMPLATE = Template("%snippet Lib%\\ncontract A {}\\n",
+                                 snippets=SnippetRegistry(os.path.join(os.path.dirname(__file__), 'snippets'), '.sol'))
+        """,
+        source='self._TEMPLATE.render({})'
+    )
+
+    loaded = load_constructor(filename, use_manifest=False)
+    write_manifest(loaded)
+    assert read_manifest(filename, loaded.content_hash) is not None
+    assert load_constructor(filename).output_fingerprint == loaded.output_fingerprint
+
+    write_snippet(tmp_path, '2', 'library Lib { uint x; }\n')
+
+    assert read_manifest(filename, loaded.content_hash) is None
+    reloaded = load_constructor(filename)
+    assert reloaded.output_fingerprint != loaded.output_fingerprint
+    assert reloaded.construct({})['snippets'][0]['version'] == '2'
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from smartz.api.compile_cache import CachingCompiler, StubCompilerBackend
+from smartz.api.constructor_host import ConstructorHost
+from smartz.api.constructor_registry import ConstructorRegistry
+from smartz.api.source_lint import SourceLinter, lint_source
+
+
+def codes(problems):
+    return [problem['code'] for problem in problems]
+
+
+def test_valid_source():
+    assert lint_source('pragma solidity ^0.4.20;\n\ncontract A {\n  function f() {}\n}\n', 'A') == []
+
+
+def test_unfilled_placeholder():
+    problems = lint_source('contract A {\n  uint x = %amount%;\n}', 'A')
+
+    assert codes(problems) == ['unfilled_placeholder']
+    assert problems[0]['line'] == 2
+
+
+def test_percent_in_string_is_not_a_placeholder():
+    assert lint_source('contract A { string s = "50%off%"; }', 'A') == []
+    assert lint_source("contract A { string s = '%name%'; }", 'A') == []
+
+
+def test_placeholder_in_comment_is_ignored():
+    assert lint_source('contract A {\n  // fill %later%\n  /* %x% */\n}', 'A') == []
+
+
+def test_declaration_in_comment_does_not_count():
+    assert codes(lint_source('// contract A {}\ncontract B {}', 'A')) == ['contract_not_declared']
+    assert codes(lint_source('/* contract A */ contract B {}', 'A')) == ['contract_not_declared']
+    assert codes(lint_source('contract B { string s = "contract A"; }', 'A')) == ['contract_not_declared']
+
+
+def test_unbalanced_braces():
+    assert codes(lint_source('contract A {\n  function f() {\n}', 'A')) == ['unbalanced_braces']
+
+    problems = lint_source('contract A {\n  /* { */ string s = "}";\n}\n}', 'A')
+    assert codes(problems) == ['unbalanced_braces']
+    assert problems[0]['line'] == 4
+
+
+def test_source_must_be_string():
+    assert codes(lint_source(None, 'A')) == ['invalid_source']
+
+    result = SourceLinter().check_result({"result": "success", "source": 42, "contract_name": "A"})
+    assert result['result'] == 'error'
+
+
+def test_host_rejects_invalid_compile_request():
+    registry = ConstructorRegistry(linter=SourceLinter())
+    host = ConstructorHost(registry, compiler=CachingCompiler(StubCompilerBackend()))
+
+    response = json.loads(host.handle_line(json.dumps(
+        {"id": 1, "method": "compile", "params": {"source": ["contract A {}"], "contract_name": "A"}})))
+
+    assert response['response']['lint_errors'][0]['code'] == 'invalid_source'
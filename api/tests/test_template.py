@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from smartz.api.constructor_registry import load_constructor
+from smartz.api.template import MAX_SKELETONS, Template, TemplateError, render_context
+
+
+def test_flat_template():
+    template = Template('contract %name% { uint %name%Count = %count%; }')
+
+    assert not template.sections
+    assert template.placeholders == {'name', 'count'}
+    assert template.render(name='Token', count=3) == 'contract Token { uint TokenCount = 3; }'
+
+
+def test_strict_rejects_unknown_and_missing_placeholders():
+    template = Template('a%b%c')
+
+    assert template.placeholders == {'b'}
+    assert template.render(b='-') == 'a-c'
+
+    with pytest.raises(TemplateError, match='Unknown placeholders: x'):
+        template.render(b='-', x=1)
+    with pytest.raises(TemplateError, match='Placeholders are not filled: b'):
+        template.render()
+
+    assert template.render(strict=False, x=1) == 'a%b%c'
+
+
+@pytest.mark.parametrize('tag', ['else', 'endif', 'endfor'])
+def test_reserved_names_are_not_placeholders(tag):
+    with pytest.raises(TemplateError, match='Unexpected %{}% at line 2'.format(tag)):
+        Template('contract A {\n    %' + tag + '%\n}')
+
+
+def test_nested_if_else():
+    template = Template('%if a%A%if not b%!B%else%B%endif%%else%-%endif%')
+
+    assert template.render(a=True, b=False) == 'A!B'
+    assert template.render(a=True, b=True) == 'AB'
+    assert template.render(a=False, b=True) == '-'
+
+    with pytest.raises(TemplateError, match='Section value is not provided: b'):
+        template.render(a=True)
+    assert template.render(a=True, strict=False) == 'A!B'
+
+
+def test_standalone_section_tags_are_removed_with_their_line():
+    template = Template(
+        'contract A {\n'
+        '    %if is_pausable%\n'
+        '    bool paused;%if is_mintable% bool minting;%endif%\n'
+        '    %endif%\n'
+        '}\n'
+    )
+
+    assert template.render(is_pausable=True, is_mintable=True) == \
+        'contract A {\n    bool paused; bool minting;\n}\n'
+    assert template.render(is_pausable=True, is_mintable=False) == 'contract A {\n    bool paused;\n}\n'
+    assert template.render(is_pausable=False, is_mintable=True) == 'contract A {\n}\n'
+
+
+def test_for_over_dict_items_and_plain_items():
+    template = Template(
+        '%for holders%\n'
+        'balances[%address%] = %amount%;\n'
+        '%endfor%\n'
+        '%for owners%owners.push(%item%);%endfor%'
+    )
+
+    assert template.axes == ()
+    assert template.render(holders=[{'address': '0x1', 'amount': 10}, {'address': '0x2', 'amount': 20}],
+                           owners=['0x3', '0x4']) == \
+        'balances[0x1] = 10;\nbalances[0x2] = 20;\nowners.push(0x3);owners.push(0x4);'
+
+
+def test_host_slots_in_flat_and_skeleton_renders():
+    flat = Template('%name% %payment_code%', passthrough=('payment_code',))
+    sections = Template('%if paid%%payment_code%%else%free%endif% %name%', passthrough=('payment_code',))
+
+    assert flat.render(name='A') == 'A %payment_code%'
+
+    with render_context({'payment_code': 'pay();'}) as context:
+        assert flat.render(name='A') == 'A pay();'
+        assert sections.render(paid=True, name='B') == 'pay(); B'
+        assert sections.render(paid=False, name='C') == 'free C'
+    assert context.host_slots == {'payment_code'}
+
+    with pytest.raises(TemplateError, match='Unknown placeholders: payment_code'):
+        flat.render(name='A', payment_code='x')
+
+
+def test_skeletons_are_reused():
+    template = Template('%if a%A%endif%%if b%B%endif%%name%')
+
+    assert template.axes == ('a', 'b')
+    assert template.skeleton({'a': True, 'b': False}) is template.skeleton({'a': 1, 'b': 0})
+
+    template.render(a=True, b=False, name='x')
+    template.render(a=True, b=False, name='y')
+    assert template.cached_skeletons == 1
+
+    assert template.prerender() == 4
+    assert template.render(a=False, b=True, name='z') == 'Bz'
+    assert template.cached_skeletons == 4
+
+
+def test_skeleton_cache_is_capped():
+    axes = ['s{}'.format(idx) for idx in range(9)]
+    template = Template(''.join('%if {0}%{0}%endif%'.format(name) for name in axes))
+
+    assert MAX_SKELETONS == 256
+    assert template.prerender(max_variants=1000) == MAX_SKELETONS
+
+    values = dict.fromkeys(axes, True)
+    assert template.render(values) == ''.join(axes)
+    assert template.skeleton(values) is not template.skeleton(values)
+    assert template.cached_skeletons == MAX_SKELETONS
+
+
+def test_host_slots_in_sections_rendered_node_by_node():
+    template = Template('%for owners%%item%: %payment_code%\n%endfor%', passthrough=('payment_code',))
+
+    assert template.axes == ()
+    with render_context({'payment_code': 'pay();'}):
+        assert template.render(owners=['a', 'b']) == 'a: pay();\nb: pay();\n'
+    assert template.render(owners=['a']) == 'a: %payment_code%\n'
+
+
+def test_host_values_of_constructor_with_and_without_templates(write_constructor):
+    host_values = {'payment_code': 'pay();'}
+    skeleton = load_constructor(write_constructor(
+        'skeleton.py',
+        imports='from smartz.api.template import Template',
+        attributes="""
+            _TEMPLATE = Template('contract A {%if paid% %payment_code%%endif% }', passthrough=('payment_code',))
+        """,
+        source='self._TEMPLATE.render(fields)'
+    ), use_manifest=False)
+    plain = load_constructor(write_constructor('plain.py', source='"contract A { %payment_code% }"'),
+                             use_manifest=False)
+
+    assert skeleton.construct({'paid': True}, host_values=host_values)['source'] == 'contract A { pay(); }'
+    assert skeleton.construct({'paid': False}, host_values=host_values)['source'] == 'contract A { }'
+    assert skeleton.construct({'paid': True})['source'] == 'contract A { %payment_code% }'
+    # constructor which doesn't render templates gets host slots filled in its source
+    assert plain.construct({}, host_values=host_values)['source'] == 'contract A { pay(); }'
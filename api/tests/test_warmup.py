@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from smartz.api.constructor_registry import load_constructor
+
+
+def test_warmup_of_dividend_example(examples_dir):
+    loaded = load_constructor(os.path.join(examples_dir, 'dividend_token_constructor.py'), use_manifest=False)
+
+    report = loaded.warmup()
+
+    assert loaded.feature_axes == [('is_mintable', [False, True]), ('is_pausable', [False, True]),
+                                   ('max_tokens_count', [None, 100])]
+    # 2 * 2 * 2 variants, but the template is capped only if it is mintable: 3 * 2 skeletons
+    assert (report['variants'], report['failed']) == (8, 0)
+    assert report['skeletons'] == {'_TEMPLATE': 6}
+    assert report['seconds'] >= 0
+
+
+def test_warmup_is_limited_by_max_variants(examples_dir):
+    loaded = load_constructor(os.path.join(examples_dir, 'dividend_token_constructor.py'), use_manifest=False)
+
+    assert loaded.warmup(max_variants=3)['variants'] == 3
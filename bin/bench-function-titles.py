@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+#
+# Measures make_generic_function_spec() + merge_function_titles2specs() on synthetic ABIs of growing size.
+# Time per function should stay flat as the ABI grows.
+
+import sys
+import os
+import argparse
+import time
+
+api_dir = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'api'))
+sys.path.append(api_dir)
+
+from smartz.eth.contracts import make_generic_function_spec, merge_function_titles2specs
+
+
+def make_abi(functions_count):
+    abi = []
+    for idx in range(functions_count):
+        abi.append({
+            'type': 'function',
+            'name': 'func{}'.format(idx),
+            'constant': idx % 2 == 0,
+            'payable': False,
+            'inputs': [{'name': '_to', 'type': 'address'}, {'name': '_amount', 'type': 'uint256'}],
+            'outputs': [{'name': '', 'type': 'bool'}]
+        })
+        # every tenth function is overloaded
+        if idx % 10 == 0:
+            abi.append(dict(abi[-1], inputs=[{'name': '_to', 'type': 'address'}]))
+
+    return abi
+
+
+def make_titles(functions_count):
+    titles = {}
+    # half of the functions have titles
+    for idx in range(0, functions_count, 2):
+        titles['func{}'.format(idx)] = {
+            'title': 'Function {}'.format(idx),
+            'description': 'Description of function {}'.format(idx),
+            'sorting_order': idx,
+            'inputs': [{'title': 'Address'}, {'title': 'Amount', 'description': 'In the smallest units'}]
+        }
+    for idx in range(0, functions_count, 10):
+        titles['func{}(address)'.format(idx)] = {'title': 'Overload of function {}'.format(idx)}
+
+    return titles
+
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks merging of function titles into function specs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 4000, 8000],
+                        help='ABI sizes (functions count)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeats per size, best time is reported')
+    args = parser.parse_args()
+
+    print('{:>10} {:>14} {:>14} {:>18}'.format('functions', 'specs, ms', 'merge, ms', 'merge per func, us'))
+    for size in args.sizes:
+        abi = make_abi(size)
+        titles = make_titles(size)
+
+        specs_time = measure(lambda: make_generic_function_spec(abi), args.repeat)
+        specs = make_generic_function_spec(abi)
+        merge_time = measure(lambda: merge_function_titles2specs(specs, titles), args.repeat)
+
+        print('{:>10} {:>14.3f} {:>14.3f} {:>18.3f}'.format(
+            len(specs), specs_time * 1000, merge_time * 1000, merge_time / len(specs) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,17 +3,28 @@
 import sys
 import os
 import argparse
-import importlib
+import glob
+from collections import deque
 from contextlib import contextmanager
-from tempfile import mkdtemp
-from shutil import rmtree, copy2
 from pprint import pprint
 import json
 
 api_dir = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'api'))
 sys.path.append(api_dir)
 
-from smartz.api.constructor_engine import ConstructorInstance
+from smartz.api.bench import bench as bench_constructors
+from smartz.api.bundle import BundleError, ConstructorBundle, pack as pack_bundle, scan_constructors
+from smartz.api.compile_cache import ArtifactStore, CachingCompiler, CompilationError, SolcBackend
+from smartz.api.constructor_host import ConstructorHost
+from smartz.api.constructor_pool import ConstructorPool
+from smartz.api.constructor_registry import ConstructorLoadError, ConstructorRegistry, load_constructor, \
+    unload_constructor
+from smartz.api.function_titles import prune_function_specs
+from smartz.api.json_stream import write_json, write_json_array, write_json_lines
+from smartz.api.manifest import write_manifest
+from smartz.api.profiling import CallProfiler, MetricsCollector
+from smartz.api.result_cache import ConstructResultCache
+from smartz.api.source_lint import SourceLinter
 
 
 def die(message, *args):
@@ -23,49 +34,262 @@ def die(message, *args):
 
 @contextmanager
 def instantiate(filename):
-    temp_dir = mkdtemp(prefix='run_constructor')
-    copy2(filename, os.path.join(temp_dir, 'constructor.py'))
-
-    sys.path.append(temp_dir)
     try:
-        module = importlib.import_module('constructor')
-    except ImportError as exc:
-        die('Failed to import file {} as a module: {}', filename, exc)
-
-    if not hasattr(module, 'Constructor') or not isinstance(module.Constructor, type):
-        die('Constructor class in not found in the file {}', filename)
+        loaded = load_constructor(filename)
+    except ConstructorLoadError as exc:
+        die('{}', exc)
 
-    constructor_object = module.Constructor()
-    if not isinstance(constructor_object, ConstructorInstance):
-        die('Constructor is not an instance of the type ConstructorInstance')
+    try:
+        yield loaded
+    finally:
+        unload_constructor(loaded)
 
-    yield constructor_object
 
-    rmtree(temp_dir)
+def output(result, args):
+    if args.format == 'text':
+        pprint(result, width=120)
+    else:
+        write_json(result, sys.stdout)
+        sys.stdout.write('\n')
 
 
 def get_params(args):
     filename = args.filename[0]
     with instantiate(filename) as constructor_object:
-        pprint(constructor_object.get_params(), width=120)
+        output(constructor_object.get_params(), args)
 
 
-def construct(args):
-    filename = args.filename[0]
+def read_fields_arg(args):
     if getattr(args, 'fields_file'):
         with open(args.fields_file) as fh:
-            fields = json.load(fh)
+            return json.load(fh)
     else:
-        fields = json.loads(args.fields_json)
+        return json.loads(args.fields_json)
+
+
+def construct(args):
+    filename = args.filename[0]
+    fields = read_fields_arg(args)
+
+    host_values = json.loads(args.host_values_json) if args.host_values_json else None
 
     with instantiate(filename) as constructor_object:
-        result = constructor_object.construct(fields)
-        if result['result'] == 'error':
-            pprint(result, width=120)
+        if args.lint:
+            constructor_object.linter = SourceLinter()
+        result = constructor_object.construct(fields, validate=not args.no_validate, host_values=host_values)
+        if args.format != 'text' or result['result'] == 'error':
+            output(result, args)
         else:
             print(result['source'])
 
 
+def build(args):
+    filename = args.filename[0]
+    fields = read_fields_arg(args)
+    compiler = CachingCompiler(SolcBackend(args.solc), ArtifactStore(args.artifacts_dir))
+
+    with instantiate(filename) as constructor_object:
+        # broken sources are not sent to compiler
+        constructor_object.linter = SourceLinter()
+        result = {'construct': constructor_object.construct(fields)}
+        if result['construct']['result'] == 'success':
+            try:
+                artifact = compiler.compile(result['construct']['source'], result['construct']['contract_name'])
+            except CompilationError as exc:
+                die('Compilation failed: {}', exc)
+
+            result['artifact'] = artifact
+            post_construct = constructor_object.post_construct(fields, artifact['abi'], prune=False)
+            if post_construct['result'] == 'success':
+                function_specs, dashboard_functions, unmatched = prune_function_specs(
+                    post_construct.get('function_specs', {}), post_construct.get('dashboard_functions', []),
+                    artifact['abi'])
+                post_construct = dict(post_construct, function_specs=function_specs,
+                                      dashboard_functions=dashboard_functions)
+                result['unmatched_function_specs'] = unmatched
+
+            result['post_construct'] = post_construct
+
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+def write_results(results, args):
+    if args.format == 'json':
+        write_json_array(results, sys.stdout)
+    else:
+        write_json_lines(results, sys.stdout)
+
+
+def construct_batch(args):
+    # (number of valid lines before the invalid one, error result), answered in place of the invalid line
+    invalid_lines = deque()
+
+    def read_fields(fh):
+        valid_lines = 0
+        for line_num, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                fields = json.loads(line)
+            except ValueError as exc:
+                invalid_lines.append((valid_lines, {
+                    "result": "error",
+                    "error_descr": 'Line {} of {} is not a valid json: {}'.format(line_num, args.fields_file, exc)
+                }))
+                continue
+            valid_lines += 1
+            yield fields
+
+    def in_order(results):
+        # input is read ahead of results by the pool, errors are released once results before them are out
+        for idx, result in enumerate(results):
+            while invalid_lines and invalid_lines[0][0] <= idx:
+                yield invalid_lines.popleft()[1]
+            yield result
+        while invalid_lines:
+            yield invalid_lines.popleft()[1]
+
+    filename = args.filename[0]
+    validate = not args.no_validate
+    fh = sys.stdin if args.fields_file == '-' else open(args.fields_file)
+    try:
+        if args.processes:
+            try:
+                pool = ConstructorPool([filename], args.processes, validate)
+            except ConstructorLoadError as exc:
+                die('{}', exc)
+            with pool:
+                write_results(in_order(pool.construct_many(filename, read_fields(fh))), args)
+                if args.stats:
+                    json.dump({"workers": pool.worker_stats()}, sys.stderr, indent=2, sort_keys=True)
+                    sys.stderr.write('\n')
+        else:
+            with instantiate(filename) as constructor_object:
+                write_results(in_order(constructor_object.construct_many(read_fields(fh), validate)), args)
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+def serve(args):
+    result_cache = None
+    if args.cache_size or args.cache_dir:
+        result_cache = ConstructResultCache(args.cache_size or 64 * 1024 * 1024, args.cache_dir)
+
+    profiler = metrics = None
+    if args.profile or args.profile_memory or args.cprofile or args.slow_threshold or args.metrics_file:
+        metrics = MetricsCollector(args.slow_threshold)
+        profiler = CallProfiler([metrics], trace_memory=args.profile_memory, cprofile=args.cprofile)
+
+    linter = SourceLinter() if args.lint else None
+
+    if args.bundle:
+        try:
+            registry = ConstructorBundle(args.bundle, result_cache, profiler, linter)
+        except (OSError, BundleError) as exc:
+            die('{}', exc)
+    elif args.filename:
+        registry = ConstructorRegistry(result_cache, profiler, linter=linter)
+    else:
+        die('Constructor file or --bundle is required')
+
+    compiler = None
+    if args.solc:
+        compiler = CachingCompiler(SolcBackend(args.solc), ArtifactStore(args.artifacts_dir))
+
+    filename = args.filename
+    if filename is not None:
+        try:
+            loaded = registry.get(filename)
+            if args.warmup:
+                loaded.warmup(args.warmup)
+        except ConstructorLoadError as exc:
+            die('{}', exc)
+
+    host = ConstructorHost(registry, filename, compiler, metrics)
+    try:
+        if args.socket:
+            host.serve_unix_socket(args.socket)
+        else:
+            host.serve_stream(sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.metrics_file:
+            metrics.write_prometheus(args.metrics_file)
+
+
+def pack(args):
+    filenames = []
+    for path in args.path:
+        filenames.extend(scan_constructors(path) if os.path.isdir(path) else [path])
+
+    base_dir = args.base_dir
+    if base_dir is None:
+        base_dir = args.path[0] if len(args.path) == 1 and os.path.isdir(args.path[0]) else os.getcwd()
+
+    try:
+        names, errors = pack_bundle(filenames, args.output, base_dir, args.skip_invalid)
+    except BundleError as exc:
+        die('{}', exc)
+
+    for filename, error in sorted(errors.items()):
+        print('Skipped {}: {}'.format(filename, error), file=sys.stderr)
+    for name in names:
+        print(name)
+
+
+def warmup(args):
+    report = {"constructors": {}}
+    for filename in args.filename:
+        with instantiate(filename) as constructor_object:
+            report['constructors'][filename] = dict(constructor_object.warmup(args.max_variants),
+                                                    feature_axes=constructor_object.feature_axes)
+
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+def manifest(args):
+    for filename in args.filename:
+        try:
+            loaded = load_constructor(filename, use_manifest=False)
+        except ConstructorLoadError as exc:
+            die('{}', exc)
+
+        try:
+            print(write_manifest(loaded))
+        except ValueError as exc:
+            die('Failed to build manifest of {}: {}', filename, exc)
+        finally:
+            unload_constructor(loaded)
+
+
+def bench(args):
+    filenames = args.filename or sorted(glob.glob(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..',
+                                                               'constructor_examples', '*.py')))
+    compiler = None
+    if args.solc:
+        compiler = CachingCompiler(SolcBackend(args.solc), ArtifactStore(args.artifacts_dir))
+
+    try:
+        report = bench_constructors(filenames, iterations=args.iterations, max_field_sets=args.max_field_sets,
+                                    compiler=compiler, trace_allocations=not args.no_tracemalloc)
+    except ConstructorLoadError as exc:
+        die('{}', exc)
+    except CompilationError as exc:
+        die('Compilation failed: {}', exc)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+            fh.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
 def main():
     parser = argparse.ArgumentParser(description='Runs constructor as if it\'s being run by smartz platform.')
 
@@ -75,6 +299,8 @@ def main():
     parser_get_params.set_defaults(func=get_params)
     parser_get_params.add_argument('filename', type=str, nargs=1,
                         help='constructor file name')
+    parser_get_params.add_argument('--format', choices=('text', 'json', 'jsonl'), default='text',
+                        help='Output format: text (pretty-printed) or compact json streamed to stdout')
 
     parser_construct = subparsers.add_parser('construct')
     parser_construct.set_defaults(func=construct)
@@ -85,6 +311,137 @@ def main():
                         help='Json-encoded fields provided to construct() by user')
     group.add_argument('--fields-file', type=str,
                         help='Json file which provides fields to construct() by user')
+    parser_construct.add_argument('--no-validate', action='store_true',
+                        help='Do not validate fields against schema provided by get_params()')
+    parser_construct.add_argument('--lint', action='store_true',
+                        help='Check constructed source for unfilled placeholders, undeclared contract name and '
+                             'unbalanced braces')
+    parser_construct.add_argument('--host-values-json', type=str,
+                        help='Json-encoded values of host-provided template slots, e.g. {"payment_code": "..."}')
+    parser_construct.add_argument('--format', choices=('text', 'json', 'jsonl'), default='text',
+                        help='Output format: text (source or pretty-printed error) or whole result as compact json '
+                             'streamed to stdout')
+
+    parser_build = subparsers.add_parser('build', help='Runs construct(), compiles source with solc '
+                                                       '(reusing cached artifacts) and runs post_construct()')
+    parser_build.set_defaults(func=build)
+    parser_build.add_argument('filename', type=str, nargs=1,
+                        help='constructor file name')
+    group = parser_build.add_mutually_exclusive_group(required=True)
+    group.add_argument('--fields-json', type=str,
+                        help='Json-encoded fields provided to construct() by user')
+    group.add_argument('--fields-file', type=str,
+                        help='Json file which provides fields to construct() by user')
+    parser_build.add_argument('--solc', type=str, default='solc',
+                        help='Path to solc binary')
+    parser_build.add_argument('--artifacts-dir', type=str,
+                        help='Directory of compiled artifacts cache')
+
+    parser_construct_batch = subparsers.add_parser('construct-batch',
+                                                   help='Runs construct() for each line of json lines file of fields, '
+                                                        'writes json lines of results')
+    parser_construct_batch.set_defaults(func=construct_batch)
+    parser_construct_batch.add_argument('filename', type=str, nargs=1,
+                        help='constructor file name')
+    parser_construct_batch.add_argument('--fields-file', type=str, required=True,
+                        help='Json lines file, each line provides fields to construct() by user. - for stdin. '
+                             'Lines which are not valid json are answered with error results')
+    parser_construct_batch.add_argument('--processes', type=int,
+                        help='Run constructors in that many worker processes')
+    parser_construct_batch.add_argument('--stats', action='store_true',
+                        help='Write calls and busy time of each worker process to stderr after the batch '
+                             '(with --processes)')
+    parser_construct_batch.add_argument('--no-validate', action='store_true',
+                        help='Do not validate fields against schema provided by get_params()')
+    parser_construct_batch.add_argument('--format', choices=('json', 'jsonl'), default='jsonl',
+                        help='Output format: json lines or a json array')
+
+    parser_serve = subparsers.add_parser('serve', help='Loads constructor once and serves json lines requests '
+                                                       '{"id": .., "method": .., "params": {..}} '
+                                                       'from stdin or unix socket')
+    parser_serve.set_defaults(func=serve)
+    parser_serve.add_argument('filename', type=str, nargs='?',
+                        help='default constructor file name (name in bundle if --bundle is used), '
+                             'requests can pick another one by "constructor" key')
+    parser_serve.add_argument('--bundle', type=str,
+                        help='Serve constructors of bundle written by pack command, addressed by their names')
+    parser_serve.add_argument('--socket', type=str,
+                        help='Path of unix socket to listen instead of stdin/stdout')
+    parser_serve.add_argument('--cache-size', type=int,
+                        help='Cache construct() results, max total size of cached results in bytes')
+    parser_serve.add_argument('--cache-dir', type=str,
+                        help='Cache construct() results, also storing them in this directory')
+    parser_serve.add_argument('--solc', type=str,
+                        help='Path to solc binary, enables compile requests')
+    parser_serve.add_argument('--artifacts-dir', type=str,
+                        help='Directory of compiled artifacts cache')
+    parser_serve.add_argument('--warmup', type=int, metavar='MAX_VARIANTS',
+                        help='Construct up to that many variants of feature axes of default constructor before '
+                             'serving, so skeletons of its templates are rendered')
+    parser_serve.add_argument('--lint', action='store_true',
+                        help='Check constructed and compiled sources for unfilled placeholders, undeclared contract '
+                             'name and unbalanced braces before they reach compiler')
+    parser_serve.add_argument('--profile', action='store_true',
+                        help='Measure wall/cpu time and output size of constructor calls, enables metrics requests')
+    parser_serve.add_argument('--profile-memory', action='store_true',
+                        help='Also measure peak memory of constructor calls with tracemalloc')
+    parser_serve.add_argument('--cprofile', action='store_true',
+                        help='Also capture cProfile stats of constructor calls, reported for slow calls')
+    parser_serve.add_argument('--slow-threshold', type=float,
+                        help='Report constructor calls slower than that many seconds in metrics response')
+    parser_serve.add_argument('--metrics-file', type=str,
+                        help='Write metrics in Prometheus text format to this file on exit')
+
+    parser_pack = subparsers.add_parser('pack', help='Checks constructors and packs their bytecode, sources and '
+                                                     'get_version()/get_params() results into a single bundle '
+                                                     'to be served with serve --bundle')
+    parser_pack.set_defaults(func=pack)
+    parser_pack.add_argument('path', type=str, nargs='+',
+                        help='constructor files or directories scanned for them')
+    parser_pack.add_argument('--output', '-o', type=str, required=True,
+                        help='Bundle file to write')
+    parser_pack.add_argument('--base-dir', type=str,
+                        help='Constructors are named by paths relative to it. Default is the packed directory, '
+                             'or current directory if files are given')
+    parser_pack.add_argument('--skip-invalid', action='store_true',
+                        help='Leave out invalid constructors instead of failing')
+
+    parser_warmup = subparsers.add_parser('warmup', help='Constructs each variant of feature axes of constructors '
+                                                         '(declared FEATURE_AXES or boolean and enum fields) and '
+                                                         'reports rendered skeletons of their templates. Results '
+                                                         'of sample fields are not cached or compiled')
+    parser_warmup.set_defaults(func=warmup)
+    parser_warmup.add_argument('filename', type=str, nargs='+',
+                        help='constructor file names')
+    parser_warmup.add_argument('--max-variants', type=int, default=64,
+                        help='Max number of variants of each constructor')
+
+    parser_manifest = subparsers.add_parser('manifest', help='Writes results of get_version() and get_params() '
+                                                             'next to constructor file (token.py -> '
+                                                             'token.manifest.json), so they are answered '
+                                                             'without importing the constructor')
+    parser_manifest.set_defaults(func=manifest)
+    parser_manifest.add_argument('filename', type=str, nargs='+',
+                        help='constructor file names')
+
+    parser_bench = subparsers.add_parser('bench', help='Measures get_version(), get_params(), construct() and '
+                                                       'post_construct() of constructors over generated field sets, '
+                                                       'writes json report')
+    parser_bench.set_defaults(func=bench)
+    parser_bench.add_argument('filename', type=str, nargs='*',
+                        help='constructor file names, constructor_examples/*.py by default')
+    parser_bench.add_argument('--iterations', type=int, default=100,
+                        help='Number of passes over field sets')
+    parser_bench.add_argument('--max-field-sets', type=int, default=16,
+                        help='Max number of field sets generated from schema of each constructor')
+    parser_bench.add_argument('--no-tracemalloc', action='store_true',
+                        help='Do not measure allocations')
+    parser_bench.add_argument('--solc', type=str,
+                        help='Path to solc binary, ABI for post_construct() is approximated from source otherwise')
+    parser_bench.add_argument('--artifacts-dir', type=str,
+                        help='Directory of compiled artifacts cache')
+    parser_bench.add_argument('--output', type=str,
+                        help='Write report to this file instead of stdout')
 
     args = parser.parse_args()
     args.func(args)
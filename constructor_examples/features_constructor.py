@@ -1,5 +1,7 @@
 import time
 from smartz.api.constructor_engine import ConstructorInstance
+from smartz.api.function_titles import FunctionTitles
+from smartz.api.template import Template
 
 
 class Constructor(ConstructorInstance):
@@ -170,135 +172,130 @@ class Constructor(ConstructorInstance):
 
         return {
             "result": "success",
-            'source': self._TEMPLATE,
+            'source': self._TEMPLATE.render(),
             'contract_name': "SmartzFeatures"
         }
 
     def post_construct(self, fields, abi_array):
-
-        function_titles = {
-
-            'publicVar': {
-                'title': 'Public var',
-                'description': 'View function for public var',
-                'sorting_order': 5
-            },
-
-            'cubeIt': {
-                'title': 'Cube it',
-                'description': 'Ask fuction for cube some integer',
-                'sorting_order': 10,
-                'inputs': [
-                    {'title': 'some int', 'description': 'to be cubed'}
-                ]
-            },
-
-            'widgetFeatures': {
-                'title': 'Widget features',
-                'description': 'String hash, file hash widgets for input params, titles for outputs',
-                'sorting_order': 20,
-                'inputs': [
-                    {
-                        'title': 'string hash',
-                        'description': 'Hash of string will be sent as param to smart contract function',
-                        'ui:widget': 'stringHash'
-                    },
-                    {
-                        'title': 'file hash',
-                        'description': 'Hash of file will be sent as param to smart contract function',
-                        'ui:widget': 'fileHash'
-                    },
-                    {
-                        'title': 'unix time',
-                        'description': 'unix timestamp will be sent as param to smart contract function',
-                        'ui:widget': 'unixTime'
-                    },
-                ],
-                'outputs': [
-                    {'title': 'string hash'},
-                    {'title': 'file hash'},
-                    {'title': 'unix timestamp + 3'}
-                ]
-            },
-
-            'ethCount': {
-                'title': 'some eth count',
-                'description': 'In variable in smart contract it stored in wei',
-                'ui:widget': 'ethCount',
-                'ui:widget_options': {
-                    'show_currency': 'EUR'
+        return self._FUNCTION_TITLES.post_construct_result(abi_array)
+
+
+    _FUNCTION_TITLES = FunctionTitles({
+
+        'publicVar': {
+            'title': 'Public var',
+            'description': 'View function for public var',
+            'sorting_order': 5
+        },
+
+        'cubeIt': {
+            'title': 'Cube it',
+            'description': 'Ask fuction for cube some integer',
+            'sorting_order': 10,
+            'inputs': [
+                {'title': 'some int', 'description': 'to be cubed'}
+            ]
+        },
+
+        'widgetFeatures': {
+            'title': 'Widget features',
+            'description': 'String hash, file hash widgets for input params, titles for outputs',
+            'sorting_order': 20,
+            'inputs': [
+                {
+                    'title': 'string hash',
+                    'description': 'Hash of string will be sent as param to smart contract function',
+                    'ui:widget': 'stringHash'
                 },
-                'sorting_order': 50
-            },
-
-
-            'someState': {
-                'title': 'Some state',
-                'description': 'Represents solidity enum as string',
-                'ui:widget': 'enum',
-                'ui:widget_options': {
-                    'enum': ['READY', 'STEADY', 'GO']
+                {
+                    'title': 'file hash',
+                    'description': 'Hash of file will be sent as param to smart contract function',
+                    'ui:widget': 'fileHash'
                 },
-                'sorting_order': 80
-            },
-
-            'someDate': {
-                'title': 'Some date',
-                'description': 'With custom format (see https://www.npmjs.com/package/dateformat)',
-                'ui:widget': 'unixTime',
-                'ui:widget_options': {
-                    'format': "yyyy.mm.dd HH:MM:ss (o)"
+                {
+                    'title': 'unix time',
+                    'description': 'unix timestamp will be sent as param to smart contract function',
+                    'ui:widget': 'unixTime'
                 },
-                'sorting_order': 85
-            },
-
-            'setState': {
-                'title': 'Set some state',
-                'description': 'Write function',
-                'inputs': [
-                    {'title': 'Int representation of state', 'description': '0 - READY, 1 - STEADY, 2 - GO'}
-                ],
-                'sorting_order': 90
+            ],
+            'outputs': [
+                {'title': 'string hash'},
+                {'title': 'file hash'},
+                {'title': 'unix timestamp + 3'}
+            ]
+        },
+
+        'ethCount': {
+            'title': 'some eth count',
+            'description': 'In variable in smart contract it stored in wei',
+            'ui:widget': 'ethCount',
+            'ui:widget_options': {
+                'show_currency': 'EUR'
             },
+            'sorting_order': 50
+        },
 
-            'setDate': {
-                'title': 'Set some date',
-                'inputs': [
-                    {'title': 'Date time selector', 'description': 'unixtime will be sent', 'ui:widget': 'unixTime'}
-                ],
-                'sorting_order': 100
-            },
 
-            '': {
-                'title': 'Send ether to contract (fallback)',
-                'description': 'Send ether to contract (fallback description)',
-                'sorting_order': 1,
-                'payable_details': {
-                    'title': 'Ether amount (custom)',
-                    'description': 'This ether amount will be sent to the contract (custom)'
-                }
+        'someState': {
+            'title': 'Some state',
+            'description': 'Represents solidity enum as string',
+            'ui:widget': 'enum',
+            'ui:widget_options': {
+                'enum': ['READY', 'STEADY', 'GO']
             },
-
-            'sendEther': {
-                'title': 'Send ether to contract',
-                'description': 'Payable function. Ether amount can be set',
-                'sorting_order': 200,
-                'payable_details': {
-                    'title': 'Ether amount (custom)',
-                    'description': 'This ether amount will be sent with the function call (custom)'
-                }
+            'sorting_order': 80
+        },
+
+        'someDate': {
+            'title': 'Some date',
+            'description': 'With custom format (see https://www.npmjs.com/package/dateformat)',
+            'ui:widget': 'unixTime',
+            'ui:widget_options': {
+                'format': "yyyy.mm.dd HH:MM:ss (o)"
             },
-        }
-
-        return {
-            "result": "success",
-            'function_specs': function_titles,
-            'dashboard_functions': ['publicVar', 'someState']
-        }
+            'sorting_order': 85
+        },
+
+        'setState': {
+            'title': 'Set some state',
+            'description': 'Write function',
+            'inputs': [
+                {'title': 'Int representation of state', 'description': '0 - READY, 1 - STEADY, 2 - GO'}
+            ],
+            'sorting_order': 90
+        },
 
+        'setDate': {
+            'title': 'Set some date',
+            'inputs': [
+                {'title': 'Date time selector', 'description': 'unixtime will be sent', 'ui:widget': 'unixTime'}
+            ],
+            'sorting_order': 100
+        },
+
+        '': {
+            'title': 'Send ether to contract (fallback)',
+            'description': 'Send ether to contract (fallback description)',
+            'sorting_order': 1,
+            'payable_details': {
+                'title': 'Ether amount (custom)',
+                'description': 'This ether amount will be sent to the contract (custom)'
+            }
+        },
+
+        'sendEther': {
+            'title': 'Send ether to contract',
+            'description': 'Payable function. Ether amount can be set',
+            'sorting_order': 200,
+            'payable_details': {
+                'title': 'Ether amount (custom)',
+                'description': 'This ether amount will be sent with the function call (custom)'
+            }
+        },
+    }, dashboard_functions=['publicVar', 'someState'])
 
     # language=Solidity
-    _TEMPLATE = """
+    _TEMPLATE = Template("""
 /**
  * Copyright (C) 2018 Smartz, LLC
  *
@@ -365,4 +362,4 @@ contract SmartzFeatures {
     }
 }
 
-    """
+    """, passthrough=('payment_code',))
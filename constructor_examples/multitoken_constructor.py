@@ -1,4 +1,6 @@
 from smartz.api.constructor_engine import ConstructorInstance
+from smartz.api.function_titles import FunctionTitles
+from smartz.api.template import Template
 
 
 class Constructor(ConstructorInstance):
@@ -48,9 +50,11 @@ class Constructor(ConstructorInstance):
 
     def construct(self, fields):
 
-        source = self.__class__._TEMPLATE \
-            .replace('%decimals%', str(fields['decimals'])) \
-            .replace('%mask%', str(fields['mask']))
+        # template has no such placeholders yet, so non-strict rendering
+        source = self.__class__._TEMPLATE.render({
+            'decimals': fields['decimals'],
+            'mask': fields['mask']
+        }, strict=False)
 
         return {
             "result": "success",
@@ -59,199 +63,125 @@ class Constructor(ConstructorInstance):
         }
 
     def post_construct(self, fields, abi_array):
-
-        function_titles = {
-            'transferOwnership': {
-                'title': 'Transfer ownership',
-                'description': 'Transfers ownership of the token to another address. Ownership rights are required to perform some administrative operations.',
-                'inputs': [{
+        return self._FUNCTION_TITLES.post_construct_result(abi_array)
+
+
+    _FUNCTION_TITLES = FunctionTitles({
+        'transferOwnership': {
+            'title': 'Transfer ownership',
+            'description': 'Transfers ownership of the token to another address. Ownership rights are required to perform some administrative operations.',
+            'inputs': [{
+                'title': 'Address',
+                'description': 'Address which\'ll receive ownership rights.',
+            }]
+        },
+
+        'createNewSubtoken': {
+            'title': 'Create new subtoken',
+            'description': 'Create new subtoken and send subtokens to address',
+            'inputs': [
+                {'title': 'Token ID', },
+                {
+                    'title': 'Address of owner',
+                    'description': 'Address which receive all subtokens',
+                }, {
+                    'title': 'Tokens count',
+                    'description': 'Count of tokens will be created',
+                }
+            ]
+        },
+
+        'totalSupply': {
+            'title': 'Total supply',
+            'description': 'Current total amount of the token. Specified in the smallest units of the token.',
+            'inputs': [{
+                'title': 'Token ID',
+            }]
+        },
+
+        'balanceOf': {
+            'title': 'Get balance',
+            'description': 'Gets the token balance of any address. Return value is specified in the smallest units of the token.',
+            'inputs': [
+                {'title': 'Token ID',},
+                {'title': 'Address',}
+            ]
+        },
+
+        'allowance': {
+            'title': 'View allowance',
+            'description': 'View amount of tokens which some token holder allowed to spend by another address.',
+            'inputs': [
+                {'title': 'Token ID', },
+                {
+                    'title': 'Address of owner',
+                    'description': 'Address which allowed to spend his tokens.',
+                }, {
+                    'title': 'Address of spender',
+                    'description': 'Address which was allowed to spend tokens.',
+                }
+            ]
+        },
+
+        'transfer': {
+            'title': 'Transfer tokens',
+            'description': 'Transfers some amount of your tokens to another address.',
+            'inputs': [
+                {'title': 'Token ID', },
+                {
+                    'title': 'To',
+                    'description': 'Recipient address.',
+                }, {
+                    'title': 'Amount',
+                    'description': 'Amount must be specified in the smallest units of the token.',
+                }
+            ]
+        },
+
+        'transferFrom': {
+            'title': 'Transfer from',
+            'description': 'Transfers from one account to another. Account which tokens are transferred has to approve this spending.',
+            'inputs': [
+                {'title': 'Token ID', },
+                {
+                    'title': 'From',
+                    'description': 'Subtract tokens from this account.',
+                }, {
+                    'title': 'To',
+                    'description': 'Transfer tokens to this account.',
+                }, {
+                    'title': 'Amount',
+                    'description': 'Amount must be specified in the smallest units of the token.',
+                }
+            ]
+        },
+
+        'approve': {
+            'title': 'Approve spending',
+            'description': 'Allow some amount of your tokens to be spent by specified address.',
+            'inputs': [
+                {'title': 'Token ID', },
+                {
                     'title': 'Address',
-                    'description': 'Address which\'ll receive ownership rights.',
-                }]
-            },
-
-            'createNewSubtoken': {
-                'title': 'Create new subtoken',
-                'description': 'Create new subtoken and send subtokens to address',
-                'inputs': [
-                    {'title': 'Token ID', },
-                    {
-                        'title': 'Address of owner',
-                        'description': 'Address which receive all subtokens',
-                    }, {
-                        'title': 'Tokens count',
-                        'description': 'Count of tokens will be created',
-                    }
-                ]
-            },
-
-            'totalSupply': {
-                'title': 'Total supply',
-                'description': 'Current total amount of the token. Specified in the smallest units of the token.',
-                'inputs': [{
-                    'title': 'Token ID',
-                }]
-            },
-
-            'balanceOf': {
-                'title': 'Get balance',
-                'description': 'Gets the token balance of any address. Return value is specified in the smallest units of the token.',
-                'inputs': [
-                    {'title': 'Token ID',},
-                    {'title': 'Address',}
-                ]
-            },
-
-            'allowance': {
-                'title': 'View allowance',
-                'description': 'View amount of tokens which some token holder allowed to spend by another address.',
-                'inputs': [
-                    {'title': 'Token ID', },
-                    {
-                        'title': 'Address of owner',
-                        'description': 'Address which allowed to spend his tokens.',
-                    }, {
-                        'title': 'Address of spender',
-                        'description': 'Address which was allowed to spend tokens.',
-                    }
-                ]
-            },
-
-            'transfer': {
-                'title': 'Transfer tokens',
-                'description': 'Transfers some amount of your tokens to another address.',
-                'inputs': [
-                    {'title': 'Token ID', },
-                    {
-                        'title': 'To',
-                        'description': 'Recipient address.',
-                    }, {
-                        'title': 'Amount',
-                        'description': 'Amount must be specified in the smallest units of the token.',
-                    }
-                ]
-            },
-
-            'transferFrom': {
-                'title': 'Transfer from',
-                'description': 'Transfers from one account to another. Account which tokens are transferred has to approve this spending.',
-                'inputs': [
-                    {'title': 'Token ID', },
-                    {
-                        'title': 'From',
-                        'description': 'Subtract tokens from this account.',
-                    }, {
-                        'title': 'To',
-                        'description': 'Transfer tokens to this account.',
-                    }, {
-                        'title': 'Amount',
-                        'description': 'Amount must be specified in the smallest units of the token.',
-                    }
-                ]
-            },
-
-            'approve': {
-                'title': 'Approve spending',
-                'description': 'Allow some amount of your tokens to be spent by specified address.',
-                'inputs': [
-                    {'title': 'Token ID', },
-                    {
-                        'title': 'Address',
-                        'description': 'Address to allow to spend tokens.',
-                    }, {
-                        'title': 'Amount',
-                        'description': 'Amount must be specified in the smallest units of the token.',
-                    }
-                ]
-            },
-
-        }
-
-        return {
-            "result": "success",
-            'function_specs': function_titles,
-            'dashboard_functions': []
-        }
+                    'description': 'Address to allow to spend tokens.',
+                }, {
+                    'title': 'Amount',
+                    'description': 'Amount must be specified in the smallest units of the token.',
+                }
+            ]
+        },
 
+    }, dashboard_functions=[])
 
     # language=Solidity
-    _TEMPLATE = """
+    _TEMPLATE = Template("""
 pragma solidity ^0.4.18;
 
 
-/**
- * @title SafeMath
- * @dev Math operations with safety checks that throw on error
- */
-library SafeMath {
-  function mul(uint256 a, uint256 b) internal pure returns (uint256) {
-    if (a == 0) {
-      return 0;
-    }
-    uint256 c = a * b;
-    assert(c / a == b);
-    return c;
-  }
-
-  function div(uint256 a, uint256 b) internal pure returns (uint256) {
-    // assert(b > 0); // Solidity automatically throws when dividing by 0
-    uint256 c = a / b;
-    // assert(a == b * c + a % b); // There is no case in which this doesn't hold
-    return c;
-  }
-
-  function sub(uint256 a, uint256 b) internal pure returns (uint256) {
-    assert(b <= a);
-    return a - b;
-  }
-
-  function add(uint256 a, uint256 b) internal pure returns (uint256) {
-    uint256 c = a + b;
-    assert(c >= a);
-    return c;
-  }
-}
+%snippet SafeMath@1%
 
 
-/**
- * @title Ownable
- * @dev The Ownable contract has an owner address, and provides basic authorization control
- * functions, this simplifies the implementation of "user permissions".
- */
-contract Ownable {
-  address public owner;
-
-
-  event OwnershipTransferred(address indexed previousOwner, address indexed newOwner);
-
-
-  /**
-   * @dev The Ownable constructor sets the original `owner` of the contract to the sender
-   * account.
-   */
-  function Ownable() public {
-    owner = msg.sender;
-  }
-
-  /**
-   * @dev Throws if called by any account other than the owner.
-   */
-  modifier onlyOwner() {
-    require(msg.sender == owner);
-    _;
-  }
-
-  /**
-   * @dev Allows the current owner to transfer control of the contract to a newOwner.
-   * @param newOwner The address to transfer ownership to.
-   */
-  function transferOwnership(address newOwner) public onlyOwner {
-    require(newOwner != address(0));
-    OwnershipTransferred(owner, newOwner);
-    owner = newOwner;
-  }
-
-}
+%snippet Ownable@1%
 contract MultiTokenBasics {
 
     function totalSupply(uint256 _tokenId) public view returns (uint256);
@@ -435,4 +365,4 @@ contract MultiToken is Ownable, MultiTokenBasics {
 
 }
 
-    """
+    """)